@@ -1,12 +1,23 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Q
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
+
+from config.admin_filters import (
+    AutocompleteFilter, AutocompleteFilterMixin, PrefixSearchMixin, is_autocomplete
+)
+from config.pagination import EstimatedCountPaginator
+from . import geography
+from .imports import load_geography
 from .models import User, Region, District, Mahalla
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(AutocompleteFilterMixin, BaseUserAdmin):
     list_display = [
         'username',
         'full_name_display',
@@ -17,9 +28,12 @@ class UserAdmin(BaseUserAdmin):
         'telegram_id',
         'created_at'
     ]
-    list_filter = ['role', 'status', 'region', 'district', 'created_at']
+    list_filter = ['role', 'status', 'region', ('district', AutocompleteFilter), 'created_at']
     search_fields = ['username', 'first_name', 'last_name', 'phone', 'telegram_id']
     ordering = ['-created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_select_related = ['mahalla__district']
 
     fieldsets = (
         (None, {'fields': ('username', 'password')}),
@@ -62,6 +76,7 @@ class UserAdmin(BaseUserAdmin):
         return obj.get_full_name() or "-"
 
     full_name_display.short_description = _("F.I.Sh")
+    full_name_display.admin_order_field = 'last_name'
 
     def role_badge(self, obj):
         colors = {
@@ -77,6 +92,7 @@ class UserAdmin(BaseUserAdmin):
         )
 
     role_badge.short_description = _("Rol")
+    role_badge.admin_order_field = 'role'
 
     def status_badge(self, obj):
         colors = {
@@ -92,45 +108,105 @@ class UserAdmin(BaseUserAdmin):
         )
 
     status_badge.short_description = _("Holat")
+    status_badge.admin_order_field = 'status'
+
+
+class GeographyAdminMixin:
+    def delete_queryset(self, request, queryset):
+        # Ommaviy o'chirish Model.delete() ni chaqirmaydi
+        super().delete_queryset(request, queryset)
+        geography.invalidate()
 
 
 @admin.register(Region)
-class RegionAdmin(admin.ModelAdmin):
+class RegionAdmin(GeographyAdminMixin, admin.ModelAdmin):
     list_display = ['name', 'code', 'districts_count', 'is_active', 'created_at']
     list_filter = ['is_active']
     search_fields = ['name', 'code']
     ordering = ['name']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = 'admin/accounts/region/change_list.html'
+
+    def get_urls(self):
+        return [
+            path(
+                'load/',
+                self.admin_site.admin_view(self.load_view),
+                name='accounts_region_load',
+            ),
+        ] + super().get_urls()
+
+    def load_view(self, request):
+        """Hududlar ierarxiyasini fayldan yuklash (upsert)"""
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': _("Hududlarni fayldan yuklash"),
+        }
+        upload = request.FILES.get('file')
+        if request.method == 'POST' and upload:
+            try:
+                result = load_geography(
+                    upload.file, upload.name, deactivate=not request.POST.get('keep_missing')
+                )
+            except ValueError as e:
+                self.message_user(request, f"Xatolik: {e}", level='error')
+            else:
+                self.message_user(
+                    request,
+                    f"{result.regions} viloyat, {result.districts} tuman, "
+                    f"{result.mahallas} mahalla yozildi ({result.duration:.1f} s)."
+                )
+                context.update(result=result, errors=result.errors[:50])
+        return TemplateResponse(request, 'admin/accounts/region/load_geography.html', context)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(districts_total=Count('districts'))
 
     def districts_count(self, obj):
-        count = obj.districts.count()
         return format_html(
             '<span style="font-weight:bold;">{}</span> ta',
-            count
+            obj.districts_total
         )
 
     districts_count.short_description = _("Tumanlar")
+    districts_count.admin_order_field = 'districts_total'
 
 
 @admin.register(District)
-class DistrictAdmin(admin.ModelAdmin):
+class DistrictAdmin(GeographyAdminMixin, PrefixSearchMixin, admin.ModelAdmin):
     list_display = ['name', 'region', 'code', 'mahallas_count', 'is_active', 'created_at']
     list_filter = ['region', 'is_active']
     search_fields = ['name', 'code', 'region__name']
+    prefix_search_fields = ['name']
     ordering = ['region', 'name']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     autocomplete_fields = ['region']
+    list_select_related = ['region']
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request).select_related('region')
+        if is_autocomplete(request):
+            return queryset
+        return queryset.annotate(mahallas_total=Count('mahallas'))
 
     def mahallas_count(self, obj):
-        count = obj.mahallas.count()
         return format_html(
             '<span style="font-weight:bold;">{}</span> ta',
-            count
+            obj.mahallas_total
         )
 
     mahallas_count.short_description = _("Mahallalar")
+    mahallas_count.admin_order_field = 'mahallas_total'
 
 
 @admin.register(Mahalla)
-class MahallaAdmin(admin.ModelAdmin):
+class MahallaAdmin(GeographyAdminMixin, AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = [
         'name',
         'district',
@@ -141,20 +217,30 @@ class MahallaAdmin(admin.ModelAdmin):
         'leaders_count',
         'is_active'
     ]
-    list_filter = ['district__region', 'district', 'is_active']
+    list_filter = ['district__region', ('district', AutocompleteFilter), 'is_active']
     search_fields = ['name', 'code', 'district__name']
     ordering = ['district', 'name']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     autocomplete_fields = ['district']
+    list_select_related = ['district__region']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            leaders_total=Count('users', filter=Q(users__role=User.Role.LEADER))
+        )
 
     def region_display(self, obj):
         return obj.district.region.name
 
     region_display.short_description = _("Viloyat")
+    region_display.admin_order_field = 'district__region__name'
 
     def leaders_count(self, obj):
-        count = obj.users.filter(role='leader').count()
+        count = obj.leaders_total
         if count == 0:
             return format_html('<span style="color:#e74c3c;">0</span>')
         return format_html('<span style="color:#27ae60; font-weight:bold;">{}</span>', count)
 
-    leaders_count.short_description = _("Yetakchilar")
\ No newline at end of file
+    leaders_count.short_description = _("Yetakchilar")
+    leaders_count.admin_order_field = 'leaders_total'
\ No newline at end of file
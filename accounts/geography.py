@@ -0,0 +1,133 @@
+"""
+Hududlar daraxti keshi (viloyat -> tuman -> mahalla).
+
+Faol hududlar jarayon xotirasida saqlanadi va versiya bilan tekshiriladi:
+versiya bazada (GeographyVersion, bitta qator) — barcha workerlar va qayta
+ishga tushirishlar uchun umumiy. Hudud o'zgarganda invalidate() uni o'sha
+tranzaksiyada oshiradi; boshqa workerlar versiyani ko'pi bilan har
+GEOGRAPHY_VERSION_CHECK_SECONDS da o'qiydi va o'zgargan bo'lsa daraxtni
+qayta yuklaydi (uch so'rov). GEOGRAPHY_CACHE_SECONDS — daraxtning eng uzoq
+yashash muddati.
+
+Daraxtdagi Area obyektlari oqimlar orasida umumiy — ularni o'zgartirmang.
+"""
+import threading
+import time
+from collections import namedtuple
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+LEVELS = ('regions', 'districts', 'mahallas')
+
+Area = namedtuple('Area', ['pk', 'name'])
+
+
+class Tree:
+    def __init__(self, version, regions, districts, mahallas):
+        self.version = version
+        self.regions = regions
+        self.districts = districts    # region_id -> [Area]
+        self.mahallas = mahallas      # district_id -> [Area]
+        self.loaded_at = time.monotonic()
+
+    def children(self, level, parent=None):
+        """Darajadagi hududlar; tuman/mahalla uchun faqat parent ning bolalari"""
+        if level == 'regions':
+            return self.regions
+        if level == 'districts':
+            return self.districts.get(parent, [])
+        if level == 'mahallas':
+            return self.mahallas.get(parent, [])
+        raise ValueError(f"Noma'lum daraja: {level}")
+
+
+VERSION_PK = 1
+
+_tree = None
+_checked = None     # (monotonic, versiya) — oxirgi bazadan o'qish
+_lock = threading.Lock()
+
+
+def version():
+    """Bazadagi daraxt versiyasi; jarayon ichida qisqa muddat keshlanadi"""
+    global _checked
+    from .models import GeographyVersion
+
+    now = time.monotonic()
+    checked = _checked
+    if checked and now - checked[0] < settings.GEOGRAPHY_VERSION_CHECK_SECONDS:
+        return checked[1]
+
+    current = GeographyVersion.objects.filter(pk=VERSION_PK).values_list('version', flat=True).first()
+    _checked = (now, current or 1)
+    return _checked[1]
+
+
+def invalidate():
+    """
+    Hudud o'zgarganda chaqiriladi: versiya joriy tranzaksiyada oshiriladi
+    (rollback bo'lsa — u ham bekor), jarayon keshi commit dan keyin tozalanadi.
+    """
+    from .models import GeographyVersion
+
+    updated = GeographyVersion.objects.filter(pk=VERSION_PK).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        GeographyVersion.objects.get_or_create(pk=VERSION_PK, defaults={'version': 2})
+    transaction.on_commit(clear)
+
+
+def _grouped(rows):
+    return {
+        parent: [Area(pk, name) for _, pk, name in items]
+        for parent, items in groupby(rows, key=lambda row: row[0])
+    }
+
+
+def _load(current):
+    from .models import Region, District, Mahalla
+
+    regions = [
+        Area(pk, name)
+        for pk, name in Region.objects.filter(is_active=True).order_by('name').values_list('id', 'name')
+    ]
+    districts = _grouped(
+        District.objects.filter(is_active=True).order_by('region_id', 'name')
+        .values_list('region_id', 'id', 'name')
+    )
+    mahallas = _grouped(
+        Mahalla.objects.filter(is_active=True).order_by('district_id', 'name')
+        .values_list('district_id', 'id', 'name')
+    )
+    return Tree(current, regions, districts, mahallas)
+
+
+def get_tree():
+    """Faol hududlar daraxti; versiya o'zgarmagan bo'lsa so'rovsiz"""
+    global _tree
+
+    current = version()
+    tree = _tree
+    if (
+        tree is not None
+        and tree.version == current
+        and time.monotonic() - tree.loaded_at < settings.GEOGRAPHY_CACHE_SECONDS
+    ):
+        return tree
+
+    tree = _load(current)
+    with _lock:
+        _tree = tree
+    return tree
+
+
+def clear():
+    global _tree, _checked
+    with _lock:
+        _tree = None
+        _checked = None
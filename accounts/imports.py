@@ -0,0 +1,484 @@
+"""
+Excel/CSV fayldan ommaviy import: yetakchilar va hududlar ierarxiyasi.
+
+Yetakchilar fayli oqim bilan o'qiladi (openpyxl read_only), qatorlar batch_size bo'lib
+ishlanadi:
+- telefon normalize_phone + User.phone_regex bilan tekshiriladi;
+- viloyat/tuman/mahalla kodlari xotiradagi lug'atdan olinadi (import
+  boshida uch so'rov);
+- username/telefon takrorlari fayl ichida va bazada (har paketga ikki
+  so'rov) tekshiriladi;
+- parollar jarayonlar hovuzida xeshlanadi — PBKDF2 CPU ni band qiladi,
+  GIL tufayli oqimlar yordam bermaydi. Parol ustuni bo'sh bo'lsa
+  foydalanilmaydigan parol qo'yiladi (yetakchi bot orqali kiradi);
+- bulk_create bilan yoziladi.
+
+Xato qatorlar o'tkazib yuboriladi va CSV hisobotga yoziladi.
+
+Hududlar (load_geography) — har bir qator bitta mahalla (yoki faqat
+viloyat/tuman). Har daraja tabiiy kalit bo'yicha bitta
+bulk_create(update_conflicts=True) bilan yoziladi; faylda yo'q qatorlar
+o'chirilmaydi, is_active=False qilinadi (yetakchi va vazifalar ularga
+bog'langan).
+"""
+import csv
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from itertools import islice
+
+import openpyxl
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+
+from . import geography
+from .models import User, Region, District, Mahalla
+from .search import normalize_phone
+
+
+# Ustun -> sarlavhada qabul qilinadigan nomlar
+COLUMNS = {
+    'username': ('username', 'login'),
+    'password': ('password', 'parol'),
+    'first_name': ('first_name', 'ism'),
+    'last_name': ('last_name', 'familiya'),
+    'phone': ('phone', 'telefon'),
+    'region': ('region', 'viloyat'),
+    'district': ('district', 'tuman'),
+    'mahalla': ('mahalla',),
+}
+REQUIRED = ('username', 'first_name', 'last_name', 'phone')
+
+# Hisobotga parol yozilmaydi
+REPORT_COLUMNS = [name for name in COLUMNS if name != 'password']
+
+REPORT_DIR = 'imports'
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # Excel telefon/kodlarni son sifatida saqlaydi: 998901234567.0
+        value = int(value)
+    return str(value).strip()
+
+
+def _header(values, columns, required):
+    aliases = {alias: name for name, names in columns.items() for alias in names}
+    columns = [aliases.get(_cell(v).lower()) for v in values]
+    missing = [name for name in required if name not in columns]
+    if missing:
+        raise ValueError(f"Faylda ustunlar yo'q: {', '.join(missing)}")
+    return columns
+
+
+def read_rows(fileobj, filename, columns=COLUMNS, required=REQUIRED):
+    """(qator raqami, {ustun: qiymat}) juftliklari; sarlavha — birinchi qator"""
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            yield from _records(rows, columns, required)
+        finally:
+            workbook.close()
+    elif filename.lower().endswith('.csv'):
+        text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+        try:
+            try:
+                dialect = csv.Sniffer().sniff(text.readline(), delimiters=',;\t')
+            except csv.Error:
+                dialect = csv.excel
+            text.seek(0)
+            yield from _records(csv.reader(text, dialect), columns, required)
+        finally:
+            # Yuklangan faylni yopmaslik uchun
+            text.detach()
+    else:
+        raise ValueError("Faqat .xlsx yoki .csv fayl qabul qilinadi")
+
+
+def _records(rows, columns, required):
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("Fayl bo'sh")
+    columns = _header(header, columns, required)
+    for number, values in enumerate(rows, 2):
+        record = {
+            name: _cell(value)
+            for name, value in zip(columns, values)
+            if name is not None
+        }
+        if any(record.values()):
+            yield number, record
+
+
+class GeographyLookup:
+    """Kodlar bo'yicha hudud ID lari (xotirada)"""
+
+    def __init__(self):
+        self.regions = dict(Region.objects.order_by().values_list('code', 'id'))
+        self.districts = {
+            (region_id, code): pk
+            for pk, region_id, code in District.objects.order_by().values_list('id', 'region_id', 'code')
+        }
+        self.mahallas = {
+            (district_id, code): pk
+            for pk, district_id, code in Mahalla.objects.order_by().values_list('id', 'district_id', 'code')
+        }
+
+    def resolve(self, region, district, mahalla):
+        """(region_id, district_id, mahalla_id); topilmasa ValueError"""
+        if (district or mahalla) and not region:
+            raise ValueError("Viloyat kodi ko'rsatilmagan")
+        if mahalla and not district:
+            raise ValueError("Tuman kodi ko'rsatilmagan")
+
+        region_id = district_id = mahalla_id = None
+        if region:
+            region_id = self.regions.get(region)
+            if region_id is None:
+                raise ValueError(f"Viloyat topilmadi: {region}")
+        if district:
+            district_id = self.districts.get((region_id, district))
+            if district_id is None:
+                raise ValueError(f"Tuman topilmadi: {district}")
+        if mahalla:
+            mahalla_id = self.mahallas.get((district_id, mahalla))
+            if mahalla_id is None:
+                raise ValueError(f"Mahalla topilmadi: {mahalla}")
+        return region_id, district_id, mahalla_id
+
+
+@dataclass
+class ImportResult:
+    total: int = 0
+    created: int = 0
+    errors: list = field(default_factory=list)   # [(qator, {ustun: qiymat}, xabar)]
+    duration: float = 0.0
+
+
+class LeaderImporter:
+
+    def __init__(self, batch_size=None, workers=None):
+        self.batch_size = batch_size or settings.LEADER_IMPORT_BATCH_SIZE
+        self.workers = workers or settings.LEADER_IMPORT_WORKERS or os.cpu_count() or 1
+        self.geography = GeographyLookup()
+        self.usernames = set()
+        self.phones = set()
+        self.result = ImportResult()
+
+    def run(self, rows):
+        started = time.perf_counter()
+        # spawn: fon oqimlari bor jarayonni (monitoring) fork qilish xavfli,
+        # bola jarayonga DB ulanishlari ham meros qolmaydi
+        pool = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context('spawn')
+        ) if self.workers > 1 else nullcontext()
+        with pool:
+            rows = iter(rows)
+            while batch := list(islice(rows, self.batch_size)):
+                self.result.total += len(batch)
+                self._import_batch(batch, pool)
+        self.result.duration = time.perf_counter() - started
+        return self.result
+
+    def _error(self, number, record, message):
+        self.result.errors.append((number, record, message))
+
+    def _validate(self, record):
+        for name in REQUIRED:
+            if not record.get(name):
+                raise ValueError(f"'{name}' to'ldirilmagan")
+
+        phone = normalize_phone(record['phone'])
+        if not phone or not User.phone_regex.regex.match(phone):
+            raise ValueError(f"Telefon noto'g'ri: {record['phone']}")
+        if phone in self.phones:
+            raise ValueError(f"Telefon faylda takrorlangan: {phone}")
+
+        username = record['username']
+        try:
+            User.username_validator(username)
+        except ValidationError:
+            raise ValueError(f"Username noto'g'ri: {username}")
+        if username in self.usernames:
+            raise ValueError(f"Username faylda takrorlangan: {username}")
+
+        region_id, district_id, mahalla_id = self.geography.resolve(
+            record.get('region'), record.get('district'), record.get('mahalla')
+        )
+        self.usernames.add(username)
+        self.phones.add(phone)
+        return User(
+            username=username,
+            first_name=record['first_name'],
+            last_name=record['last_name'],
+            phone=phone,
+            role=User.Role.LEADER,
+            status=User.Status.ACTIVE,
+            region_id=region_id,
+            district_id=district_id,
+            mahalla_id=mahalla_id,
+        )
+
+    def _import_batch(self, batch, pool):
+        valid = []
+        for number, record in batch:
+            try:
+                valid.append((number, record, self._validate(record)))
+            except ValueError as e:
+                self._error(number, record, str(e))
+
+        # Bazada bor username/telefonlar — paketga ikki so'rov
+        taken_usernames = set(User.objects.filter(
+            username__in=[u.username for _, _, u in valid]
+        ).order_by().values_list('username', flat=True))
+        taken_phones = set(User.objects.filter(
+            phone__in=[u.phone for _, _, u in valid]
+        ).order_by().values_list('phone', flat=True))
+
+        rows = []
+        for number, record, user in valid:
+            if user.username in taken_usernames:
+                self._error(number, record, f"Username band: {user.username}")
+            elif user.phone in taken_phones:
+                self._error(number, record, f"Telefon band: {user.phone}")
+            else:
+                rows.append((number, record, user))
+
+        self._hash_passwords(rows, pool)
+
+        users = [user for _, _, user in rows]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users, batch_size=self.batch_size)
+        except (IntegrityError, DataError) as e:
+            # Parallel yozuv bilan to'qnashuv — paket butunlay qaytariladi
+            for number, record, _ in rows:
+                self._error(number, record, f"Bazaga yozilmadi: {e}")
+            return
+        self.result.created += len(users)
+
+    def _hash_passwords(self, rows, pool):
+        plain = [(user, record['password']) for _, record, user in rows if record.get('password')]
+        for _, record, user in rows:
+            if not record.get('password'):
+                user.set_unusable_password()
+
+        if not plain:
+            return
+        passwords = [password for _, password in plain]
+        if isinstance(pool, ProcessPoolExecutor):
+            chunksize = max(1, len(passwords) // (self.workers * 4))
+            hashes = pool.map(make_password, passwords, chunksize=chunksize)
+        else:
+            hashes = map(make_password, passwords)
+        for (user, _), hashed in zip(plain, hashes):
+            user.password = hashed
+
+
+def import_leaders(fileobj, filename, batch_size=None, workers=None):
+    """Fayldagi yetakchilarni yaratish; ImportResult qaytaradi"""
+    return LeaderImporter(batch_size, workers).run(read_rows(fileobj, filename))
+
+
+def error_report(errors):
+    """Xato qatorlar CSV (Excel uchun utf-8-sig): qator, asl ustunlar (parolsiz), xatolik"""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['qator', *REPORT_COLUMNS, 'xatolik'])
+    for number, record, message in errors:
+        writer.writerow([number, *(record.get(name, '') for name in REPORT_COLUMNS), message])
+    return out.getvalue().encode('utf-8-sig')
+
+
+def save_error_report(errors):
+    """Hisobotni media storage ga yozib, fayl nomini qaytaradi"""
+    name = f"leaders-{time.strftime('%Y%m%d-%H%M%S')}-errors.csv"
+    return os.path.basename(
+        default_storage.save(f"{REPORT_DIR}/{name}", ContentFile(error_report(errors)))
+    )
+
+
+# ==================== HUDUDLAR ====================
+
+GEOGRAPHY_COLUMNS = {
+    'region_code': ('region_code', 'viloyat_kod'),
+    'region': ('region', 'viloyat'),
+    'district_code': ('district_code', 'tuman_kod'),
+    'district': ('district', 'tuman'),
+    'mahalla_code': ('mahalla_code', 'mahalla_kod'),
+    'mahalla': ('mahalla',),
+    'population': ('population', 'aholi'),
+    'youth_count': ('youth_count', 'yoshlar'),
+}
+GEOGRAPHY_REQUIRED = ('region_code', 'region')
+GEOGRAPHY_BATCH_SIZE = 2000
+
+
+@dataclass
+class GeographyResult:
+    total: int = 0
+    regions: int = 0
+    districts: int = 0
+    mahallas: int = 0
+    deactivated: dict = field(default_factory=dict)
+    errors: list = field(default_factory=list)   # [(qator, {ustun: qiymat}, xabar)]
+    duration: float = 0.0
+
+
+def _count(value, name):
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' son emas: {value}")
+    if number < 0:
+        raise ValueError(f"'{name}' manfiy: {value}")
+    return number
+
+
+class GeographyLoader:
+
+    def __init__(self, batch_size=None, deactivate=True):
+        self.batch_size = batch_size or GEOGRAPHY_BATCH_SIZE
+        self.deactivate = deactivate
+        self.regions = {}     # code -> name
+        self.districts = {}   # (region_code, code) -> name
+        self.mahallas = {}    # (region_code, district_code, code) -> (name, population, youth)
+        self.result = GeographyResult()
+
+    def _parse(self, record):
+        region = record['region_code']
+        district = record.get('district_code')
+        mahalla = record.get('mahalla_code')
+
+        names = {}
+        for level, code in (('region', region), ('district', district), ('mahalla', mahalla)):
+            if code and not record.get(level):
+                raise ValueError(f"'{level}' nomi to'ldirilmagan")
+            names[level] = record.get(level)
+        if mahalla and not district:
+            raise ValueError("Mahalla uchun tuman kodi ko'rsatilmagan")
+
+        counts = (_count(record.get('population'), 'population'),
+                  _count(record.get('youth_count'), 'youth_count'))
+
+        self.regions[region] = names['region']
+        if district:
+            self.districts[(region, district)] = names['district']
+        if mahalla:
+            self.mahallas[(region, district, mahalla)] = (names['mahalla'], *counts)
+
+    def run(self, rows):
+        started = time.perf_counter()
+        for number, record in rows:
+            self.result.total += 1
+            try:
+                self._parse(record)
+            except ValueError as e:
+                self.result.errors.append((number, record, str(e)))
+
+        if not self.regions:
+            raise ValueError("Faylda hududlar yo'q")
+
+        with transaction.atomic():
+            self._write()
+            geography.invalidate()
+        self.result.duration = time.perf_counter() - started
+        return self.result
+
+    def _upsert(self, model, objects, unique_fields, update_fields):
+        try:
+            model.objects.bulk_create(
+                objects,
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=update_fields,
+            )
+        except IntegrityError as e:
+            # Masalan, Region.name boshqa kod bilan band
+            raise ValueError(f"{model._meta.verbose_name_plural}: {e}")
+        return len(objects)
+
+    def _write(self):
+        stamp = timezone.now()
+
+        self.result.regions = self._upsert(
+            Region,
+            [Region(code=code, name=name, is_active=True) for code, name in self.regions.items()],
+            ['code'], ['name', 'is_active'],
+        )
+        region_ids = dict(
+            Region.objects.filter(code__in=self.regions).order_by().values_list('code', 'id')
+        )
+
+        self.result.districts = self._upsert(
+            District,
+            [
+                District(region_id=region_ids[region], code=code, name=name, is_active=True)
+                for (region, code), name in self.districts.items()
+            ],
+            ['region', 'code'], ['name', 'is_active'],
+        )
+        district_ids = {
+            (region_code, code): pk
+            for pk, region_code, code in District.objects.filter(
+                region_id__in=region_ids.values()
+            ).order_by().values_list('id', 'region__code', 'code')
+        }
+
+        # Aholi sonlari faqat to'ldirilgan bo'lsa yangilanadi: bo'sh katak yoki
+        # ustun yo'qligi mavjud qiymatni 0 ga almashtirmaydi. update_fields butun
+        # so'rov uchun bitta — mahallalar to'ldirilgan ustunlari bo'yicha guruhlanadi
+        groups = {}
+        for (region, district, code), (name, population, youth) in self.mahallas.items():
+            filled = tuple(
+                field for field, value in (('population', population), ('youth_count', youth))
+                if value is not None
+            )
+            groups.setdefault(filled, []).append(Mahalla(
+                district_id=district_ids[(region, district)], code=code, name=name,
+                population=population or 0, youth_count=youth or 0, is_active=True,
+            ))
+        self.result.mahallas = sum(
+            self._upsert(Mahalla, objects, ['district', 'code'], ['name', 'is_active', 'updated_at', *filled])
+            for filled, objects in groups.items()
+        )
+
+        # Xato qatorlar bo'lsa ular "yo'q" deb hisoblanib qolmasligi uchun
+        if self.deactivate and not self.result.errors:
+            active = {'is_active': True}
+            self.result.deactivated = {
+                'regions': Region.objects.filter(**active).exclude(
+                    pk__in=region_ids.values()
+                ).update(is_active=False),
+                # district_ids yuklangan viloyatlarning barcha tumanlarini o'z ichiga
+                # oladi — saqlanadiganlari faqat faylda kelganlari
+                'districts': District.objects.filter(**active).exclude(
+                    pk__in=[district_ids[key] for key in self.districts]
+                ).update(is_active=False),
+                # auto_now: bu yuklashda yozilgan mahallalarda updated_at >= stamp
+                # (9k ID li NOT IN ro'yxati o'rniga)
+                'mahallas': Mahalla.objects.filter(**active, updated_at__lt=stamp).update(
+                    is_active=False
+                ),
+            }
+
+
+def load_geography(fileobj, filename, batch_size=None, deactivate=True):
+    """Viloyat/tuman/mahalla ierarxiyasini fayldan yuklash; GeographyResult qaytaradi"""
+    rows = read_rows(fileobj, filename, GEOGRAPHY_COLUMNS, GEOGRAPHY_REQUIRED)
+    return GeographyLoader(batch_size, deactivate).run(rows)
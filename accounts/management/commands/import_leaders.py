@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.imports import error_report, import_leaders
+from monitoring.slow import capture
+
+
+class Command(BaseCommand):
+    help = (
+        "Yetakchilarni .xlsx/.csv fayldan import qilish. Ustunlar: username, password, "
+        "first_name, last_name, phone, region, district, mahalla (hudud kodlari)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--workers', type=int, help="Parol xeshlash jarayonlari")
+        parser.add_argument('--report', help="Xato qatorlar CSV fayli")
+
+    @capture('command:import_leaders')
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                result = import_leaders(
+                    fileobj, options['path'],
+                    batch_size=options['batch_size'], workers=options['workers'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        for number, _, message in result.errors[:20]:
+            self.stdout.write(f"  {number}-qator: {message}")
+        if len(result.errors) > 20:
+            self.stdout.write(f"  ... yana {len(result.errors) - 20} ta")
+
+        if result.errors and options['report']:
+            with open(options['report'], 'wb') as out:
+                out.write(error_report(result.errors))
+            self.stdout.write(f"Hisobot: {options['report']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: {result.total} ta qatordan {result.created} ta yetakchi yaratildi, "
+            f"{len(result.errors)} ta xato ({result.duration:.1f}s)"
+        ))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.imports import load_geography
+from monitoring.slow import capture
+
+
+class Command(BaseCommand):
+    help = (
+        "Viloyat/tuman/mahalla ierarxiyasini .xlsx/.csv fayldan yuklash (upsert). Ustunlar: "
+        "region_code, region, district_code, district, mahalla_code, mahalla, population, youth_count"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument(
+            '--keep-missing', action='store_true',
+            help="Faylda yo'q hududlarni faolsizlantirmaslik (qisman fayl uchun)"
+        )
+
+    @capture('command:load_geography')
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                result = load_geography(
+                    fileobj, options['path'],
+                    batch_size=options['batch_size'],
+                    deactivate=not options['keep_missing'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        for number, _, message in result.errors[:20]:
+            self.stdout.write(f"  {number}-qator: {message}")
+        if len(result.errors) > 20:
+            self.stdout.write(f"  ... yana {len(result.errors) - 20} ta")
+        if result.errors and not options['keep_missing']:
+            self.stdout.write(self.style.WARNING(
+                "Xato qatorlar bor — faolsizlantirish o'tkazib yuborildi"
+            ))
+
+        deactivated = ', '.join(f"{name}: {n}" for name, n in result.deactivated.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: {result.regions} viloyat, {result.districts} tuman, "
+            f"{result.mahallas} mahalla yozildi"
+            + (f"; faolsizlantirildi — {deactivated}" if deactivated else "")
+            + f" ({result.duration:.1f}s)"
+        ))
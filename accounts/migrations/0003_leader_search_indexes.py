@@ -0,0 +1,50 @@
+from django.db import migrations
+
+
+NAME_FIELDS = ('first_name', 'last_name', 'username')
+
+
+def _has_trigram(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS accounts_user_phone_prefix '
+        'ON accounts_user ((phone::text) text_pattern_ops)'
+    )
+
+    # pg_trgm bo'lmagan serverda qidiruv indekssiz ishlaydi
+    if not _has_trigram(schema_editor):
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for field in NAME_FIELDS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS accounts_user_{field}_upper_trgm '
+            f'ON accounts_user USING gin (UPPER({field}::text) gin_trgm_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in NAME_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS accounts_user_{field}_upper_trgm')
+    schema_editor.execute('DROP INDEX IF EXISTS accounts_user_phone_prefix')
+
+
+class Migration(migrations.Migration):
+    """Yetakchilar qidiruvi: pg_trgm va telefon prefiks indekslari (faqat PostgreSQL)"""
+
+    dependencies = [
+        ('accounts', '0002_district_name_prefix_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
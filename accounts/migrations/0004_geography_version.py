@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-19 02:24
+
+from django.db import migrations, models
+
+
+def create_version(apps, schema_editor):
+    apps.get_model('accounts', 'GeographyVersion').objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_leader_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeographyVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=1, verbose_name='Versiya')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Hududlar versiyasi',
+                'verbose_name_plural': 'Hududlar versiyasi',
+            },
+        ),
+        migrations.RunPython(create_version, migrations.RunPython.noop),
+    ]
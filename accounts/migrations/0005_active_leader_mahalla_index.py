@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_geography_version'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('role', 'leader'), ('status', 'active')), fields=['mahalla'], name='user_active_leader_mahalla'),
+        ),
+    ]
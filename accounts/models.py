@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 
+from . import geography
+
 
 class User(AbstractUser):
     """
@@ -111,6 +113,12 @@ class User(AbstractUser):
             models.Index(fields=['role', 'status']),
             models.Index(fields=['telegram_id']),
             models.Index(fields=['phone']),
+            # Vazifa auditoriyasi: faol yetakchilar mahalla bo'yicha (tasks/audience.py)
+            models.Index(
+                fields=['mahalla'],
+                name='user_active_leader_mahalla',
+                condition=models.Q(role='leader', status='active'),
+            ),
         ]
 
     def __str__(self):
@@ -136,7 +144,37 @@ class User(AbstractUser):
         return ", ".join(parts) if parts else "Ko'rsatilmagan"
 
 
-class Region(models.Model):
+class GeographyVersion(models.Model):
+    """
+    Hududlar daraxti versiyasi — bitta qator (pk=1). Barcha workerlar uchun
+    umumiy: hudud o'zgarganda geography.invalidate() uni oshiradi.
+    """
+
+    version = models.PositiveBigIntegerField(default=1, verbose_name="Versiya")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Hududlar versiyasi"
+        verbose_name_plural = "Hududlar versiyasi"
+
+    def __str__(self):
+        return f"v{self.version}"
+
+
+class GeographyMixin:
+    """Saqlash/o'chirishda hududlar daraxti keshi versiyasini oshirish"""
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        geography.invalidate()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        geography.invalidate()
+        return result
+
+
+class Region(GeographyMixin, models.Model):
     """Viloyat modeli"""
 
     name = models.CharField(max_length=100, unique=True, verbose_name="Nomi")
@@ -153,7 +191,7 @@ class Region(models.Model):
         return self.name
 
 
-class District(models.Model):
+class District(GeographyMixin, models.Model):
     """Tuman modeli"""
 
     region = models.ForeignKey(
@@ -177,7 +215,7 @@ class District(models.Model):
         return f"{self.name} ({self.region.name})"
 
 
-class Mahalla(models.Model):
+class Mahalla(GeographyMixin, models.Model):
     """Mahalla modeli"""
 
     district = models.ForeignKey(
@@ -0,0 +1,79 @@
+"""
+Yetakchilarni qidirish.
+
+- Telefon: raqamlar +998XXXXXXXXX ko'rinishiga keltiriladi va prefiks
+  bo'yicha qidiriladi (phone text_pattern_ops indeksi) — ism/username
+  sharti bilan OR: raqamli username ham topiladi.
+- Ism/familiya/username: har bir so'z icontains bilan; PostgreSQL da
+  UPPER(col) ustidagi pg_trgm GIN indekslari ishlatiladi va natijalar
+  o'xshashlik bo'yicha tartiblanadi (search_rank). pg_trgm bo'lmasa
+  oddiy icontains.
+"""
+import re
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+
+PHONE_PREFIX = '+998'
+NAME_FIELDS = ('first_name', 'last_name', 'username')
+
+_PHONE_TERM = re.compile(r'^\+?[\d\s()-]{3,}$')
+_NON_DIGITS = re.compile(r'\D')
+
+_trigram = {}
+
+
+def has_trigram(connection):
+    """pg_trgm o'rnatilganmi (jarayon davomida keshlanadi)"""
+    if connection.vendor != 'postgresql':
+        return False
+    if connection.alias not in _trigram:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram[connection.alias] = cursor.fetchone() is not None
+    return _trigram[connection.alias]
+
+
+def normalize_phone(term):
+    """
+    '90 123 45' -> '+9989012345', '998901234567' -> '+998901234567'.
+    Telefon bo'lmasa None.
+    """
+    term = (term or '').strip()
+    if not _PHONE_TERM.match(term):
+        return None
+
+    digits = _NON_DIGITS.sub('', term)
+    if term.startswith('+') or (digits.startswith('998') and len(digits) > 9):
+        return '+' + digits
+    return PHONE_PREFIX + digits
+
+
+def search_leaders(queryset, term):
+    """Qidiruv natijalari; PostgreSQL da search_rank annotatsiyasi bilan"""
+    term = (term or '').strip()
+    if not term:
+        return queryset
+
+    # Har bir so'z ism/familiya/username dan birida bo'lishi kerak
+    condition = Q()
+    for word in term.split():
+        matches = Q()
+        for field in NAME_FIELDS:
+            matches |= Q(**{f'{field}__icontains': word})
+        condition &= matches
+
+    # Raqamli so'rov telefon ham, raqamli username/ism ham bo'lishi mumkin
+    phone = normalize_phone(term)
+    if phone:
+        condition = Q(phone__startswith=phone) | condition
+    queryset = queryset.filter(condition)
+
+    if has_trigram(connections[queryset.db]):
+        queryset = queryset.annotate(
+            search_rank=Greatest(*[TrigramSimilarity(f, term) for f in NAME_FIELDS])
+        )
+    return queryset
@@ -1,3 +1,381 @@
-from django.test import TestCase
+import csv
+import io
+import tempfile
 
-# Create your tests here.
+import openpyxl
+from django.contrib.auth.hashers import check_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts import geography
+from accounts.imports import error_report, import_leaders, load_geography
+from accounts.models import User, Region, District, Mahalla, GeographyVersion
+from accounts.search import normalize_phone, search_leaders
+from benchmarks import dataset
+from benchmarks.querybudget import QueryBudgetMixin
+
+
+class LeaderViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    namespaces = ['accounts']
+    budgets = {
+        'accounts:login': (2, None),
+        'accounts:logout': (None, None),
+        'accounts:leader_list': (5, None),
+        'accounts:leader_create': (2, None),
+        'accounts:leader_import': (2, None),
+        'accounts:leader_import_report': (None, None),
+        'accounts:geography_children': (2, lambda t: ['regions']),
+        'accounts:leader_detail': (5, lambda t: [t.dataset.leader.pk]),
+        'accounts:leader_edit': (4, lambda t: [t.dataset.leader.pk]),
+        'accounts:leader_delete': (5, lambda t: [t.dataset.leader.pk]),
+    }
+
+    def test_routes_have_budgets(self):
+        self.assertBudgetsCovered()
+
+    def test_query_budgets(self):
+        self.assertQueryBudgets()
+
+
+class GeographyAdminQueryBudgetTests(QueryBudgetMixin, TestCase):
+    budgets = {
+        'admin:accounts_user_changelist': (6, None),
+        'admin:accounts_region_changelist': (5, None),
+        'admin:accounts_district_changelist': (6, None),
+        'admin:accounts_mahalla_changelist': (6, None),
+        'admin:accounts_region_load': (2, None),
+    }
+
+    def test_query_budgets(self):
+        self.assertQueryBudgets()
+
+    def test_sortable_columns(self):
+        for model in (User, Region, District, Mahalla):
+            with self.subTest(model=model.__name__):
+                self.assertChangelistSortable(model)
+
+
+class LeaderSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(leaders=2)
+        cls.leader = cls.dataset.leader
+        cls.leader.first_name = "Dilnoza"
+        cls.leader.last_name = "Karimova"
+        cls.leader.phone = "+998901234567"
+        cls.leader.save()
+
+    def test_normalize_phone(self):
+        self.assertEqual(normalize_phone("90 123"), "+99890123")
+        self.assertEqual(normalize_phone("(90) 123-45-67"), "+998901234567")
+        self.assertEqual(normalize_phone("998901234567"), "+998901234567")
+        self.assertEqual(normalize_phone("+7 901"), "+7901")
+        self.assertIsNone(normalize_phone("Dilnoza"))
+        self.assertIsNone(normalize_phone("12"))
+
+    def test_phone_prefix(self):
+        results = search_leaders(User.objects.all(), "90 123 45")
+        self.assertEqual(list(results), [self.leader])
+
+    def test_digits_match_username_too(self):
+        other = self.dataset.leaders[1]
+        other.username = "yetakchi77051"
+        other.save()
+        leaders = User.objects.all()
+        self.assertEqual(list(search_leaders(leaders, "77051")), [other])
+        self.assertEqual(list(search_leaders(leaders, "90123")), [self.leader])
+
+    def test_every_word_must_match(self):
+        leaders = User.objects.all()
+        self.assertEqual(list(search_leaders(leaders, "dilnoza karim")), [self.leader])
+        self.assertEqual(list(search_leaders(leaders, "dilnoza rahim")), [])
+
+
+class LeaderImportTests(TestCase):
+    header = ['username', 'password', 'ism', 'familiya', 'telefon', 'viloyat', 'tuman', 'mahalla']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(leaders=1)
+        cls.mahalla = Mahalla.objects.select_related('district__region').first()
+        cls.codes = [
+            cls.mahalla.district.region.code, cls.mahalla.district.code, cls.mahalla.code
+        ]
+
+    def _csv(self, rows):
+        out = io.StringIO()
+        writer = csv.writer(out, delimiter=';')
+        writer.writerow(self.header)
+        writer.writerows(rows)
+        return io.BytesIO(out.getvalue().encode('utf-8-sig'))
+
+    def _xlsx(self, rows):
+        workbook = openpyxl.Workbook()
+        workbook.active.append(self.header)
+        for row in rows:
+            workbook.active.append(row)
+        out = io.BytesIO()
+        workbook.save(out)
+        out.seek(0)
+        return out
+
+    def test_csv_import(self):
+        existing = self.dataset.leader
+        rows = [
+            ['ali', 'parol123', 'Ali', 'Valiyev', '90 111 22 33', *self.codes],
+            ['vali', '', 'Vali', 'Aliyev', '998901112234', *self.codes[:2], ''],
+            ['ali', 'x', 'Ali', 'Ikkinchi', '+998901112235', '', '', ''],
+            ['hasan', 'x', 'Hasan', 'H', '12345', '', '', ''],
+            ['husan', 'x', 'Husan', 'H', '+998901112236', self.codes[0], 'YOQ', ''],
+            [existing.username, 'x', 'Band', 'B', '+998901112237', '', '', ''],
+        ]
+        # geografiya (3) + paketga username/telefon tekshiruvi (2) + savepoint ichida bulk_create
+        with self.assertNumQueries(8):
+            result = import_leaders(self._csv(rows), 'leaders.csv', workers=1)
+
+        self.assertEqual((result.total, result.created), (6, 2))
+        self.assertEqual([number for number, _, _ in result.errors], [4, 5, 6, 7])
+
+        ali = User.objects.get(username='ali')
+        self.assertEqual(ali.phone, '+998901112233')
+        self.assertEqual(ali.role, User.Role.LEADER)
+        self.assertEqual(ali.mahalla_id, self.mahalla.pk)
+        self.assertTrue(check_password('parol123', ali.password))
+
+        vali = User.objects.get(username='vali')
+        self.assertFalse(vali.has_usable_password())
+        self.assertEqual(vali.district_id, self.mahalla.district_id)
+        self.assertIsNone(vali.mahalla_id)
+
+        report = error_report(result.errors).decode('utf-8-sig')
+        self.assertIn('Username faylda takrorlangan', report)
+        self.assertNotIn('parol', report.splitlines()[0])
+
+    def test_xlsx_import_with_process_pool(self):
+        rows = [
+            [f'lead{i}', f'p{i}', 'Ism', 'Familiya', 998900000000 + i, *self.codes]
+            for i in range(5)
+        ]
+        result = import_leaders(self._xlsx(rows), 'leaders.xlsx', batch_size=2, workers=2)
+        self.assertEqual(result.created, 5)
+        self.assertEqual(result.errors, [])
+        leader = User.objects.get(username='lead3')
+        self.assertEqual(leader.phone, '+998900000003')
+        self.assertTrue(check_password('p3', leader.password))
+
+    def test_missing_columns(self):
+        with self.assertRaises(ValueError):
+            list(import_leaders(io.BytesIO(b'username;phone\na;1\n'), 'x.csv', workers=1).errors)
+
+    def test_view_and_report(self):
+        # Xato hisoboti media storage ga yoziladi — haqiqiy MEDIA_ROOT emas
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.client.force_login(self.dataset.admin)
+        rows = [['ok', '', 'Ok', 'Ok', '+998901112299', '', '', ''], ['', '', '', '', 'x', '', '', '']]
+        upload = SimpleUploadedFile('leaders.csv', self._csv(rows).getvalue())
+        response = self.client.post(reverse('accounts:leader_import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(User.objects.filter(username='ok').exists())
+
+        report = response.context['report']
+        response = self.client.get(reverse('accounts:leader_import_report', args=[report]))
+        self.assertEqual(response.status_code, 200)
+        # streaming_content oxirigacha o'qilganda test client faylni o'zi yopadi
+        self.assertIn("to'ldirilmagan", b''.join(response.streaming_content).decode('utf-8-sig'))
+
+
+class GeographyLoadTests(TestCase):
+    header = ['viloyat_kod', 'viloyat', 'tuman_kod', 'tuman', 'mahalla_kod', 'mahalla', 'aholi', 'yoshlar']
+
+    def _csv(self, rows, header=None):
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(header or self.header)
+        writer.writerows(rows)
+        return io.BytesIO(out.getvalue().encode('utf-8-sig'))
+
+    def _rows(self, regions=2, districts=2, mahallas=3):
+        return [
+            [f'R{r}', f'Viloyat {r}', f'D{d}', f'Tuman {r}-{d}', f'M{m}', f'Mahalla {r}-{d}-{m}', 1000 + m, 100 + m]
+            for r in range(regions) for d in range(districts) for m in range(mahallas)
+        ]
+
+    def test_upsert_and_deactivate(self):
+        # 3 upsert + 2 ID xaritasi + 3 faolsizlantirish + versiya (+ savepoint) — qatorlar soniga bog'liq emas
+        with self.assertNumQueries(11):
+            result = load_geography(self._csv(self._rows()), 'geo.csv')
+        self.assertEqual((result.regions, result.districts, result.mahallas), (2, 4, 12))
+        self.assertEqual(Mahalla.objects.count(), 12)
+        mahalla = Mahalla.objects.get(district__region__code='R1', district__code='D0', code='M2')
+        self.assertEqual((mahalla.population, mahalla.youth_count), (1002, 102))
+
+        rows = self._rows(regions=1)
+        rows[0][5] = "Yangi nom"
+        rows[0][6] = 5
+        result = load_geography(self._csv(rows), 'geo.csv')
+
+        self.assertEqual(Mahalla.objects.count(), 12)
+        self.assertEqual(result.deactivated, {'regions': 1, 'districts': 2, 'mahallas': 6})
+        renamed = Mahalla.objects.get(district__region__code='R0', district__code='D0', code='M0')
+        self.assertEqual((renamed.name, renamed.population, renamed.is_active), ("Yangi nom", 5, True))
+        self.assertFalse(Region.objects.get(code='R1').is_active)
+        self.assertFalse(Mahalla.objects.filter(district__region__code='R1', is_active=True).exists())
+
+        # Qayta paydo bo'lgan hudud yana faol
+        load_geography(self._csv(self._rows()), 'geo.csv')
+        self.assertEqual(Mahalla.objects.filter(is_active=True).count(), 12)
+
+    def test_dropped_district_deactivated(self):
+        load_geography(self._csv(self._rows()), 'geo.csv')
+        # R0 viloyati faylda qoladi, lekin uning D1 tumani olib tashlangan
+        rows = [row for row in self._rows() if (row[0], row[2]) != ('R0', 'D1')]
+        result = load_geography(self._csv(rows), 'geo.csv')
+
+        self.assertEqual(result.deactivated, {'regions': 0, 'districts': 1, 'mahallas': 3})
+        self.assertFalse(District.objects.get(region__code='R0', code='D1').is_active)
+        self.assertTrue(District.objects.get(region__code='R0', code='D0').is_active)
+        self.assertEqual(District.objects.filter(is_active=True).count(), 3)
+
+    def test_missing_count_columns_keep_values(self):
+        load_geography(self._csv(self._rows(regions=1)), 'geo.csv')
+        rows = [row[:6] for row in self._rows(regions=1)]
+        rows[0][5] = "Faqat nom"
+        load_geography(self._csv(rows, self.header[:6]), 'geo.csv')
+
+        mahalla = Mahalla.objects.get(name="Faqat nom")
+        self.assertEqual((mahalla.population, mahalla.youth_count), (1000, 100))
+
+    def test_blank_counts_keep_values(self):
+        load_geography(self._csv(self._rows(regions=1)), 'geo.csv')
+        rows = self._rows(regions=1)
+        rows[0][6] = ''
+        rows[1][6] = rows[1][7] = ''
+        rows[2][6] = 7
+        load_geography(self._csv(rows), 'geo.csv')
+
+        mahallas = Mahalla.objects.filter(district__region__code='R0', district__code='D0')
+        self.assertEqual(
+            dict(mahallas.values_list('code', 'population')), {'M0': 1000, 'M1': 1001, 'M2': 7}
+        )
+        self.assertEqual(mahallas.get(code='M1').youth_count, 101)
+        self.assertEqual(mahallas.filter(is_active=True).count(), 3)
+
+    def test_errors_skip_deactivation(self):
+        load_geography(self._csv(self._rows()), 'geo.csv')
+        rows = self._rows(regions=1)
+        rows[1][6] = "ko'p"
+        rows[2][3] = ''
+        result = load_geography(self._csv(rows), 'geo.csv')
+
+        self.assertEqual([number for number, _, _ in result.errors], [3, 4])
+        self.assertEqual(result.deactivated, {})
+        self.assertEqual(Mahalla.objects.filter(is_active=True).count(), 12)
+
+    def test_admin_upload(self):
+        admin_user = User.objects.create_superuser('root', password='x')
+        self.client.force_login(admin_user)
+        upload = SimpleUploadedFile('geo.csv', self._csv(self._rows(regions=1)).getvalue())
+        response = self.client.post(reverse('admin:accounts_region_load'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].mahallas, 6)
+        self.assertEqual(Mahalla.objects.count(), 6)
+
+
+class GeographyTreeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(regions=2, districts=2, mahallas=2, leaders=1)
+        cls.region = cls.dataset.regions[0]
+
+    def setUp(self):
+        geography.clear()
+        self.client.force_login(self.dataset.admin)
+
+    def test_tree_cached_until_version_changes(self):
+        # versiya + uch daraja
+        with self.assertNumQueries(4):
+            tree = geography.get_tree()
+        with self.assertNumQueries(0):
+            self.assertIs(geography.get_tree(), tree)
+
+        districts = tree.children('districts', self.region.pk)
+        self.assertEqual(
+            [d.pk for d in districts],
+            list(self.region.districts.order_by('name').values_list('pk', flat=True))
+        )
+        self.assertEqual(tree.children('mahallas', 0), [])
+
+        district = District.objects.get(pk=districts[0].pk)
+        district.name = "Yangi tuman"
+        with self.captureOnCommitCallbacks(execute=True):
+            district.save()
+
+        tree = geography.get_tree()
+        self.assertIn("Yangi tuman", [d.name for d in tree.children('districts', self.region.pk)])
+
+    def test_version_shared_through_database(self):
+        tree = geography.get_tree()
+        etag = self.client.get(reverse('accounts:geography_children', args=['regions']))['ETag']
+
+        # Boshqa worker hududni o'zgartirdi — faqat bazadagi versiya oshadi
+        GeographyVersion.objects.filter(pk=geography.VERSION_PK).update(version=F('version') + 1)
+        with self.assertNumQueries(0):
+            self.assertIs(geography.get_tree(), tree)
+
+        with override_settings(GEOGRAPHY_VERSION_CHECK_SECONDS=0):
+            self.assertIsNot(geography.get_tree(), tree)
+            response = self.client.get(reverse('accounts:geography_children', args=['regions']))
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_invalidate_rolled_back_with_transaction(self):
+        before = geography.version()
+        with transaction.atomic():
+            Region.objects.get(pk=self.region.pk).save()
+            transaction.set_rollback(True)
+        geography.clear()
+        self.assertEqual(geography.version(), before)
+
+    def test_inactive_hidden(self):
+        Region.objects.filter(pk=self.region.pk).update(is_active=False)
+        self.assertNotIn(self.region.pk, [r.pk for r in geography.get_tree().regions])
+
+    def test_children_endpoint(self):
+        url = reverse('accounts:geography_children', args=['districts'])
+        response = self.client.get(url, {'parent': self.region.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {item['id'] for item in response.json()['items']},
+            set(self.region.districts.values_list('pk', flat=True))
+        )
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('max-age', response['Cache-Control'])
+
+        # Faqat sessiya va foydalanuvchi — daraxt yuklanmaydi
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                url, {'parent': self.region.pk}, headers={'if-none-match': response['ETag']}
+            )
+        self.assertEqual(response.status_code, 304)
+
+        self.assertEqual(self.client.get(url).status_code, 400)
+        response = self.client.get(reverse('accounts:geography_children', args=['streets']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_leader_edit_renders_only_current_branch(self):
+        leader = self.dataset.leader
+        response = self.client.get(reverse('accounts:leader_edit', args=[leader.pk]))
+        self.assertEqual(
+            [m.pk for m in response.context['mahallas']],
+            list(Mahalla.objects.filter(district_id=leader.district_id).order_by('name')
+                 .values_list('pk', flat=True))
+        )
@@ -8,7 +8,10 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('leaders/', views.leader_list, name='leader_list'),
     path('leaders/create/', views.leader_create, name='leader_create'),
+    path('leaders/import/', views.leader_import, name='leader_import'),
+    path('leaders/import/report/<str:name>/', views.leader_import_report, name='leader_import_report'),
     path('leaders/<int:pk>/', views.leader_detail, name='leader_detail'),
     path('leaders/<int:pk>/edit/', views.leader_edit, name='leader_edit'),
     path('leaders/<int:pk>/delete/', views.leader_delete, name='leader_delete'),
+    path('geography/<slug:level>/', views.geography_children, name='geography_children'),
 ]
\ No newline at end of file
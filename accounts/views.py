@@ -1,12 +1,22 @@
+import os
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
+from django.core.files.storage import default_storage
 from django.db.models import Q, Count
+from django.http import FileResponse, Http404, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_GET
 
-from .models import User, Region, District, Mahalla
+from . import geography
+from .imports import REPORT_DIR, import_leaders, save_error_report
+from .models import User
 from tasks.models import TaskAssignment
+from config.pagination import EstimatedCountPaginator
+from .search import search_leaders
 
 
 def login_view(request):
@@ -51,7 +61,7 @@ def leader_list(request):
     """Yetakchilar ro'yxati"""
 
     leaders = User.objects.filter(role=User.Role.LEADER).select_related(
-        'region', 'district', 'mahalla'
+        'region', 'district__region', 'mahalla'
     ).annotate(
         tasks_count=Count('task_assignments'),
         completed_count=Count(
@@ -73,21 +83,20 @@ def leader_list(request):
     if district:
         leaders = leaders.filter(district_id=district)
     if search:
-        leaders = leaders.filter(
-            Q(first_name__icontains=search) |
-            Q(last_name__icontains=search) |
-            Q(username__icontains=search) |
-            Q(phone__icontains=search)
-        )
+        leaders = search_leaders(leaders, search)
+        if 'search_rank' in leaders.query.annotations:
+            leaders = leaders.order_by('-search_rank', '-created_at')
 
     # Pagination
-    paginator = Paginator(leaders, 20)
+    paginator = EstimatedCountPaginator(leaders, 20)
     page = request.GET.get('page')
     leaders = paginator.get_page(page)
 
-    # Filter uchun ma'lumotlar
-    regions = Region.objects.filter(is_active=True)
-    districts = District.objects.filter(is_active=True)
+    # Filter uchun ma'lumotlar — keshlangan daraxtdan; tumanlar faqat
+    # tanlangan viloyatniki (qolganlari JS bilan yuklanadi)
+    tree = geography.get_tree()
+    regions = tree.regions
+    districts = tree.children('districts', int(region)) if region and region.isdigit() else []
 
     context = {
         'leaders': leaders,
@@ -141,33 +150,115 @@ def leader_create(request):
         except Exception as e:
             messages.error(request, f"Xatolik: {str(e)}")
 
-    regions = Region.objects.filter(is_active=True)
-
     context = {
-        'regions': regions,
+        'regions': geography.get_tree().regions,
     }
 
     return render(request, 'accounts/leader_form.html', context)
 
 
+@login_required
+def leader_import(request):
+    """Yetakchilarni Excel/CSV fayldan ommaviy qo'shish"""
+
+    context = {}
+
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if not upload:
+            messages.error(request, "Fayl tanlanmagan!")
+        else:
+            try:
+                result = import_leaders(upload.file, upload.name)
+            except ValueError as e:
+                messages.error(request, f"Xatolik: {e}")
+            else:
+                messages.success(
+                    request,
+                    f"{result.created} ta yetakchi qo'shildi ({result.duration:.1f} s)."
+                )
+                if not result.errors:
+                    return redirect('accounts:leader_list')
+
+                context = {
+                    'result': result,
+                    'errors': result.errors[:50],
+                    'report': save_error_report(result.errors),
+                }
+
+    return render(request, 'accounts/leader_import.html', context)
+
+
+@login_required
+def leader_import_report(request, name):
+    """Import xatolari hisobotini yuklab olish"""
+
+    path = f"{REPORT_DIR}/{os.path.basename(name)}"
+    if not default_storage.exists(path):
+        raise Http404
+    return FileResponse(
+        default_storage.open(path, 'rb'),
+        as_attachment=True,
+        filename=os.path.basename(path),
+        content_type='text/csv',
+    )
+
+
+def _geography_etag(request, level):
+    return f"geo-{geography.version()}"
+
+
+@login_required
+@require_GET
+@condition(etag_func=_geography_etag)
+def geography_children(request, level):
+    """
+    Bog'langan select lar uchun hududlar: /geography/regions/,
+    /geography/districts/?parent=<viloyat>, /geography/mahallas/?parent=<tuman>.
+    """
+
+    if level not in geography.LEVELS:
+        raise Http404
+
+    parent = request.GET.get('parent')
+    if level != 'regions':
+        if not (parent and parent.isdigit()):
+            return JsonResponse({'detail': "parent ko'rsatilmagan"}, status=400)
+        parent = int(parent)
+
+    tree = geography.get_tree()
+    response = JsonResponse({
+        'version': tree.version,
+        'items': [{'id': area.pk, 'name': area.name} for area in tree.children(level, parent)],
+    })
+    patch_cache_control(response, private=True, max_age=settings.GEOGRAPHY_HTTP_MAX_AGE)
+    return response
+
+
 @login_required
 def leader_detail(request, pk):
     """Yetakchi profili"""
 
-    leader = get_object_or_404(User, pk=pk, role=User.Role.LEADER)
+    leader = get_object_or_404(
+        User.objects.select_related('region', 'district__region', 'mahalla__district'),
+        pk=pk,
+        role=User.Role.LEADER
+    )
 
-    # Vazifalar statistikasi
-    assignments = TaskAssignment.objects.filter(leader=leader).select_related('task')
+    # Vazifalar statistikasi — bitta aggregate so'rov
+    assignments = TaskAssignment.objects.filter(leader=leader)
 
-    stats = {
-        'total': assignments.count(),
-        'pending': assignments.filter(status=TaskAssignment.Status.PENDING).count(),
-        'in_progress': assignments.filter(status=TaskAssignment.Status.IN_PROGRESS).count(),
-        'completed': assignments.filter(status=TaskAssignment.Status.COMPLETED).count(),
-    }
+    stats = assignments.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status=TaskAssignment.Status.PENDING)),
+        in_progress=Count('id', filter=Q(status=TaskAssignment.Status.IN_PROGRESS)),
+        completed=Count('id', filter=Q(status=TaskAssignment.Status.COMPLETED)),
+    )
 
     # Oxirgi vazifalar
-    recent_assignments = assignments.order_by('-sent_at')[:10]
+    recent_assignments = assignments.with_progress().select_related(
+        'task'
+    ).order_by('-sent_at')[:10]
 
     context = {
         'leader': leader,
@@ -209,15 +300,14 @@ def leader_edit(request, pk):
         messages.success(request, "Yetakchi ma'lumotlari yangilandi!")
         return redirect('accounts:leader_detail', pk=pk)
 
-    regions = Region.objects.filter(is_active=True)
-    districts = District.objects.filter(is_active=True)
-    mahallas = Mahalla.objects.filter(is_active=True)
+    # Faqat joriy viloyat tumanlari va joriy tuman mahallalari
+    tree = geography.get_tree()
 
     context = {
         'leader': leader,
-        'regions': regions,
-        'districts': districts,
-        'mahallas': mahallas,
+        'regions': tree.regions,
+        'districts': tree.children('districts', leader.region_id),
+        'mahallas': tree.children('mahallas', leader.district_id),
         'status_choices': User.Status.choices,
     }
 
@@ -0,0 +1,35 @@
+import hmac
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+
+def _check_bot_token(request):
+    expected = settings.BOT_API_TOKEN
+    given = request.headers.get('X-Bot-Token', '')
+    return bool(expected) and hmac.compare_digest(given, expected)
+
+
+def bot_token_required(view_func):
+    """
+    Bot so'rovlarini X-Bot-Token sarlavhasi orqali tekshirish.
+    Sync va async viewlar uchun ishlaydi.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _view(request, *args, **kwargs):
+            if not _check_bot_token(request):
+                return JsonResponse({'detail': "Ruxsat yo'q"}, status=403)
+            return await view_func(request, *args, **kwargs)
+
+        return _view
+
+    @wraps(view_func)
+    def _view(request, *args, **kwargs):
+        if not _check_bot_token(request):
+            return JsonResponse({'detail': "Ruxsat yo'q"}, status=403)
+        return view_func(request, *args, **kwargs)
+
+    return _view
@@ -0,0 +1,140 @@
+"""
+Tezkor JSON qatlam.
+
+ModelSerializer o'rniga values_list() kortejlari va oldindan hisoblangan
+maydon xaritalari ishlatiladi. orjson o'rnatilgan bo'lsa C-enkoder bilan
+yoziladi, aks holda standart json. Katta javoblar gzip bilan siqiladi.
+"""
+import gzip
+import json
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+GZIP_MIN_SIZE = 1024
+
+# Resource.plan keshidagi fieldsetlar soni chegarasi
+PLAN_CACHE_SIZE = 256
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError
+
+
+def dumps(data):
+    """Ma'lumotni JSON baytlarga aylantirish"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+
+
+class Resource:
+    """
+    Chiqish kalitlari -> ORM lookup xaritasi.
+    fields= so'rovlari uchun tanlangan ustunlar keshlanadi.
+    """
+
+    def __init__(self, fields, default=None):
+        self.fields = dict(fields)
+        self.default = tuple(default or self.fields)
+        self._plans = {}
+
+    def plan(self, requested=None):
+        """
+        (kalitlar, lookuplar) — har bir fieldset uchun bir marta hisoblanadi.
+        Kesh kaliti mijoz yuborgan kortej emas, filtrlangan va takrorsiz
+        kalitlar — noma'lum maydonlar keshni to'ldira olmaydi.
+        """
+        keys = tuple(dict.fromkeys(k for k in requested or () if k in self.fields))
+        keys = keys or self.default
+        plan = self._plans.get(keys)
+        if plan is None:
+            if len(self._plans) >= PLAN_CACHE_SIZE:
+                self._plans.clear()
+            plan = self._plans[keys] = (keys, tuple(self.fields[k] for k in keys))
+        return plan
+
+    def rows(self, queryset, requested=None):
+        keys, lookups = self.plan(requested)
+        return keys, list(queryset.values_list(*lookups))
+
+    async def arows(self, queryset, requested=None):
+        keys, lookups = self.plan(requested)
+        return keys, [row async for row in queryset.values_list(*lookups)]
+
+
+def requested_fields(request):
+    """?fields=id,title -> ('id', 'title')"""
+    raw = request.GET.get('fields')
+    if not raw:
+        return None
+    return tuple(f.strip() for f in raw.split(',') if f.strip())
+
+
+def accepts_gzip(header):
+    """
+    Accept-Encoding ni q-qiymatlari bilan tahlil qilish.
+    "gzip;q=0" — rad etilgan; "*" gzip nomi bo'lmasa uni ham qamraydi.
+    """
+    quality = {}
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        quality[coding.strip().lower()] = q
+    return quality.get('gzip', quality.get('*', 0)) > 0
+
+
+def payload(request, keys, rows, **extra):
+    """
+    Oddiy format: {"results": [{...}, ...]}
+    ?format=compact: {"fields": [...], "rows": [[...], ...]}
+    """
+    if request.GET.get('format') == 'compact':
+        data = {'fields': keys, 'rows': rows}
+    else:
+        data = {'results': [dict(zip(keys, row)) for row in rows]}
+    data['count'] = len(rows)
+    data.update(extra)
+    return data
+
+
+class FastJsonResponse(HttpResponse):
+    """orjson + ixtiyoriy gzip bilan JSON javob"""
+
+    def __init__(self, data, request=None, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        content = dumps(data)
+
+        compress = (
+            request is not None
+            and len(content) >= GZIP_MIN_SIZE
+            and accepts_gzip(request.headers.get('Accept-Encoding', ''))
+        )
+        if compress:
+            content = gzip.compress(content, compresslevel=5)
+
+        super().__init__(content, **kwargs)
+
+        if request is not None:
+            patch_vary_headers(self, ('Accept-Encoding',))
+        if compress:
+            self['Content-Encoding'] = 'gzip'
@@ -0,0 +1,64 @@
+from tasks.models import Question
+from .fastjson import Resource
+
+
+TASK = Resource({
+    'id': 'id',
+    'title': 'title',
+    'status': 'status',
+    'priority': 'priority',
+    'type': 'task_type',
+    'deadline': 'deadline',
+    'assigned': 'stats_total_assigned',
+    'completed': 'stats_total_completed',
+    'completion_rate': 'stats_completion_rate',
+    'created_at': 'created_at',
+})
+
+# order — vazifadagi o'rin (1 dan); querysetga ordering.position() annotatsiyasi kerak,
+# Question.order ning o'zi siyrak kalit va tashqariga chiqarilmaydi
+QUESTION = Resource({
+    'id': 'id',
+    'order': 'position',
+    'text': 'text',
+    'type': 'question_type',
+    'is_required': 'is_required',
+    'choices': 'choices',
+    'help_text': 'help_text',
+    'placeholder': 'placeholder',
+})
+
+INBOX = Resource({
+    'id': 'id',
+    'status': 'status',
+    'task_id': 'task_id',
+    'title': 'task__title',
+    'priority': 'task__priority',
+    'deadline': 'task__deadline',
+    'questions': 'task__questions_count',
+    'answered': 'answers_count',
+})
+
+RESULT = Resource({
+    'assignment': 'id',
+    'leader_id': 'leader_id',
+    'first_name': 'leader__first_name',
+    'last_name': 'leader__last_name',
+    'phone': 'leader__phone',
+    'mahalla': 'leader__mahalla__name',
+    'completed_at': 'completed_at',
+})
+
+# Answer.values_list(*ANSWER_COLUMNS) dagi qiymat ustuni indeksi (savol turi bo'yicha)
+ANSWER_COLUMNS = (
+    'assignment_id', 'question_id', 'value_text', 'value_number',
+    'value_choice', 'value_multiple', 'value_boolean', 'value_date',
+)
+ANSWER_VALUE_INDEX = {
+    Question.Type.NUMBER: 3,
+    Question.Type.CHOICE: 4,
+    Question.Type.MULTIPLE: 5,
+    Question.Type.YES_NO: 6,
+    Question.Type.DATE: 7,
+}
+ANSWER_TEXT_INDEX = 2
@@ -1,3 +1,274 @@
-from django.test import TestCase
+import gzip
+import json
+import uuid
 
-# Create your tests here.
+from django.db.models import F
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from api import fastjson, resources
+from benchmarks import dataset
+from benchmarks.querybudget import QueryBudgetMixin
+from tasks.models import TaskAssignment
+
+
+@override_settings(BOT_API_TOKEN='test-token')
+class ApiQueryBudgetTests(QueryBudgetMixin, TestCase):
+    namespaces = ['api']
+    headers = {'X-Bot-Token': 'test-token'}
+    budgets = {
+        'api:bot_inbox': (2, lambda t: [t.dataset.leader.telegram_id]),
+        'api:bot_next_question': (3, lambda t: [t.dataset.leader.telegram_id, t.assignment.pk]),
+        'api:bot_transition': (None, None),
+        'api:bot_sync': (None, None),
+        'api:task_list': (3, None),
+        'api:task_status': (3, lambda t: [t.dataset.task.pk]),
+        'api:task_questions': (3, lambda t: [t.dataset.task.pk]),
+        'api:task_results': (6, lambda t: [t.dataset.task.pk]),
+        'api:dashboard_counters': (5, None),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        leader = cls.dataset.leader
+        leader.telegram_id = 100001
+        leader.save(update_fields=['telegram_id'])
+        cls.assignment = leader.task_assignments.first()
+
+    def test_routes_have_budgets(self):
+        self.assertBudgetsCovered()
+
+    def test_query_budgets(self):
+        self.assertQueryBudgets()
+
+
+@override_settings(BOT_API_TOKEN='test-token')
+class AsyncViewTests(TestCase):
+    headers = {'X-Bot-Token': 'test-token'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(tasks=2, questions=3, completion=0)
+        cls.leader = cls.dataset.leader
+        cls.leader.telegram_id = 100002
+        cls.leader.save(update_fields=['telegram_id'])
+        cls.assignment = cls.leader.task_assignments.filter(
+            answers_count__lt=F('task__questions_count')
+        ).select_related('task').first()
+
+    def inbox_url(self, telegram_id=None):
+        return reverse('api:bot_inbox', args=[telegram_id or self.leader.telegram_id])
+
+    async def test_bot_inbox(self):
+        response = await self.async_client.get(self.inbox_url(), headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['count'], len(self.dataset.tasks))
+        self.assertIn(str(self.assignment.pk), {row['id'] for row in data['results']})
+
+    async def test_bot_inbox_requires_token(self):
+        response = await self.async_client.get(self.inbox_url())
+        self.assertEqual(response.status_code, 403)
+
+        response = await self.async_client.get(
+            self.inbox_url(), headers={'X-Bot-Token': 'wrong'}
+        )
+        self.assertEqual(response.status_code, 403)
+
+    async def test_bot_inbox_unknown_leader(self):
+        response = await self.async_client.get(self.inbox_url(999999), headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_bot_next_question(self):
+        url = reverse('api:bot_next_question', args=[self.leader.telegram_id, self.assignment.pk])
+        response = await self.async_client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['assignment'], str(self.assignment.pk))
+        answered = [a async for a in self.assignment.answers.values_list('question_id', flat=True)]
+        expected = await self.assignment.task.questions.exclude(
+            pk__in=answered
+        ).order_by('order').afirst()
+        self.assertEqual(data['question']['id'], str(expected.pk))
+        # order — siyrak kalit emas, ro'yxatdagi o'rin
+        position = await self.assignment.task.questions.filter(order__lte=expected.order).acount()
+        self.assertEqual(data['question']['order'], position)
+
+        other = await TaskAssignment.objects.exclude(leader=self.leader).afirst()
+        url = reverse('api:bot_next_question', args=[self.leader.telegram_id, other.pk])
+        response = await self.async_client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_task_questions_positions(self):
+        await self.async_client.aforce_login(self.dataset.admin)
+        url = reverse('api:task_questions', args=[self.dataset.task.pk])
+        data = json.loads((await self.async_client.get(url)).content)
+
+        ids = [str(pk) async for pk in self.dataset.task.questions.order_by('order').values_list('pk', flat=True)]
+        self.assertEqual([row['id'] for row in data['results']], ids)
+        self.assertEqual([row['order'] for row in data['results']], list(range(1, len(ids) + 1)))
+
+    async def test_panel_requires_login(self):
+        url = reverse('api:task_status', args=[self.dataset.task.pk])
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 302)
+
+    async def test_panel_views(self):
+        await self.async_client.aforce_login(self.dataset.admin)
+
+        response = await self.async_client.get(reverse('api:task_status', args=[self.dataset.task.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['id'], str(self.dataset.task.pk))
+
+        response = await self.async_client.get(reverse('api:task_status', args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.async_client.get(reverse('api:task_list'), {'limit': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.async_client.get(reverse('api:dashboard_counters'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['tasks']['total'], len(self.dataset.tasks))
+
+
+@override_settings(BOT_API_TOKEN='test-token')
+class BotTransitionTests(TestCase):
+    headers = {'X-Bot-Token': 'test-token'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(tasks=2, questions=2, completion=0)
+        cls.leader = cls.dataset.leader
+        cls.leader.telegram_id = 100003
+        cls.leader.save(update_fields=['telegram_id'])
+        cls.assignments = list(cls.leader.task_assignments.all())
+        TaskAssignment.objects.filter(pk__in=[a.pk for a in cls.assignments]).update(
+            status=TaskAssignment.Status.PENDING
+        )
+
+    def post(self, payload, telegram_id=None):
+        url = reverse('api:bot_transition', args=[telegram_id or self.leader.telegram_id])
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        return self.client.post(url, body, content_type='application/json', headers=self.headers)
+
+    def test_transition(self):
+        ids = [str(a.pk) for a in self.assignments]
+        response = self.post({'ids': ids, 'status': 'seen'})
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['status'], 'seen')
+        self.assertEqual(sorted(str(pk) for pk in data['updated']), sorted(ids))
+
+        # Takroriy so'rov hech narsani o'zgartirmaydi
+        response = self.post({'ids': ids, 'status': 'seen'})
+        self.assertEqual(json.loads(response.content)['updated'], [])
+
+    def test_other_leaders_assignments_ignored(self):
+        other = TaskAssignment.objects.exclude(leader=self.leader).filter(
+            status=TaskAssignment.Status.PENDING
+        ).first()
+        response = self.post({'ids': [str(other.pk)], 'status': 'completed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['updated'], [])
+        other.refresh_from_db()
+        self.assertEqual(other.status, TaskAssignment.Status.PENDING)
+
+    def test_completed_requires_answers(self):
+        assignment = self.assignments[0]
+        response = self.post({'ids': [str(assignment.pk)], 'status': 'completed'})
+        self.assertEqual(json.loads(response.content)['updated'], [])
+
+        TaskAssignment.objects.filter(pk=assignment.pk).update(answers_count=assignment.task.questions_count)
+        response = self.post({'ids': [str(assignment.pk)], 'status': 'completed'})
+        self.assertEqual(json.loads(response.content)['updated'], [str(assignment.pk)])
+
+    def test_bad_requests(self):
+        ids = [str(self.assignments[0].pk)]
+        for payload in ('{', {'ids': ids}, {'ids': ids, 'status': 'pending'},
+                        {'ids': 'x', 'status': 'seen'}, {'ids': ['not-a-uuid'], 'status': 'seen'}):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post(payload).status_code, 400)
+
+    def test_requires_token_and_post(self):
+        url = reverse('api:bot_transition', args=[self.leader.telegram_id])
+        self.assertEqual(self.client.post(url, '{}', content_type='application/json').status_code, 403)
+        self.assertEqual(self.client.get(url, headers=self.headers).status_code, 405)
+        self.assertEqual(self.post({'ids': [], 'status': 'seen'}, telegram_id=999999).status_code, 404)
+
+
+class FastJsonTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(tasks=3, questions=2, completion=0)
+
+    def setUp(self):
+        self.client.force_login(self.dataset.admin)
+
+    def test_plan_normalizes_requested_fields(self):
+        resource = fastjson.Resource({'id': 'id', 'title': 'title', 'status': 'status'})
+
+        self.assertEqual(resource.plan(('title', 'bogus', 'title', 'id')), (('title', 'id'), ('title', 'id')))
+        self.assertEqual(resource.plan(('bogus',)), resource.plan())
+        self.assertEqual(set(resource._plans), {('title', 'id'), ('id', 'title', 'status')})
+
+        for i in range(fastjson.PLAN_CACHE_SIZE * 2):
+            resource.plan((f'x{i}', 'id'))
+        self.assertEqual(len(resource._plans), 3)
+
+    def test_plan_cache_is_bounded(self):
+        fields = {f'f{i}': f'f{i}' for i in range(12)}
+        resource = fastjson.Resource(fields)
+        for i in range(fastjson.PLAN_CACHE_SIZE * 2):
+            resource.plan((f'f{i % 12}', f'f{i // 12 % 12}'))
+        self.assertLessEqual(len(resource._plans), fastjson.PLAN_CACHE_SIZE)
+
+    def test_accepts_gzip(self):
+        cases = {
+            '': False,
+            'gzip': True,
+            'gzip, deflate, br': True,
+            'GZIP;q=0.5': True,
+            'gzip;q=0': False,
+            'br, gzip; q=0.0': False,
+            '*': True,
+            '*;q=0': False,
+            'gzip;q=0, *': False,
+            'identity': False,
+            'gzip;q=abc': False,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertIs(fastjson.accepts_gzip(header), expected)
+
+    def test_gzip_response(self):
+        factory = RequestFactory()
+        data = {'results': ['x' * 100] * 20}
+
+        response = fastjson.FastJsonResponse(data, factory.get('/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content)), data)
+
+        response = fastjson.FastJsonResponse(data, factory.get('/', HTTP_ACCEPT_ENCODING='gzip;q=0'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(json.loads(response.content), data)
+
+        small = fastjson.FastJsonResponse({'ok': True}, factory.get('/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+    def test_sparse_fields(self):
+        url = reverse('api:task_list')
+
+        data = json.loads(self.client.get(url, {'fields': 'title, id,bogus'}).content)
+        self.assertEqual(data['count'], len(self.dataset.tasks))
+        self.assertEqual([set(row) for row in data['results']], [{'id', 'title'}] * data['count'])
+
+        data = json.loads(self.client.get(url, {'fields': 'bogus'}).content)
+        self.assertEqual(set(data['results'][0]), set(resources.TASK.default))
+
+        data = json.loads(self.client.get(url, {'fields': 'id,status', 'format': 'compact'}).content)
+        self.assertEqual(data['fields'], ['id', 'status'])
+        self.assertEqual(len(data['rows']), data['count'])
+        self.assertEqual(len(data['rows'][0]), 2)
@@ -4,5 +4,24 @@ from . import views
 app_name = 'api'
 
 urlpatterns = [
-    # Keyinroq qo'shamiz
-]
\ No newline at end of file
+    # Bot
+    path('bot/<int:telegram_id>/inbox/', views.bot_inbox, name='bot_inbox'),
+    path(
+        'bot/<int:telegram_id>/assignments/<uuid:pk>/next/',
+        views.bot_next_question,
+        name='bot_next_question'
+    ),
+    path(
+        'bot/<int:telegram_id>/assignments/transition/',
+        views.bot_transition,
+        name='bot_transition'
+    ),
+    path('bot/<int:telegram_id>/sync/', views.bot_sync, name='bot_sync'),
+
+    # Panel
+    path('tasks/', views.task_list, name='task_list'),
+    path('tasks/<uuid:pk>/status/', views.task_status, name='task_status'),
+    path('tasks/<uuid:pk>/questions/', views.task_questions, name='task_questions'),
+    path('tasks/<uuid:pk>/results/', views.task_results, name='task_results'),
+    path('dashboard/counters/', views.dashboard_counters, name='dashboard_counters'),
+]
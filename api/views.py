@@ -1,3 +1,261 @@
-from django.shortcuts import render
+import json
 
-# Create your views here.
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Q
+from django.http import JsonResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from tasks import ordering
+from tasks.models import Task, Question, TaskAssignment, Answer
+from tasks.services import TRANSITIONS, transition_assignments, sync_answers
+from accounts.models import User
+from . import resources
+from .decorators import bot_token_required
+from .fastjson import FastJsonResponse, payload, requested_fields
+
+
+async def _get_leader(telegram_id):
+    try:
+        return await User.objects.aget(
+            telegram_id=telegram_id,
+            role=User.Role.LEADER,
+            status=User.Status.ACTIVE
+        )
+    except User.DoesNotExist:
+        raise Http404("Yetakchi topilmadi")
+
+
+@bot_token_required
+async def bot_inbox(request, telegram_id):
+    """Yetakchining ochiq vazifalari (bot uchun)"""
+
+    leader = await _get_leader(telegram_id)
+
+    assignments = TaskAssignment.objects.filter(
+        leader=leader,
+        task__status=Task.Status.ACTIVE
+    ).exclude(
+        status=TaskAssignment.Status.COMPLETED
+    ).order_by('task__deadline')
+
+    keys, rows = await resources.INBOX.arows(assignments, requested_fields(request))
+
+    return FastJsonResponse(payload(request, keys, rows), request)
+
+
+@bot_token_required
+async def bot_next_question(request, telegram_id, pk):
+    """Tayinlash bo'yicha keyingi javobsiz savol"""
+
+    leader = await _get_leader(telegram_id)
+
+    try:
+        assignment = await TaskAssignment.objects.aget(pk=pk, leader=leader)
+    except TaskAssignment.DoesNotExist:
+        raise Http404("Tayinlash topilmadi")
+
+    keys, lookups = resources.QUESTION.plan(requested_fields(request))
+    row = await Question.objects.filter(
+        task_id=assignment.task_id
+    ).annotate(
+        position=ordering.position()
+    ).exclude(
+        id__in=Answer.objects.filter(assignment=assignment).values('question_id')
+    ).order_by('order').values_list(*lookups).afirst()
+
+    return FastJsonResponse({
+        'assignment': assignment.pk,
+        'status': assignment.status,
+        'question': dict(zip(keys, row)) if row else None,
+    }, request)
+
+
+@csrf_exempt
+@require_POST
+@bot_token_required
+def bot_transition(request, telegram_id):
+    """
+    Tayinlashlarni ommaviy holatga o'tkazish.
+    Body: {"ids": [...], "status": "seen" | "in_progress" | "completed"}
+    completed faqat barcha savollarga javob berilgan tayinlashlarga qo'llanadi.
+    """
+
+    leader = get_object_or_404(
+        User,
+        telegram_id=telegram_id,
+        role=User.Role.LEADER,
+        status=User.Status.ACTIVE
+    )
+
+    try:
+        payload = json.loads(request.body)
+        ids = payload['ids']
+        status = payload['status']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'detail': "Noto'g'ri so'rov"}, status=400)
+
+    if status not in TRANSITIONS or not isinstance(ids, list):
+        return JsonResponse({'detail': "Noto'g'ri holat yoki ro'yxat"}, status=400)
+
+    try:
+        updated = transition_assignments(ids, status, leader=leader)
+    except ValidationError:
+        return JsonResponse({'detail': "Noto'g'ri ID"}, status=400)
+
+    return JsonResponse({'status': status, 'updated': updated})
+
+
+@csrf_exempt
+@require_POST
+@bot_token_required
+def bot_sync(request, telegram_id):
+    """
+    Offline javoblarni bitta so'rovda sinxronlash.
+    Body: {"answers": [{"key", "assignment", "question", "value", "client_ts"}, ...]}
+    """
+
+    leader = get_object_or_404(
+        User,
+        telegram_id=telegram_id,
+        role=User.Role.LEADER,
+        status=User.Status.ACTIVE
+    )
+
+    try:
+        items = json.loads(request.body)['answers']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'detail': "Noto'g'ri so'rov"}, status=400)
+
+    if not isinstance(items, list):
+        return JsonResponse({'detail': "answers ro'yxat bo'lishi kerak"}, status=400)
+
+    return JsonResponse(sync_answers(leader, items))
+
+
+@login_required
+async def task_list(request):
+    """Vazifalar ro'yxati (panel uchun)"""
+
+    tasks = Task.objects.order_by('-created_at')
+
+    status = request.GET.get('status')
+    if status:
+        tasks = tasks.filter(status=status)
+
+    try:
+        limit = min(int(request.GET.get('limit', 100)), 500)
+        offset = max(int(request.GET.get('offset', 0)), 0)
+    except ValueError:
+        return JsonResponse({'detail': "Noto'g'ri limit/offset"}, status=400)
+
+    keys, rows = await resources.TASK.arows(
+        tasks[offset:offset + limit], requested_fields(request)
+    )
+
+    return FastJsonResponse(payload(request, keys, rows), request)
+
+
+@login_required
+async def task_status(request, pk):
+    """Vazifa holati va statistikasi"""
+
+    keys, lookups = resources.TASK.plan(requested_fields(request))
+    row = await Task.objects.filter(pk=pk).values_list(*lookups).afirst()
+
+    if row is None:
+        raise Http404("Vazifa topilmadi")
+
+    return FastJsonResponse(dict(zip(keys, row)), request)
+
+
+@login_required
+async def task_questions(request, pk):
+    """Vazifa savollari"""
+
+    questions = Question.objects.filter(task_id=pk).annotate(
+        position=ordering.position()
+    ).order_by('order')
+    keys, rows = await resources.QUESTION.arows(questions, requested_fields(request))
+
+    return FastJsonResponse(payload(request, keys, rows), request)
+
+
+@login_required
+async def task_results(request, pk):
+    """
+    Bajarilgan tayinlashlar natijalari.
+    Har bir qatorda 'answers' — 'questions' tartibidagi qiymatlar.
+    """
+
+    if not await Task.objects.filter(pk=pk).aexists():
+        raise Http404("Vazifa topilmadi")
+
+    questions = [
+        q async for q in Question.objects.filter(task_id=pk).order_by('order')
+        .values_list('id', 'question_type')
+    ]
+    position = {q_id: i for i, (q_id, _) in enumerate(questions)}
+    value_index = [
+        resources.ANSWER_VALUE_INDEX.get(q_type, resources.ANSWER_TEXT_INDEX)
+        for _, q_type in questions
+    ]
+
+    assignments = TaskAssignment.objects.filter(
+        task_id=pk,
+        status=TaskAssignment.Status.COMPLETED
+    ).order_by('completed_at')
+    keys, lookups = resources.RESULT.plan(requested_fields(request))
+    rows = [row async for row in assignments.values_list('id', *lookups)]
+
+    answers = {}
+    async for row in Answer.objects.filter(
+        assignment__task_id=pk,
+        assignment__status=TaskAssignment.Status.COMPLETED
+    ).values_list(*resources.ANSWER_COLUMNS):
+        i = position.get(row[1])
+        if i is not None:
+            answers.setdefault(row[0], [None] * len(questions))[i] = row[value_index[i]]
+
+    empty = [None] * len(questions)
+    rows = [row[1:] + (answers.get(row[0], empty),) for row in rows]
+
+    return FastJsonResponse(
+        payload(request, keys + ('answers',), rows, questions=[q_id for q_id, _ in questions]),
+        request
+    )
+
+
+@login_required
+async def dashboard_counters(request):
+    """Bosh sahifa hisoblagichlari — har biri bitta aggregate so'rov"""
+
+    today = timezone.now()
+
+    tasks = await Task.objects.aaggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status=Task.Status.ACTIVE)),
+        completed=Count('id', filter=Q(status=Task.Status.COMPLETED)),
+        overdue=Count('id', filter=Q(status=Task.Status.ACTIVE, deadline__lt=today)),
+    )
+
+    leaders = await User.objects.filter(role=User.Role.LEADER).aaggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status=User.Status.ACTIVE)),
+    )
+
+    assignments = await TaskAssignment.objects.aaggregate(
+        pending=Count('id', filter=Q(status=TaskAssignment.Status.PENDING)),
+        seen=Count('id', filter=Q(status=TaskAssignment.Status.SEEN)),
+        in_progress=Count('id', filter=Q(status=TaskAssignment.Status.IN_PROGRESS)),
+        completed=Count('id', filter=Q(status=TaskAssignment.Status.COMPLETED)),
+    )
+
+    return FastJsonResponse({
+        'tasks': tasks,
+        'leaders': leaders,
+        'assignments': assignments,
+    }, request)
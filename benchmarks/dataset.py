@@ -0,0 +1,255 @@
+"""
+Sintetik ma'lumotlar generatori.
+
+Testlar (kichik hajm), benchmarklar va seed_bench (milliy hajm) uchun
+Region -> District -> Mahalla -> yetakchilar -> vazifalar -> tayinlashlar ->
+javoblar ierarxiyasini bulk_create bilan yaratadi.
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from accounts.models import User, Region, District, Mahalla
+from tasks.models import Task, Question, TaskAssignment, Answer
+from tasks.ordering import GAP
+
+
+QUESTION_TYPES = [
+    (Question.Type.TEXT, None),
+    (Question.Type.NUMBER, None),
+    (Question.Type.CHOICE, ['A', 'B', 'C']),
+    (Question.Type.YES_NO, None),
+    (Question.Type.MULTIPLE, ['X', 'Y', 'Z']),
+    (Question.Type.DATE, None),
+]
+
+SAMPLE_VALUES = {
+    Question.Type.TEXT: {'value_text': "Javob matni"},
+    Question.Type.NUMBER: {'value_number': 42},
+    Question.Type.CHOICE: {'value_choice': 'A'},
+    Question.Type.YES_NO: {'value_boolean': True},
+    Question.Type.MULTIPLE: {'value_multiple': ['X', 'Z']},
+    Question.Type.DATE: {'value_date': timezone.localdate},
+}
+
+# Qidiruv benchmarklari uchun real ismlarga yaqin taqsimot
+FIRST_NAMES = [
+    'Aziz', 'Bobur', 'Dilshod', 'Farrux', 'Jasur', 'Otabek', 'Sardor', 'Sherzod',
+    'Ulugbek', 'Shoxrux', 'Dilnoza', 'Gulnora', 'Malika', 'Nilufar', 'Sevara', 'Zarina',
+]
+LAST_NAMES = [
+    'Karimov', 'Rahimov', 'Tursunov', 'Yusupov', 'Abdullayev', 'Qodirov', 'Ergashev',
+    'Sobirov', 'Xolmatov', 'Nazarov', 'Mirzayev', 'Ismoilov', 'Olimov', 'Saidov',
+]
+
+
+@dataclass
+class Dataset:
+    prefix: str
+    admin: User
+    regions: list = field(default_factory=list)
+    districts: list = field(default_factory=list)
+    mahallas: list = field(default_factory=list)
+    leaders: list = field(default_factory=list)
+    tasks: list = field(default_factory=list)
+
+    @property
+    def task(self):
+        return self.tasks[0]
+
+    @property
+    def leader(self):
+        return self.leaders[0]
+
+
+def _answer_values(q_type):
+    values = SAMPLE_VALUES[q_type]
+    return {k: (v() if callable(v) else v) for k, v in values.items()}
+
+
+def create_geography(ds, regions, districts, mahallas, batch_size=1000):
+    p = ds.prefix
+    start = len(ds.regions)
+    new_regions = Region.objects.bulk_create([
+        Region(name=f"{p} viloyat {i}", code=f"{p[:4]}{i}")
+        for i in range(start, start + regions)
+    ])
+    new_districts = District.objects.bulk_create([
+        District(region=r, name=f"{r.name} tuman {j}", code=f"D{j}")
+        for r in new_regions for j in range(districts)
+    ], batch_size=batch_size)
+    new_mahallas = Mahalla.objects.bulk_create([
+        Mahalla(
+            district=d, name=f"{d.name} mahalla {k}", code=f"M{k}",
+            population=random.randint(1000, 9000), youth_count=random.randint(100, 900)
+        )
+        for d in new_districts for k in range(mahallas)
+    ], batch_size=batch_size)
+
+    ds.regions += new_regions
+    ds.districts += new_districts
+    ds.mahallas += new_mahallas
+    return new_mahallas
+
+
+def create_leaders(ds, mahallas, per_mahalla, batch_size=1000):
+    # Parol xeshi qimmat — barcha yetakchilar uchun bitta
+    password = make_password(None)
+    district_map = {d.pk: d for d in ds.districts}
+    start = len(ds.leaders)
+    leaders = []
+    for m in mahallas:
+        district = district_map.get(m.district_id) or m.district
+        for _ in range(per_mahalla):
+            n = start + len(leaders)
+            leaders.append(User(
+                username=f"{ds.prefix}_leader_{n}",
+                password=password,
+                first_name=FIRST_NAMES[n % len(FIRST_NAMES)],
+                last_name=LAST_NAMES[(n // len(FIRST_NAMES)) % len(LAST_NAMES)],
+                phone=f"+998{abs(hash((ds.prefix, n))) % 10 ** 9:09d}",
+                role=User.Role.LEADER,
+                status=User.Status.ACTIVE,
+                region_id=district.region_id,
+                district=district,
+                mahalla=m,
+                last_activity=timezone.now() - timedelta(days=random.randint(0, 60)),
+            ))
+
+    leaders = User.objects.bulk_create(leaders, batch_size=batch_size, ignore_conflicts=False)
+    ds.leaders += leaders
+    return leaders
+
+
+def create_tasks(ds, count, questions, status=Task.Status.ACTIVE, batch_size=1000):
+    now = timezone.now()
+    start = len(ds.tasks)
+    tasks = Task.objects.bulk_create([
+        Task(
+            title=f"{ds.prefix} vazifa {i}",
+            description=f"Monitoring bo'yicha vazifa {i}",
+            task_type=random.choice(Task.Type.values),
+            priority=random.choice(Task.Priority.values),
+            status=status,
+            deadline=now + timedelta(days=random.randint(-5, 30)),
+            published_at=now if status != Task.Status.DRAFT else None,
+            created_by=ds.admin,
+            questions_count=questions,
+        )
+        for i in range(start, start + count)
+    ], batch_size=batch_size)
+
+    Question.objects.bulk_create([
+        Question(
+            task=t,
+            order=GAP * (i + 1),
+            text=f"Savol {i + 1}",
+            question_type=QUESTION_TYPES[i % len(QUESTION_TYPES)][0],
+            choices=QUESTION_TYPES[i % len(QUESTION_TYPES)][1],
+        )
+        for t in tasks for i in range(questions)
+    ], batch_size=batch_size)
+
+    ds.tasks += tasks
+    return tasks
+
+
+def create_assignments(ds, tasks, leaders, completion=0.5, batch_size=1000):
+    """Tayinlash va javoblar; completion — bajarilganlar ulushi"""
+    now = timezone.now()
+    statuses = [
+        TaskAssignment.Status.PENDING,
+        TaskAssignment.Status.SEEN,
+        TaskAssignment.Status.IN_PROGRESS,
+    ]
+
+    questions = {}
+    for q in Question.objects.filter(task__in=tasks).order_by('order'):
+        questions.setdefault(q.task_id, []).append(q)
+
+    def answered(status, task_questions):
+        if status == TaskAssignment.Status.COMPLETED:
+            return task_questions
+        if status == TaskAssignment.Status.IN_PROGRESS:
+            return task_questions[:len(task_questions) // 2]
+        return []
+
+    for task in tasks:
+        task_questions = questions.get(task.pk, [])
+        assignments = []
+        for leader in leaders:
+            if random.random() < completion:
+                status = TaskAssignment.Status.COMPLETED
+            else:
+                status = random.choice(statuses)
+            assignments.append(TaskAssignment(
+                task=task,
+                leader=leader,
+                region_id=leader.region_id,
+                district_id=leader.district_id,
+                mahalla_id=leader.mahalla_id,
+                status=status,
+                seen_at=now if status != TaskAssignment.Status.PENDING else None,
+                started_at=now if status in (TaskAssignment.Status.IN_PROGRESS, TaskAssignment.Status.COMPLETED) else None,
+                completed_at=now if status == TaskAssignment.Status.COMPLETED else None,
+                answers_count=len(answered(status, task_questions)),
+            ))
+        assignments = TaskAssignment.objects.bulk_create(
+            assignments, batch_size=batch_size, ignore_conflicts=True
+        )
+
+        answers = []
+        for a in assignments:
+            answers += [
+                Answer(assignment=a, question=q, **_answer_values(q.question_type))
+                for q in answered(a.status, task_questions)
+            ]
+        Answer.objects.bulk_create(answers, batch_size=batch_size)
+
+        task.update_stats()
+
+
+def create_admin(prefix=None):
+    """Bo'sh to'plam: faqat superuser"""
+    prefix = prefix or uuid.uuid4().hex[:6]
+    admin = User.objects.create(
+        username=f"{prefix}_admin",
+        role=User.Role.SUPER_ADMIN,
+        is_staff=True,
+        is_superuser=True,
+    )
+    return Dataset(prefix=prefix, admin=admin)
+
+
+def build(regions=1, districts=2, mahallas=2, leaders=2, tasks=2, questions=3,
+          completion=0.5, prefix=None, seed=0, batch_size=1000):
+    """
+    Kichik yoki katta sintetik to'plam yaratish.
+    districts/mahallas/leaders — yuqori bo'g'indagi har bir element uchun soni.
+    """
+    random.seed(seed)
+    ds = create_admin(prefix)
+
+    mahalla_list = create_geography(ds, regions, districts, mahallas, batch_size)
+    leader_list = create_leaders(ds, mahalla_list, leaders, batch_size)
+    task_list = create_tasks(ds, tasks, questions, batch_size=batch_size)
+    create_assignments(ds, task_list, leader_list, completion, batch_size)
+    return ds
+
+
+def grow(ds, factor=2, geography=True):
+    """
+    Mavjud to'plamga yana qatorlar qo'shish (N+1 tekshiruvi uchun):
+    birinchi mahallaga yetakchilar, yangi vazifalar va birinchi vazifaga tayinlashlar.
+    """
+    leaders = create_leaders(ds, ds.mahallas[:1], factor * 2)
+    tasks = create_tasks(ds, factor, len(ds.task.questions.all()) or 3)
+    create_assignments(ds, [ds.task], leaders)
+    create_assignments(ds, tasks, ds.leaders)
+    if geography:
+        create_geography(ds, 1, 1, factor)
+    return ds
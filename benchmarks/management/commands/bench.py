@@ -0,0 +1,211 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks import audience
+from tasks.models import Task, Question
+
+
+VIEWS = [
+    ('task_list', 'tasks:task_list', False),
+    ('task_detail', 'tasks:task_detail', True),
+    ('task_results', 'tasks:task_results', True),
+    ('task_export', 'tasks:task_export', True),
+    ('home', 'dashboard:home', False),
+    ('statistics', 'dashboard:statistics', False),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+def summarize(samples, queries):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 2),
+        'p95_ms': round(p95 * 1000, 2),
+        'min_ms': round(samples[0] * 1000, 2),
+        'queries': queries,
+        'runs': len(samples),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Asosiy operatsiyalarni o'lchash (seed_bench to'plamida): Task.publish, update_stats, "
+        "task_list, task_detail, task_results, task_export, home, statistics. "
+        "--json bilan natija saqlanadi, --compare bilan oldingi natija bilan solishtiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--task', help="Vazifa ID (standart: eng ko'p tayinlashli faol vazifa)")
+        parser.add_argument('--only', action='append', help="Faqat shu operatsiyalar")
+        parser.add_argument('--json', dest='json_path')
+        parser.add_argument('--compare', help="Oldingi --json natijasi")
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help="Sekinlashish chegarasi (median, %%)")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        # Client() Host sifatida 'testserver' yuboradi; ALLOWED_HOSTS da bo'lmasa view lar 400 qaytaradi
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            self._run(options)
+
+    def _run(self, options):
+        user = get_user_model().objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError("Superuser topilmadi (avval seed_bench)")
+
+        task = self._task(options['task'])
+        client = Client()
+        client.force_login(user)
+
+        operations = [
+            ('publish', self._bench_publish),
+            ('update_stats', self._bench_update_stats),
+        ] + [
+            (name, self._view_bench(client, url_name, task if with_task else None))
+            for name, url_name, with_task in VIEWS
+        ]
+        if options['only']:
+            unknown = set(options['only']) - {name for name, _ in operations}
+            if unknown:
+                raise CommandError(f"Noma'lum operatsiya: {', '.join(sorted(unknown))}")
+            operations = [(n, f) for n, f in operations if n in options['only']]
+
+        report = {
+            'vendor': connection.vendor,
+            'task': str(task.pk),
+            'assignments': task.assignments.count(),
+            'results': {},
+        }
+        self.stdout.write(f"Vazifa {task.pk}: {report['assignments']} tayinlash")
+
+        for name, bench in operations:
+            result = bench(task, options['repeat'], options['warmup'])
+            report['results'][name] = result
+            self.stdout.write(
+                f"{name:>14}: median {result['median_ms']:>9}ms  p95 {result['p95_ms']:>9}ms  "
+                f"{result['queries']:>4} so'rov"
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+        if options['compare']:
+            regressions = self._compare(report, options['compare'], options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"Sekinlashgan: {', '.join(regressions)}")
+
+    # ==================== O'LCHASH ====================
+    def _task(self, pk):
+        if pk:
+            try:
+                return Task.objects.get(pk=pk)
+            except Task.DoesNotExist:
+                raise CommandError(f"Vazifa topilmadi: {pk}")
+
+        task = Task.objects.filter(status=Task.Status.ACTIVE).annotate(
+            n=Count('assignments')
+        ).order_by('-n').first()
+        if task is None:
+            raise CommandError("Faol vazifa yo'q (avval seed_bench)")
+        return task
+
+    def _measure(self, func, repeat, warmup):
+        for _ in range(warmup):
+            func()
+        samples = []
+        queries = 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                func()
+                samples.append(time.perf_counter() - start)
+            queries = len(ctx.captured_queries)
+        return summarize(samples, queries)
+
+    def _view_bench(self, client, url_name, task):
+        path = reverse(url_name, args=[task.pk]) if task else reverse(url_name)
+
+        def run():
+            response = client.get(path)
+            if response.status_code >= 400:
+                raise CommandError(f"{path}: {response.status_code}")
+
+        return lambda _task, repeat, warmup: self._measure(run, repeat, warmup)
+
+    def _bench_publish(self, task, repeat, warmup):
+        """Vazifa nishoni bo'yicha yangi qoralama; har bir ishga tushirish bekor qilinadi"""
+        questions = list(task.questions.all())
+        targeting = task.get_targeting()
+
+        def run():
+            try:
+                with transaction.atomic():
+                    draft = Task.objects.create(
+                        title="bench publish",
+                        task_type=task.task_type,
+                        priority=task.priority,
+                        deadline=task.deadline,
+                        created_by_id=task.created_by_id,
+                        questions_count=len(questions),
+                    )
+                    Question.objects.bulk_create([
+                        Question(
+                            task=draft, order=q.order, text=q.text,
+                            question_type=q.question_type, choices=q.choices,
+                        )
+                        for q in questions
+                    ])
+                    for field in audience.FIELDS:
+                        getattr(draft, field).set(targeting.ids(field))
+                    draft.publish()
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        return self._measure(run, repeat, warmup)
+
+    def _bench_update_stats(self, task, repeat, warmup):
+        return self._measure(task.update_stats, repeat, warmup)
+
+    # ==================== SOLISHTIRISH ====================
+    def _compare(self, report, path, threshold):
+        with open(path) as f:
+            baseline = json.load(f)
+
+        self.stdout.write(f"\nSolishtirish: {path}")
+        regressions = []
+        for name, result in report['results'].items():
+            old = baseline.get('results', {}).get(name)
+            if not old:
+                self.stdout.write(f"{name:>14}: yangi")
+                continue
+
+            change = (result['median_ms'] - old['median_ms']) / old['median_ms'] * 100
+            line = (
+                f"{name:>14}: {old['median_ms']:>9}ms -> {result['median_ms']:>9}ms "
+                f"({change:+.1f}%)  so'rovlar {old['queries']} -> {result['queries']}"
+            )
+            if change > threshold or result['queries'] > old['queries']:
+                regressions.append(name)
+                line = self.style.ERROR(line)
+            elif change < -threshold:
+                line = self.style.SUCCESS(line)
+            self.stdout.write(line)
+        return regressions
@@ -0,0 +1,107 @@
+import json
+import statistics
+import time
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from benchmarks import dataset
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Admin changelist sahifalarini (100 qator) o'lchash: vaqt va so'rovlar soni"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help="Vaqtinchalik milliy to'plam yaratish (oxirida bekor qilinadi)")
+        parser.add_argument('--regions', type=int, default=14)
+        parser.add_argument('--districts', type=int, default=14, help="Har bir viloyatda")
+        parser.add_argument('--mahallas', type=int, default=45, help="Har bir tumanda")
+        parser.add_argument('--leaders', type=int, default=1, help="Har bir mahallada")
+        parser.add_argument('--tasks', type=int, default=10)
+        parser.add_argument('--questions', type=int, default=5)
+        parser.add_argument('--per-page', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--model', action='append', dest='models',
+                            help="app_label.model (bir nechta bo'lishi mumkin)")
+        parser.add_argument('--json', dest='json_path')
+
+    def handle(self, *args, **options):
+        if not options['seed']:
+            report = self._run(options)
+        else:
+            try:
+                with transaction.atomic():
+                    self.stdout.write("Seed...")
+                    dataset.build(
+                        regions=options['regions'],
+                        districts=options['districts'],
+                        mahallas=options['mahallas'],
+                        leaders=options['leaders'],
+                        tasks=options['tasks'],
+                        questions=options['questions'],
+                    )
+                    report = self._run(options)
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+    def _admins(self, models):
+        registry = {
+            f"{m._meta.app_label}.{m._meta.model_name}": model_admin
+            for m, model_admin in admin.site._registry.items()
+        }
+        if not models:
+            return registry
+        unknown = set(models) - set(registry)
+        if unknown:
+            raise CommandError(f"Noma'lum model: {', '.join(sorted(unknown))}")
+        return {label: registry[label] for label in models}
+
+    def _run(self, options):
+        user = get_user_model().objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError("Superuser topilmadi (--seed bilan ishga tushiring)")
+
+        factory = RequestFactory()
+        report = {'per_page': options['per_page'], 'results': {}}
+
+        for label, model_admin in self._admins(options['models']).items():
+            model_admin.list_per_page = options['per_page']
+            samples = []
+            queries = rows = 0
+
+            for _ in range(options['repeat']):
+                request = factory.get('/admin/')
+                request.user = user
+                start = time.perf_counter()
+                with CaptureQueriesContext(connection) as ctx:
+                    response = model_admin.changelist_view(request)
+                    response.render()
+                samples.append(time.perf_counter() - start)
+                queries = len(ctx.captured_queries)
+                rows = len(response.context_data['cl'].result_list)
+
+            result = {
+                'median_ms': round(statistics.median(samples) * 1000, 2),
+                'queries': queries,
+                'rows': rows,
+            }
+            report['results'][label] = result
+            self.stdout.write(
+                f"{label:>28}: {result['median_ms']:>8}ms  {queries:>3} so'rov  {rows} qator"
+            )
+
+        return report
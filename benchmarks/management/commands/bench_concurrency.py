@@ -0,0 +1,139 @@
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+async def _fetch(host, port, request_head, slow, timeout):
+    """Bitta HTTP/1.1 so'rov. slow > 0 bo'lsa sarlavhalar bo'lib-bo'lib yuboriladi."""
+    start = time.perf_counter()
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        if slow:
+            # Sekin mobil mijoz: so'rov qatorini yuborib, qolganini kechiktiradi
+            first_line, rest = request_head.split(b'\r\n', 1)
+            writer.write(first_line + b'\r\n')
+            await writer.drain()
+            await asyncio.sleep(slow)
+            writer.write(rest)
+        else:
+            writer.write(request_head)
+        await writer.drain()
+
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+
+    status = int(status_line.split()[1]) if status_line else 0
+    return status, time.perf_counter() - start
+
+
+async def _run_level(url, headers, concurrency, total, slow, timeout):
+    parts = urlsplit(url)
+    if parts.scheme != 'http':
+        raise CommandError("Faqat http:// manzillar qo'llab-quvvatlanadi")
+
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    lines = [f'GET {path} HTTP/1.1', f'Host: {parts.netloc}', 'Connection: close']
+    lines += headers
+    request_head = ('\r\n'.join(lines) + '\r\n\r\n').encode()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        async with semaphore:
+            try:
+                status, elapsed = await _fetch(
+                    parts.hostname, parts.port or 80, request_head, slow, timeout
+                )
+            except (OSError, asyncio.TimeoutError):
+                errors += 1
+                return
+            if status >= 500 or status == 0:
+                errors += 1
+            else:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(total)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+
+    def pct(p):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 1)
+
+    return {
+        'concurrency': concurrency,
+        'requests': total,
+        'errors': errors,
+        'rps': round(len(latencies) / wall, 1) if wall else 0,
+        'p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "WSGI va ASGI serverlarning parallel ulanishlarga chidamliligini solishtirish. "
+        "Misol: manage.py bench_concurrency "
+        "wsgi=http://127.0.0.1:8001/api/bot/1/inbox/ asgi=http://127.0.0.1:8002/api/bot/1/inbox/ "
+        "--header 'X-Bot-Token: ...' --slow 0.5"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs='+', help="label=url juftliklari")
+        parser.add_argument('--concurrency', default='10,50,100,200,400')
+        parser.add_argument('--requests', type=int, default=500, help="Har bir daraja uchun so'rovlar")
+        parser.add_argument('--slow', type=float, default=0.0, help="Sekin mijoz kechikishi (soniya)")
+        parser.add_argument('--header', action='append', default=[])
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--slo', type=float, default=1000.0, help="p95 chegarasi (ms)")
+        parser.add_argument('--json', dest='json_path', help="Natijani JSON faylga yozish")
+
+    def handle(self, *args, **options):
+        levels = [int(x) for x in options['concurrency'].split(',') if x]
+        report = {}
+
+        for target in options['targets']:
+            label, sep, url = target.partition('=')
+            if not sep:
+                raise CommandError(f"Noto'g'ri target: {target} (label=url kerak)")
+
+            rows = []
+            for level in levels:
+                row = asyncio.run(_run_level(
+                    url, options['header'], level, max(level, options['requests']),
+                    options['slow'], options['timeout']
+                ))
+                rows.append(row)
+                self.stdout.write(
+                    f"{label:>8} c={row['concurrency']:<5} rps={row['rps']:<8} "
+                    f"p50={row['p50_ms']}ms p95={row['p95_ms']}ms errors={row['errors']}"
+                )
+
+            # Chegara: xatolar < 1% va p95 SLO ichida bo'lgan eng katta daraja
+            limit = 0
+            for row in rows:
+                ok = row['errors'] <= row['requests'] * 0.01
+                if ok and row['p95_ms'] is not None and row['p95_ms'] <= options['slo']:
+                    limit = row['concurrency']
+
+            report[label] = {'url': url, 'levels': rows, 'concurrency_limit': limit}
+            self.stdout.write(self.style.SUCCESS(f"{label}: concurrency limit = {limit}"))
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(report, f, indent=2)
@@ -0,0 +1,175 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from benchmarks import dataset
+from monitoring import metrics
+from monitoring.middleware import MetricsMiddleware, QueryRecorder
+
+
+METRICS_MIDDLEWARE = 'monitoring.middleware.MetricsMiddleware'
+
+URLS = [
+    ('dashboard:home', None),
+    ('dashboard:statistics', None),
+    ('tasks:task_list', None),
+    ('api:task_list', None),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "MetricsMiddleware qo'shimcha xarajatini o'lchash (yoqilgan/o'chirilgan, navbatma-navbat)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help="Vaqtinchalik to'plam yaratish (oxirida bekor qilinadi)")
+        parser.add_argument('--requests', type=int, default=200, help="Har bir URL va rejim uchun")
+        parser.add_argument('--rounds', type=int, default=5,
+                            help="Rejimlar navbatlashadigan bloklar soni")
+        parser.add_argument('--json', dest='json_path')
+
+    def handle(self, *args, **options):
+        # Test klienti Host: testserver yuboradi — u ALLOWED_HOSTS da bo'lmasa 400
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            report = self._measure(options)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+    def _measure(self, options):
+        if not options['seed']:
+            return self._run(options)
+        try:
+            with transaction.atomic():
+                self.stdout.write("Seed...")
+                dataset.build(districts=3, mahallas=5, leaders=3, tasks=20, questions=5)
+                report = self._run(options)
+                raise _Rollback
+        except _Rollback:
+            return report
+
+    def _client(self, user, enabled):
+        middleware = [m for m in settings.MIDDLEWARE if m != METRICS_MIDDLEWARE]
+        if enabled:
+            middleware.insert(0, METRICS_MIDDLEWARE)
+        with override_settings(MIDDLEWARE=middleware):
+            client = Client()
+            client.force_login(user)
+            # Middleware zanjiri birinchi so'rovda yuklanadi
+            client.get(reverse('dashboard:home'))
+        return client
+
+    def _sample(self, client, path, count):
+        samples = []
+        for _ in range(count):
+            start = time.perf_counter()
+            response = client.get(path)
+            samples.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise CommandError(f"{path}: {response.status_code}")
+        return samples
+
+    def _request_cost(self, count):
+        """Middleware ning o'z xarajati (SQL siz), soniya"""
+        factory = RequestFactory()
+        request = factory.get('/')
+        request.resolver_match = resolve(reverse('dashboard:home'))
+        response = HttpResponse(b'x' * 20000)
+        middleware = MetricsMiddleware(lambda r: response)
+
+        start = time.perf_counter()
+        for _ in range(count):
+            middleware(request)
+        return (time.perf_counter() - start) / count
+
+    def _query_cost(self, count):
+        """execute_wrapper ning bitta SQL ga qo'shimcha xarajati, soniya"""
+        def run():
+            with connection.cursor() as cursor:
+                start = time.perf_counter()
+                for _ in range(count):
+                    cursor.execute("SELECT 1")
+                return time.perf_counter() - start
+
+        samples = []
+        for _ in range(5):
+            plain = run()
+            with connection.execute_wrapper(QueryRecorder()):
+                wrapped = run()
+            samples.append((wrapped - plain) / count)
+        return max(statistics.median(samples), 0.0)
+
+    def _run(self, options):
+        user = get_user_model().objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError("Superuser topilmadi (--seed bilan ishga tushiring)")
+
+        request_cost = self._request_cost(options['requests'] * 10)
+        query_cost = self._query_cost(options['requests'] * 10)
+        self.stdout.write(
+            f"Middleware: {request_cost * 1e6:.1f}us/so'rov, execute_wrapper: {query_cost * 1e6:.2f}us/SQL"
+        )
+
+        clients = {mode: self._client(user, mode == 'on') for mode in ('off', 'on')}
+        per_round = max(1, options['requests'] // options['rounds'])
+        report = {
+            'requests': per_round * options['rounds'],
+            'middleware_us': round(request_cost * 1e6, 2),
+            'per_query_us': round(query_cost * 1e6, 3),
+            'results': {},
+        }
+
+        for name, args in URLS:
+            path = reverse(name, args=args)
+            with CaptureQueriesContext(connection) as ctx:
+                clients['off'].get(path)
+            queries = len(ctx.captured_queries)
+
+            samples = {'off': [], 'on': []}
+            for _ in range(options['rounds']):
+                for mode in ('off', 'on'):
+                    samples[mode] += self._sample(clients[mode], path, per_round)
+
+            off = statistics.median(samples['off'])
+            on = statistics.median(samples['on'])
+            # Hisoblangan xarajat: A/B farqi shovqin ichida qoladi
+            overhead = request_cost + queries * query_cost
+            result = {
+                'queries': queries,
+                'off_ms': round(off * 1000, 3),
+                'on_ms': round(on * 1000, 3),
+                'overhead_us': round(overhead * 1e6, 1),
+                'overhead_pct': round(overhead / off * 100, 3),
+            }
+            report['results'][name] = result
+            self.stdout.write(
+                f"{name:>22}: {queries:>2} SQL  o'chiq {result['off_ms']:>8}ms  "
+                f"yoqiq {result['on_ms']:>8}ms  xarajat {result['overhead_us']:>6}us "
+                f"({result['overhead_pct']}%)"
+            )
+
+        worst = max(r['overhead_pct'] for r in report['results'].values())
+        report['max_overhead_pct'] = worst
+        self.stdout.write(f"Eng katta xarajat: {worst}% (chegara 1%)")
+
+        # /metrics javobini tayyorlash vaqti
+        start = time.perf_counter()
+        rendered = metrics.render()
+        report['render_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        report['render_bytes'] = len(rendered)
+        self.stdout.write(f"/metrics render: {report['render_ms']}ms, {len(rendered)} bayt")
+        return report
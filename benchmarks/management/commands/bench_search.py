@@ -0,0 +1,144 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from accounts.models import User
+from accounts.search import search_leaders
+from benchmarks import dataset
+from tasks.models import Task
+from tasks.search import search_tasks
+
+
+# (nom, qidiruv so'zi)
+LEADER_TERMS = [
+    ('name', 'Karimov'),
+    ('full_name', 'Aziz Karimov'),
+    ('partial', 'dilno'),
+    ('phone', '90 12'),
+]
+TASK_TERMS = [
+    ('broad', 'monitoring'),
+    ('prefix', 'vazif'),
+    ('selective', 'vazifa 4321'),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+def legacy_leaders(term):
+    return User.objects.filter(
+        Q(first_name__icontains=term) |
+        Q(last_name__icontains=term) |
+        Q(username__icontains=term) |
+        Q(phone__icontains=term)
+    ).order_by('-created_at')
+
+
+def legacy_tasks(term):
+    return Task.objects.filter(
+        Q(title__icontains=term) | Q(description__icontains=term)
+    ).order_by('-created_at')
+
+
+def ranked(queryset):
+    if 'search_rank' in queryset.query.annotations:
+        return queryset.order_by('-search_rank', '-created_at')
+    return queryset.order_by('-created_at')
+
+
+class Command(BaseCommand):
+    help = "Eski icontains qidiruvini indeksli qidiruv bilan solishtirish (birinchi sahifa + count)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help="Vaqtinchalik to'plam yaratish (oxirida bekor qilinadi)")
+        parser.add_argument('--leaders', type=int, default=100000)
+        parser.add_argument('--tasks', type=int, default=10000)
+        parser.add_argument('--per-page', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--json', dest='json_path')
+
+    def handle(self, *args, **options):
+        if not options['seed']:
+            report = self._run(options)
+        else:
+            try:
+                with transaction.atomic():
+                    self.stdout.write("Seed...")
+                    self._seed(options)
+                    report = self._run(options)
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+    def _seed(self, options):
+        ds = dataset.create_admin()
+
+        # 100 yetakchili mahallalar: 100k -> 1000 mahalla
+        mahallas = max(1, options['leaders'] // 100)
+        dataset.create_geography(ds, regions=1, districts=max(1, mahallas // 50), mahallas=50)
+        dataset.create_leaders(ds, ds.mahallas, per_mahalla=max(1, options['leaders'] // len(ds.mahallas)))
+        dataset.create_tasks(ds, options['tasks'], questions=0)
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE accounts_user")
+                cursor.execute("ANALYZE tasks_task")
+
+    def _measure(self, make_queryset, per_page, repeat):
+        samples = []
+        count = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            queryset = make_queryset()
+            count = queryset.count()
+            list(queryset[:per_page])
+            samples.append(time.perf_counter() - start)
+        return round(statistics.median(samples) * 1000, 2), count
+
+    def _run(self, options):
+        cases = [
+            ('leaders', name, term, lambda t=term: legacy_leaders(t),
+             lambda t=term: ranked(search_leaders(User.objects.all(), t)))
+            for name, term in LEADER_TERMS
+        ] + [
+            ('tasks', name, term, lambda t=term: legacy_tasks(t),
+             lambda t=term: ranked(search_tasks(Task.objects.all(), t)))
+            for name, term in TASK_TERMS
+        ]
+
+        report = {
+            'vendor': connection.vendor,
+            'leaders': User.objects.count(),
+            'tasks': Task.objects.count(),
+            'results': {},
+        }
+        self.stdout.write(f"Yetakchilar: {report['leaders']}, vazifalar: {report['tasks']}")
+
+        for group, name, term, legacy, indexed in cases:
+            legacy_ms, legacy_count = self._measure(legacy, options['per_page'], options['repeat'])
+            indexed_ms, indexed_count = self._measure(indexed, options['per_page'], options['repeat'])
+            report['results'][f"{group}.{name}"] = {
+                'term': term,
+                'legacy_ms': legacy_ms,
+                'legacy_count': legacy_count,
+                'indexed_ms': indexed_ms,
+                'indexed_count': indexed_count,
+            }
+            self.stdout.write(
+                f"{group + '.' + name:>20} {term!r:>22}: "
+                f"icontains {legacy_ms:>8}ms ({legacy_count:>6})  "
+                f"indeks {indexed_ms:>8}ms ({indexed_count:>6})"
+            )
+
+        return report
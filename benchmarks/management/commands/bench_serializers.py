@@ -0,0 +1,149 @@
+import json
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import User
+from api import resources
+from api.fastjson import dumps, payload, orjson
+from tasks.models import Task, Question, TaskAssignment
+from tasks.ordering import GAP
+
+
+class TaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = [
+            'id', 'title', 'status', 'priority', 'task_type', 'deadline',
+            'stats_total_assigned', 'stats_total_completed', 'stats_completion_rate', 'created_at',
+        ]
+
+
+class QuestionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Question
+        fields = ['id', 'order', 'text', 'question_type', 'is_required', 'choices', 'help_text', 'placeholder']
+
+
+class InboxSerializer(serializers.ModelSerializer):
+    title = serializers.CharField(source='task.title')
+    priority = serializers.CharField(source='task.priority')
+    deadline = serializers.DateTimeField(source='task.deadline')
+    questions = serializers.IntegerField(source='questions_total')
+    answered = serializers.IntegerField(source='answers_total')
+
+    class Meta:
+        model = TaskAssignment
+        fields = ['id', 'status', 'task_id', 'title', 'priority', 'deadline', 'questions', 'answered']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "DRF ModelSerializer + JSONRenderer va api.fastjson qatlamini solishtirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Har bir resurs uchun qatorlar soni")
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--json', dest='json_path')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._seed(options['rows'])
+                report = self._run(options['repeat'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+    def _seed(self, n):
+        suffix = uuid.uuid4().hex[:8]
+        admin = User.objects.create(username=f'bench_admin_{suffix}', role=User.Role.SUPER_ADMIN)
+        leader = User.objects.create(username=f'bench_leader_{suffix}')
+        deadline = timezone.now() + timedelta(days=7)
+
+        tasks = Task.objects.bulk_create([
+            Task(title=f"Bench vazifa {i}", description="-" * 200, deadline=deadline,
+                 status=Task.Status.ACTIVE, created_by=admin)
+            for i in range(n)
+        ])
+        Question.objects.bulk_create([
+            Question(task=tasks[0], order=GAP * (i + 1), text=f"Savol {i + 1}", choices=['Ha', "Yo'q"])
+            for i in range(n)
+        ])
+        tasks[0].refresh_questions()
+        TaskAssignment.objects.bulk_create([
+            TaskAssignment(task=task, leader=leader) for task in tasks
+        ])
+
+        self.task = tasks[0]
+        self.leader = leader
+
+    def _time(self, fn, repeat):
+        samples = []
+        size = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            size = len(fn())
+            samples.append(time.perf_counter() - start)
+        return round(statistics.median(samples) * 1000, 2), size
+
+    def _run(self, repeat):
+        request = RequestFactory().get('/')
+        compact = RequestFactory().get('/', {'format': 'compact'})
+
+        tasks = Task.objects.order_by('-created_at')
+        questions = Question.objects.filter(task=self.task).order_by('order')
+        inbox = TaskAssignment.objects.filter(leader=self.leader).annotate(
+            questions_total=Count('task__questions', distinct=True),
+            answers_total=Count('answers', distinct=True)
+        ).order_by('task__deadline')
+
+        cases = [
+            ('tasks', tasks, TaskSerializer, resources.TASK),
+            ('questions', questions, QuestionSerializer, resources.QUESTION),
+            ('inbox', inbox.select_related('task'), InboxSerializer, resources.INBOX),
+        ]
+
+        renderer = JSONRenderer()
+        report = {'encoder': 'orjson' if orjson else 'json', 'results': {}}
+        self.stdout.write(f"encoder: {report['encoder']}")
+
+        for name, qs, serializer, resource in cases:
+            drf_ms, drf_size = self._time(
+                lambda: renderer.render(serializer(qs.all(), many=True).data), repeat
+            )
+            fast_ms, fast_size = self._time(
+                lambda: dumps(payload(request, *resource.rows(qs.all()))), repeat
+            )
+            compact_ms, compact_size = self._time(
+                lambda: dumps(payload(compact, *resource.rows(qs.all()))), repeat
+            )
+
+            report['results'][name] = {
+                'drf_ms': drf_ms, 'drf_bytes': drf_size,
+                'fast_ms': fast_ms, 'fast_bytes': fast_size,
+                'compact_ms': compact_ms, 'compact_bytes': compact_size,
+                'speedup': round(drf_ms / fast_ms, 2) if fast_ms else None,
+            }
+            self.stdout.write(
+                f"{name:>10}: drf={drf_ms}ms ({drf_size}B)  fast={fast_ms}ms ({fast_size}B)  "
+                f"compact={compact_ms}ms ({compact_size}B)  x{report['results'][name]['speedup']}"
+            )
+
+        return report
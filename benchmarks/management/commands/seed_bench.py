@@ -0,0 +1,98 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from benchmarks import dataset
+from tasks.models import Task
+
+
+SCALES = {
+    # regions, districts/region, mahallas/district, leaders/mahalla, tasks, questions
+    'small': (2, 3, 5, 2, 10, 5),
+    'medium': (14, 14, 10, 2, 30, 6),
+    'national': (14, 14, 45, 3, 60, 8),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Milliy hajmdagi sintetik to'plam: 14 viloyat, ~200 tuman, ~9000 mahalla, "
+        "o'n minglab yetakchilar, vazifalar, tayinlashlar va javoblar (bulk_create)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='national')
+        parser.add_argument('--regions', type=int)
+        parser.add_argument('--districts', type=int, help="Har bir viloyatda")
+        parser.add_argument('--mahallas', type=int, help="Har bir tumanda")
+        parser.add_argument('--leaders', type=int, help="Har bir mahallada")
+        parser.add_argument('--tasks', type=int)
+        parser.add_argument('--questions', type=int, help="Har bir vazifada (turlar aralash)")
+        parser.add_argument('--assigned-tasks', type=int, default=None,
+                            help="Tayinlashli vazifalar soni (standart: hammasi)")
+        parser.add_argument('--completion', type=float, default=0.5)
+        parser.add_argument('--drafts', type=int, default=5, help="Qoralama vazifalar soni")
+        parser.add_argument('--prefix', help="Nomlar prefiksi (standart: tasodifiy)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        regions, districts, mahallas, leaders, tasks, questions = SCALES[options['scale']]
+        regions = options['regions'] or regions
+        districts = options['districts'] or districts
+        mahallas = options['mahallas'] or mahallas
+        leaders = options['leaders'] or leaders
+        tasks = options['tasks'] or tasks
+        questions = options['questions'] or questions
+        assigned = options['assigned_tasks']
+        if assigned is None:
+            assigned = tasks
+        batch_size = options['batch_size']
+
+        random.seed(options['seed'])
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            ds = dataset.create_admin(options['prefix'])
+            self._step("Geografiya", dataset.create_geography, ds, regions, districts, mahallas, batch_size)
+            self._step("Yetakchilar", dataset.create_leaders, ds, ds.mahallas, leaders, batch_size)
+            self._step("Vazifalar", dataset.create_tasks, ds, tasks, questions, batch_size=batch_size)
+            self._step(
+                "Qoralamalar", dataset.create_tasks, ds, options['drafts'], questions,
+                status=Task.Status.DRAFT, batch_size=batch_size
+            )
+
+            # Har bir vazifa bitta viloyatga yuboriladi — real tarqatishga yaqin
+            by_region = {}
+            for leader in ds.leaders:
+                by_region.setdefault(leader.region_id, []).append(leader)
+            region_ids = sorted(by_region)
+
+            active = [t for t in ds.tasks if t.status == Task.Status.ACTIVE][:assigned]
+            for n, task in enumerate(active, 1):
+                region_id = random.choice(region_ids)
+                task.target_regions.set([region_id])
+                dataset.create_assignments(
+                    ds, [task], by_region[region_id], options['completion'], batch_size
+                )
+                if n % 10 == 0 or n == len(active):
+                    self.stdout.write(f"  tayinlashlar: {n}/{len(active)} vazifa")
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor ({time.perf_counter() - started:.1f}s): prefix={ds.prefix}, "
+            f"{len(ds.regions)} viloyat, {len(ds.districts)} tuman, {len(ds.mahallas)} mahalla, "
+            f"{len(ds.leaders)} yetakchi, {len(ds.tasks)} vazifa ({len(active)} tayinlashli). "
+            f"Admin: {ds.admin.username}"
+        ))
+
+    def _step(self, label, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.stdout.write(f"  {label}: {len(result)} ({time.perf_counter() - start:.1f}s)")
+        return result
@@ -0,0 +1,119 @@
+"""
+So'rovlar byudjeti — test vaqtidagi instrumentatsiya.
+
+Test klassi BUDGETS lug'atida URL nomi -> (maksimal so'rovlar, argumentlar)
+ni e'lon qiladi. QueryBudgetMixin har bir sahifani seed qilingan to'plamda
+o'lchaydi, so'ng to'plamni kattalashtirib so'rovlar soni o'smasligini
+(N+1 yo'qligini) tekshiradi.
+"""
+from collections import Counter
+
+from django.contrib import admin
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+
+from accounts import geography
+from monitoring.sql import fingerprint
+from . import dataset
+
+
+def describe(queries, limit=5):
+    """Eng ko'p takrorlangan so'rovlar (N+1 belgisi)"""
+    counts = Counter(fingerprint(q['sql']) for q in queries)
+    lines = [
+        f"  {n}x  {sql[:300]}"
+        for sql, n in counts.most_common(limit)
+    ]
+    return "\n".join(lines)
+
+
+def namespace_routes(namespace):
+    """Namespace ichidagi barcha nomlangan URL lar"""
+    _, resolver = get_resolver().namespace_dict[namespace]
+    return {
+        f"{namespace}:{pattern.name}"
+        for pattern in resolver.url_patterns
+        if getattr(pattern, 'name', None)
+    }
+
+
+class QueryBudgetMixin:
+    """
+    TestCase uchun aralashma.
+
+    budgets = {'tasks:task_list': (8, None),
+               'tasks:task_detail': (12, lambda t: [t.dataset.task.pk])}
+    Byudjet None — sahifa o'lchanmaydi (masalan, logout).
+    namespaces — barcha URL lari byudjetga ega bo'lishi shart bo'lgan ilovalar.
+    headers — har bir so'rovga qo'shiladigan sarlavhalar (masalan, X-Bot-Token).
+    grow_options — dataset.grow() parametrlari.
+    """
+    budgets = {}
+    namespaces = ()
+    headers = {}
+    grow_factor = 3
+    grow_options = {}
+    dataset_options = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.dataset = dataset.build(**cls.dataset_options)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.dataset.admin)
+        # Hududlar daraxti jarayon keshida turgan holat o'lchanadi (barqaror holat)
+        geography.clear()
+        geography.get_tree()
+
+    def budget_url(self, name):
+        _, args = self.budgets[name]
+        return reverse(name, args=args(self) if args else None)
+
+    def capture(self, path, method='get', **extra):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(path, headers=self.headers, **extra)
+        self.assertLess(response.status_code, 400, f"{path} -> {response.status_code}")
+        return response, ctx.captured_queries
+
+    def assertWithinBudget(self, path, budget, method='get', **extra):
+        _, queries = self.capture(path, method, **extra)
+        if len(queries) > budget:
+            self.fail(
+                f"{path}: {len(queries)} ta so'rov, byudjet {budget}\n{describe(queries)}"
+            )
+        return len(queries)
+
+    def assertBudgetsCovered(self):
+        """Namespace dagi har bir view uchun byudjet e'lon qilinganmi"""
+        for namespace in self.namespaces:
+            missing = namespace_routes(namespace) - set(self.budgets)
+            self.assertFalse(missing, f"Byudjetsiz view lar: {sorted(missing)}")
+
+    def assertQueryBudgets(self):
+        """Byudjet + to'plam kattalashganda so'rovlar soni o'zgarmasligi"""
+        measured = {}
+        for name, (budget, _) in self.budgets.items():
+            if budget is not None:
+                measured[name] = self.assertWithinBudget(self.budget_url(name), budget)
+
+        dataset.grow(self.dataset, self.grow_factor, **self.grow_options)
+
+        for name, before in measured.items():
+            path = self.budget_url(name)
+            _, queries = self.capture(path)
+            if len(queries) > before:
+                self.fail(
+                    f"{path}: N+1 — {before} -> {len(queries)} ta so'rov\n{describe(queries)}"
+                )
+
+    def assertChangelistSortable(self, model):
+        """Har bir list_display ustuni bo'yicha saralash ishlashi"""
+        model_admin = admin.site._registry[model]
+        opts = model._meta
+        url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        for i in range(len(model_admin.list_display)):
+            for order in (f'{i}', f'-{i}'):
+                self.capture(url, data={'o': order})
@@ -0,0 +1,79 @@
+"""
+Admin uchun yengil list filtrlari.
+
+Katta FK jadvallar (vazifalar, tumanlar) uchun RelatedFieldListFilter har
+so'rovda butun jadvalni yon panelga chiqaradi. AutocompleteFilter faqat
+tanlangan qiymatni yuklaydi, qolganini admin autocomplete endpointi orqali
+prefiks bo'yicha qidiradi.
+"""
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Q
+
+
+def is_autocomplete(request):
+    """So'rov admin autocomplete endpointigami"""
+    match = getattr(request, 'resolver_match', None)
+    return match is not None and match.url_name == 'autocomplete'
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """
+    list_filter = [('task', AutocompleteFilter)]
+
+    Bog'langan model admini search_fields ga ega bo'lishi kerak.
+    """
+    template = 'admin/autocomplete_filter.html'
+
+    def field_choices(self, field, request, model_admin):
+        # Faqat tanlangan qiymatlar — butun jadval yuklanmaydi
+        if not self.lookup_val:
+            return []
+        related = field.remote_field.model
+        return [
+            (obj.pk, str(obj))
+            for obj in related._default_manager.filter(pk__in=self.lookup_val)
+        ]
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        self.query_template = changelist.get_query_string(
+            {self.lookup_kwarg: '__value__'}, [self.lookup_kwarg_isnull]
+        )
+        self.source = self.field.model._meta
+        return super().choices(changelist)
+
+
+class AutocompleteFilterMixin:
+    """AutocompleteFilter ishlatadigan ModelAdmin uchun select2 media"""
+
+    @property
+    def media(self):
+        return (
+            super().media
+            + AutocompleteSelect(None, self.admin_site).media
+            + forms.Media(js=['admin/js/autocomplete_filter.js'])
+        )
+
+
+class PrefixSearchMixin:
+    """
+    Autocomplete so'rovlarida icontains o'rniga prefiks qidiruv.
+    UPPER(col) text_pattern_ops indeksi bilan ishlaydi.
+    """
+    prefix_search_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        if not (self.prefix_search_fields and is_autocomplete(request)):
+            return super().get_search_results(request, queryset, search_term)
+
+        term = search_term.strip()
+        if term:
+            condition = Q()
+            for field in self.prefix_search_fields:
+                condition |= Q(**{f'{field}__istartswith': term})
+            queryset = queryset.filter(condition)
+        return queryset, False
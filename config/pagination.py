@@ -0,0 +1,97 @@
+"""
+Katta jadvallar uchun taxminiy sanoqli paginator.
+
+Kichik natijalarda aniq COUNT(*) ishlatiladi. PostgreSQL da reja bo'yicha
+taxmin (pg_class.reltuples yoki EXPLAIN) chegaradan oshsa, o'sha taxmin
+qaytariladi va qisqa muddat keshlanadi. Boshqa bazalarda doim aniq sanoq.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+ESTIMATE_THRESHOLD = 10000
+ESTIMATE_CACHE_TIMEOUT = 60
+
+
+def _is_plain_table(query):
+    """Filtrsiz, JOIN siz so'rov — reltuples yetarli"""
+    return (
+        not query.where
+        and not query.distinct
+        and query.low_mark == 0
+        and query.high_mark is None
+        and len([a for a in query.alias_map.values() if a.join_type]) == 0
+    )
+
+
+def estimate_count(queryset):
+    """PostgreSQL rejasi bo'yicha qatorlar soni yoki None"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    queryset = queryset.order_by()
+    query = queryset.query
+
+    with connection.cursor() as cursor:
+        if _is_plain_table(query):
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            # -1 — jadval hali ANALYZE qilinmagan
+            if row and row[0] >= 0:
+                return row[0]
+            return None
+
+        sql, params = query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    count chegaradan katta bo'lsa taxminiy bo'ladi;
+    shablonlarda paginator.approximate orqali "~" belgisi qo'yiladi.
+    """
+    threshold = ESTIMATE_THRESHOLD
+    cache_timeout = ESTIMATE_CACHE_TIMEOUT
+
+    approximate = False
+
+    def _cache_key(self):
+        query = self.object_list.query
+        sql, params = query.sql_with_params()
+        digest = hashlib.md5(f"{sql}|{params!r}".encode(), usedforsecurity=False).hexdigest()
+        return f"paginator:estimate:{self.object_list.db}:{digest}"
+
+    def _estimate(self):
+        if not hasattr(self.object_list, 'query'):
+            return None
+
+        key = self._cache_key()
+        estimate = cache.get(key)
+        if estimate is None:
+            estimate = estimate_count(self.object_list)
+            if estimate is None:
+                return None
+            cache.set(key, estimate, self.cache_timeout)
+        return estimate
+
+    @cached_property
+    def count(self):
+        estimate = self._estimate()
+        if estimate is not None and estimate >= self.threshold:
+            self.approximate = True
+            return estimate
+        return super().count
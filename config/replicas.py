@@ -0,0 +1,213 @@
+"""
+O'qish replikasiga yo'naltirish.
+
+Og'ir, faqat o'qiydigan sahifalar (dashboard, natijalar, eksport) replika
+bazadan o'qiydi, yozuvlar doim 'default' ga ketadi.
+
+- use_replica — view dekoratori / context manager: ichidagi o'qishlar replikaga.
+- read_alias() — alohida querysetlar uchun: qs.using(read_alias()).
+- ReplicaPinMiddleware — foydalanuvchi o'zi yozgandan keyin REPLICA_PIN_SECONDS
+  davomida sessiya primaryga bog'lanadi (read-your-writes).
+- Replika REPLICA_MAX_LAG soniyadan ko'p orqada qolsa yoki ulanib bo'lmasa
+  o'qishlar primaryga qaytadi.
+
+Replika sozlanmagan bo'lsa (DATABASES da 'replica' yo'q) hammasi 'default'.
+Testlarda replika TEST MIRROR bo'lgani uchun u ham 'default' ga yo'naltiriladi.
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.backends.base.creation import TEST_DATABASE_PREFIX
+
+
+REPLICA_ALIAS = 'replica'
+PIN_SESSION_KEY = '_replica_pin_until'
+
+_use_replica = ContextVar('use_replica', default=False)
+_session = ContextVar('replica_session', default=None)
+
+# alias -> (tekshirilgan vaqt, lag soniyalarda yoki None — ulanib bo'lmadi)
+_lag_cache = {}
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+# ==================== HOLAT ====================
+def _is_test_database(alias):
+    """Ulanish test bazasidami (create_test_db NAME ni almashtirgan)"""
+    settings_dict = connections[alias].settings_dict
+    name = str(settings_dict['NAME'])
+    return (
+        name == settings_dict.get('TEST', {}).get('NAME')
+        or name.startswith(TEST_DATABASE_PREFIX)
+        or 'mode=memory' in name
+    )
+
+
+def _is_test_mirror(alias):
+    """
+    Replika TEST MIRROR sifatida primaryning test bazasiga ulanganmi.
+    Test runner set_as_test_mirror bilan replika NAME ini primarynikiga
+    almashtiradi, lekin ulanish alohida bo'lib, TestCase tranzaksiyasidagi
+    ma'lumotlarni ko'rmaydi — bunday holatda o'qishlar primaryda qoladi.
+    """
+    mirror = settings.DATABASES.get(alias, {}).get('TEST', {}).get('MIRROR')
+    if not mirror or mirror not in settings.DATABASES:
+        return False
+    return (
+        connections[alias].settings_dict['NAME'] == connections[mirror].settings_dict['NAME']
+        and _is_test_database(mirror)
+    )
+
+
+def replica_lag(alias=REPLICA_ALIAS):
+    """Replika kechikishi (soniya); ulanib bo'lmasa None. Qisqa muddat keshlanadi"""
+    now = time.monotonic()
+    checked = _lag_cache.get(alias)
+    if checked and now - checked[0] < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return checked[1]
+
+    connection = connections[alias]
+    try:
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+        else:
+            lag = 0.0
+    except DatabaseError:
+        lag = None
+
+    _lag_cache[alias] = (now, lag)
+    return lag
+
+
+def replica_usable(alias=REPLICA_ALIAS):
+    if alias not in settings.DATABASES or _is_test_mirror(alias):
+        return False
+    lag = replica_lag(alias)
+    return lag is not None and lag <= settings.REPLICA_MAX_LAG
+
+
+def _is_pinned():
+    # Sessiya faqat replika so'ralganda o'qiladi
+    session = _session.get()
+    return session is not None and session.get(PIN_SESSION_KEY, 0) > time.time()
+
+
+def read_alias():
+    """Joriy kontekstda o'qish uchun baza: replika yoki 'default'"""
+    if _use_replica.get() and not _is_pinned() and replica_usable(REPLICA_ALIAS):
+        return REPLICA_ALIAS
+    return DEFAULT_DB_ALIAS
+
+
+# ==================== OPT-IN ====================
+@contextmanager
+def replica_reads():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def use_replica(view_func):
+    """
+    @login_required
+    @use_replica
+    def statistics(request): ...
+    """
+    @functools.wraps(view_func)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view_func(*args, **kwargs)
+    return wrapper
+
+
+# ==================== ROUTER ====================
+class ReplicaRouter:
+    """Faqat use_replica ichidagi o'qishlar replikaga; yozuv va migratsiya — default"""
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Bog'langan obyektlar o'zi yuklangan bazadan o'qiladi
+            return instance._state.db
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replika primaryning nusxasi — bir xil ma'lumotlar
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+# ==================== MIDDLEWARE ====================
+class ReplicaPinMiddleware:
+    """
+    O'zgartiruvchi so'rovdan (POST, PUT, PATCH, DELETE) keyin sessiyani
+    REPLICA_PIN_SECONDS davomida primaryga bog'laydi.
+    SessionMiddleware dan keyin turishi kerak.
+    """
+    UNSAFE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _should_pin(self, request, session):
+        return (
+            session is not None
+            and request.method in self.UNSAFE_METHODS
+            and not session.is_empty()
+        )
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        session = getattr(request, 'session', None)
+
+        token = _session.set(session)
+        try:
+            response = self.get_response(request)
+        finally:
+            _session.reset(token)
+
+        if self._should_pin(request, session):
+            session[PIN_SESSION_KEY] = time.time() + settings.REPLICA_PIN_SECONDS
+        return response
+
+    async def __acall__(self, request):
+        # ContextVar sync_to_async oqimlariga ham o'tadi (read_alias u yerda chaqiriladi)
+        session = getattr(request, 'session', None)
+
+        token = _session.set(session)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _session.reset(token)
+
+        if self._should_pin(request, session):
+            await session.aset(PIN_SESSION_KEY, time.time() + settings.REPLICA_PIN_SECONDS)
+        return response
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -26,14 +27,19 @@ INSTALLED_APPS = [
     'tasks',
     'dashboard',
     'api',
+    'benchmarks',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'config.replicas.ReplicaPinMiddleware',
+    'monitoring.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -68,6 +74,25 @@ DATABASES = {
     }
 }
 
+# O'qish replikasi (ixtiyoriy): DB_REPLICA_HOST berilsa yoqiladi.
+# Testlarda replika 'default' test bazasining oynasi (MIRROR).
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['config.replicas.ReplicaRouter']
+
+# Yozgandan keyin sessiya shuncha soniya primarydan o'qiydi
+REPLICA_PIN_SECONDS = 5
+# Replika bundan ko'p orqada qolsa primaryga qaytiladi (soniya)
+REPLICA_MAX_LAG = 10
+REPLICA_LAG_CHECK_INTERVAL = 5
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -95,4 +120,44 @@ LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'dashboard:home'
 LOGOUT_REDIRECT_URL = 'accounts:login'
 
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Telegram bot API
+BOT_API_TOKEN = os.environ.get('BOT_API_TOKEN', '')
+
+# Vazifa savollari keshi (tasks.questions) — jarayon ichida, vazifalar soni
+TASK_QUESTION_CACHE_SIZE = 512
+
+# Offline sinxronlash kalitlari (tasks.AnswerSyncKey) saqlanish muddati —
+# prune_sync_keys. Muddatdan keyin qayta yuborilgan yozuv client_ts bo'yicha
+# eskirgan (stale) deb topiladi, qayta qo'llanmaydi
+ANSWER_SYNC_KEY_RETENTION_DAYS = 30
+
+# Yetakchilarni fayldan import (accounts.imports); None — os.cpu_count()
+LEADER_IMPORT_BATCH_SIZE = 1000
+LEADER_IMPORT_WORKERS = None
+
+# Hududlar daraxti (accounts.geography) — jarayon ichidagi kesh, bazadagi
+# versiyani tekshirish oralig'i va /accounts/geography/ uchun Cache-Control max-age
+GEOGRAPHY_CACHE_SECONDS = 300
+GEOGRAPHY_VERSION_CHECK_SECONDS = 5
+GEOGRAPHY_HTTP_MAX_AGE = 300
+
+# Monitoring (/metrics)
+MONITORING_SLOW_REQUEST_SECONDS = 1.0
+MONITORING_SLOW_SQL_TOP = 3
+MONITORING_SLOW_SAMPLES = 20
+# Proksi ortida REMOTE_ADDR proksi manzili bo'ladi — ehtiyot bo'ling
+MONITORING_ALLOWED_IPS = []
+MONITORING_METRICS_TOKEN = os.environ.get('MONITORING_METRICS_TOKEN', '')
+
+# Sekin SQL lar (monitoring.SlowQuery)
+MONITORING_SLOW_QUERY_SECONDS = 0.2
+MONITORING_SLOW_QUERY_MAX_ROWS = 500
+MONITORING_SLOW_QUERY_PLAN_TTL = 3600
+MONITORING_SLOW_QUERY_QUEUE = 100
+MONITORING_SLOW_QUERY_ASYNC = True
+
+# Profillash (?_profile=sample|cprofile, faqat superuser)
+MONITORING_PROFILE_INTERVAL = 0.005
+MONITORING_PROFILE_MAX_SECONDS = 120
@@ -0,0 +1,122 @@
+"""
+Model holatini kuzatish.
+
+FieldTrackerMixin bazadan yuklangan (yoki saqlangan) qiymatlarni eslab
+qoladi. Shu orqali save() ichida eski qatorni qayta o'qimasdan o'zgargan
+maydonlarni bilish mumkin, va qisman saqlashda update_fields avtomatik
+to'ldiriladi.
+
+    class Task(FieldTrackerMixin, models.Model):
+        def save(self, *args, **kwargs):
+            if self.has_changed('status'):
+                ...
+            super().save(*args, **kwargs)
+
+Eslatma: hech narsa o'zgarmagan bo'lsa (va auto_now maydon yo'q bo'lsa)
+Django UPDATE yubormaydi va pre_save/post_save signallari ham chaqirilmaydi.
+"""
+import copy
+
+from django.db import models
+
+
+_MUTABLE = (dict, list, set)
+
+
+def _snapshot_value(value):
+    # JSONField va shunga o'xshash qiymatlar joyida o'zgartirilishi mumkin
+    if isinstance(value, _MUTABLE):
+        return copy.deepcopy(value)
+    return value
+
+
+class FieldTrackerMixin:
+    """
+    has_changed(field), changed_fields, initial_value(field).
+    auto_update_fields = False bo'lsa save() odatdagidek barcha maydonlarni yozadi.
+    """
+    auto_update_fields = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+
+    # ==================== HOLAT ====================
+    def _tracked_fields(self):
+        return [f for f in self._meta.concrete_fields if not f.primary_key]
+
+    def _snapshot(self, fields=None):
+        loaded = getattr(self, '_loaded_values', None)
+        if fields is None:
+            loaded = self._loaded_values = {}
+        elif loaded is None:
+            # Qisman saqlangan, kuzatilmagan obyekt — to'liq holat noma'lum
+            return
+        for field in self._tracked_fields():
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            # Kechiktirilgan (defer) maydonlar eslab qolinmaydi
+            if field.attname in self.__dict__:
+                loaded[field.attname] = _snapshot_value(self.__dict__[field.attname])
+
+    @property
+    def is_tracked(self):
+        return getattr(self, '_loaded_values', None) is not None
+
+    def initial_value(self, field_name):
+        field = self._meta.get_field(field_name)
+        return self._loaded_values.get(field.attname) if self.is_tracked else None
+
+    def has_changed(self, field_name):
+        """Yangi (saqlanmagan) obyektlar uchun doim False"""
+        if not self.is_tracked:
+            return False
+        field = self._meta.get_field(field_name)
+        return field.name in self.changed_fields
+
+    @property
+    def changed_fields(self):
+        """{maydon nomi: eski qiymat}"""
+        if not self.is_tracked:
+            return {}
+
+        changed = {}
+        for field in self._tracked_fields():
+            if field.attname not in self.__dict__:
+                continue
+            if field.attname not in self._loaded_values:
+                # Kechiktirilgan maydonga qiymat berilgan
+                changed[field.name] = None
+            elif self.__dict__[field.attname] != self._loaded_values[field.attname]:
+                changed[field.name] = self._loaded_values[field.attname]
+        return changed
+
+    # ==================== SAQLASH ====================
+    def _auto_update_fields(self):
+        fields = set(self.changed_fields)
+        fields.update(
+            f.name for f in self._tracked_fields()
+            if isinstance(f, models.DateField) and f.auto_now
+        )
+        return fields
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if (
+            self.auto_update_fields
+            and self.is_tracked
+            and not self._state.adding
+            and update_fields is None
+            and not args
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = update_fields = self._auto_update_fields()
+
+        super().save(*args, **kwargs)
+        self._snapshot(update_fields)
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._snapshot(fields)
@@ -9,6 +9,7 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')),
     path('tasks/', include('tasks.urls')),
     path('api/', include('api.urls')),
+    path('metrics', include('monitoring.urls')),
 ]
 
 if settings.DEBUG:
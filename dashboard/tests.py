@@ -1,3 +1,145 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends.cache import SessionStore
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from accounts.models import User
+from benchmarks.querybudget import QueryBudgetMixin
+from config import replicas
+from config.replicas import ReplicaPinMiddleware, ReplicaRouter, read_alias, replica_reads
+
+
+class DashboardQueryBudgetTests(QueryBudgetMixin, TestCase):
+    namespaces = ['dashboard']
+    budgets = {
+        'dashboard:home': (7, None),
+        'dashboard:statistics': (9, None),
+    }
+
+    def test_routes_have_budgets(self):
+        self.assertBudgetsCovered()
+
+    def test_query_budgets(self):
+        self.assertQueryBudgets()
+
+
+@override_settings(REPLICA_MAX_LAG=10, REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTests(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.multiple(
+            replicas, _is_test_mirror=mock.Mock(return_value=False),
+            replica_lag=mock.Mock(return_value=0.0),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        settings_patcher = mock.patch.dict(replicas.settings.DATABASES, {'replica': {}})
+        settings_patcher.start()
+        self.addCleanup(settings_patcher.stop)
+
+    def test_reads_stay_on_primary_without_opt_in(self):
+        self.assertEqual(read_alias(), 'default')
+        self.assertEqual(ReplicaRouter().db_for_read(None), 'default')
+
+    def test_opt_in_reads_go_to_replica(self):
+        router = ReplicaRouter()
+        with replica_reads():
+            self.assertEqual(router.db_for_read(None), 'replica')
+            self.assertEqual(router.db_for_write(None), 'default')
+        self.assertEqual(read_alias(), 'default')
+
+    def test_lagging_or_unreachable_replica_falls_back(self):
+        with replica_reads():
+            replicas.replica_lag.return_value = 60.0
+            self.assertEqual(read_alias(), 'default')
+            replicas.replica_lag.return_value = None
+            self.assertEqual(read_alias(), 'default')
+
+    def test_not_configured(self):
+        del replicas.settings.DATABASES['replica']
+        with replica_reads():
+            self.assertEqual(read_alias(), 'default')
+
+    def test_session_pinned_after_write(self):
+        seen = []
+
+        def view(request):
+            with replica_reads():
+                seen.append(read_alias())
+            return HttpResponse()
+
+        middleware = ReplicaPinMiddleware(view)
+        factory = RequestFactory()
+        session = SessionStore()
+        session['_auth_user_id'] = '1'
+
+        for method in ('get', 'post', 'get'):
+            request = getattr(factory, method)('/')
+            request.session = session
+            middleware(request)
+
+        self.assertEqual(seen, ['replica', 'replica', 'default'])
+        self.assertGreater(session[replicas.PIN_SESSION_KEY], time.time())
+
+    async def test_session_pinned_after_async_write(self):
+        seen = []
+
+        async def view(request):
+            with replica_reads():
+                # ORM async view larda sync_to_async oqimida ishlaydi
+                seen.append(await sync_to_async(read_alias)())
+            return HttpResponse()
+
+        middleware = ReplicaPinMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        factory = RequestFactory()
+        session = SessionStore()
+        await session.aset('_auth_user_id', '1')
+
+        for method in ('get', 'post', 'get'):
+            request = getattr(factory, method)('/')
+            request.session = session
+            await middleware(request)
+
+        self.assertEqual(seen, ['replica', 'replica', 'default'])
+        self.assertGreater(await session.aget(replicas.PIN_SESSION_KEY), time.time())
+
+
+class ReplicaTestMirrorTests(TestCase):
+    """Haqiqiy TEST MIRROR alias — test runner kabi set_as_test_mirror bilan"""
+    alias = 'mirror_replica'
+
+    def setUp(self):
+        replica = {
+            **connections['default'].settings_dict,
+            'HOST': 'replica.invalid',
+            'NAME': 'hermes_replica',
+            'TEST': {'MIRROR': 'default'},
+        }
+        patcher = mock.patch.dict(settings.DATABASES, {self.alias: replica})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(connections.__delitem__, self.alias)
+        alias_patcher = mock.patch.object(replicas, 'REPLICA_ALIAS', self.alias)
+        alias_patcher.start()
+        self.addCleanup(alias_patcher.stop)
+
+    def test_mirror_reads_stay_on_primary(self):
+        # Sozlangan, lekin hali oyna emas (production holati)
+        self.assertFalse(replicas._is_test_mirror(self.alias))
+
+        connections[self.alias].creation.set_as_test_mirror(connections['default'].settings_dict)
+        self.assertTrue(replicas._is_test_mirror(self.alias))
+        self.assertFalse(replicas.replica_usable(self.alias))
+
+        # Replikaga yo'naltirilsa TestCase so'rovni taqiqlagan bo'lardi
+        user = User.objects.create(username='mirror_check')
+        with replica_reads():
+            self.assertEqual(read_alias(), 'default')
+            self.assertEqual(ReplicaRouter().db_for_read(User), 'default')
+            self.assertTrue(User.objects.filter(pk=user.pk).exists())
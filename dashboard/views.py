@@ -6,9 +6,11 @@ from datetime import timedelta
 
 from tasks.models import Task, TaskAssignment
 from accounts.models import User
+from config.replicas import use_replica
 
 
 @login_required
+@use_replica
 def home(request):
     """Bosh sahifa — asosiy statistika"""
 
@@ -16,24 +18,38 @@ def home(request):
     today = timezone.now()
     week_ago = today - timedelta(days=7)
 
-    # Umumiy statistika
+    # Umumiy statistika — har bir jadval uchun bitta aggregate so'rov
+    task_counts = Task.objects.aggregate(
+        total_tasks=Count('id'),
+        active_tasks=Count('id', filter=Q(status=Task.Status.ACTIVE)),
+        completed_tasks=Count('id', filter=Q(status=Task.Status.COMPLETED)),
+        new_tasks=Count('id', filter=Q(created_at__gte=week_ago)),
+        overdue_tasks=Count('id', filter=Q(status=Task.Status.ACTIVE, deadline__lt=today)),
+    )
+    leader_counts = User.objects.filter(role=User.Role.LEADER).aggregate(
+        total_leaders=Count('id'),
+        active_leaders=Count('id', filter=Q(status=User.Status.ACTIVE)),
+    )
+    assignment_counts = TaskAssignment.objects.aggregate(
+        pending=Count('id', filter=Q(status=TaskAssignment.Status.PENDING)),
+        seen=Count('id', filter=Q(status=TaskAssignment.Status.SEEN)),
+        in_progress=Count('id', filter=Q(status=TaskAssignment.Status.IN_PROGRESS)),
+        completed=Count('id', filter=Q(status=TaskAssignment.Status.COMPLETED)),
+        completed_week=Count('id', filter=Q(completed_at__gte=week_ago)),
+    )
+
     stats = {
-        'total_tasks': Task.objects.count(),
-        'active_tasks': Task.objects.filter(status=Task.Status.ACTIVE).count(),
-        'completed_tasks': Task.objects.filter(status=Task.Status.COMPLETED).count(),
-        'total_leaders': User.objects.filter(role=User.Role.LEADER).count(),
-        'active_leaders': User.objects.filter(
-            role=User.Role.LEADER,
-            status=User.Status.ACTIVE
-        ).count(),
+        'total_tasks': task_counts['total_tasks'],
+        'active_tasks': task_counts['active_tasks'],
+        'completed_tasks': task_counts['completed_tasks'],
+        'total_leaders': leader_counts['total_leaders'],
+        'active_leaders': leader_counts['active_leaders'],
     }
 
     # Oxirgi 7 kunlik statistika
     weekly_stats = {
-        'new_tasks': Task.objects.filter(created_at__gte=week_ago).count(),
-        'completed_assignments': TaskAssignment.objects.filter(
-            completed_at__gte=week_ago
-        ).count(),
+        'new_tasks': task_counts['new_tasks'],
+        'completed_assignments': assignment_counts.pop('completed_week'),
     }
 
     # Faol vazifalar (muddati yaqin)
@@ -47,18 +63,10 @@ def home(request):
     ).order_by('-sent_at')[:10]
 
     # Muddati o'tgan vazifalar
-    overdue_tasks = Task.objects.filter(
-        status=Task.Status.ACTIVE,
-        deadline__lt=today
-    ).count()
+    overdue_tasks = task_counts['overdue_tasks']
 
     # Bajarilish bo'yicha statistika
-    assignment_stats = {
-        'pending': TaskAssignment.objects.filter(status=TaskAssignment.Status.PENDING).count(),
-        'seen': TaskAssignment.objects.filter(status=TaskAssignment.Status.SEEN).count(),
-        'in_progress': TaskAssignment.objects.filter(status=TaskAssignment.Status.IN_PROGRESS).count(),
-        'completed': TaskAssignment.objects.filter(status=TaskAssignment.Status.COMPLETED).count(),
-    }
+    assignment_stats = assignment_counts
 
     context = {
         'stats': stats,
@@ -73,6 +81,7 @@ def home(request):
 
 
 @login_required
+@use_replica
 def statistics(request):
     """Batafsil statistika sahifasi"""
 
@@ -104,27 +113,34 @@ def statistics(request):
     # Mahallalar bo'yicha
     from accounts.models import Mahalla
     mahalla_stats = Mahalla.objects.annotate(
-        leaders_count=Count('users', filter=Q(users__role=User.Role.LEADER)),
-        tasks_count=Count('tasks')
+        leaders_count=Count('users', filter=Q(users__role=User.Role.LEADER), distinct=True),
+        tasks_count=Count('tasks', distinct=True)
     ).order_by('-tasks_count')[:10]
 
-    # Oylik trend (oxirgi 6 oy)
-    monthly_data = []
+    # Oylik trend (oxirgi 6 oy) — har bir jadval uchun bitta so'rov
+    months = []
     for i in range(5, -1, -1):
         month_start = (today.replace(day=1) - timedelta(days=i * 30)).replace(day=1)
         month_end = (month_start + timedelta(days=32)).replace(day=1)
-
-        monthly_data.append({
-            'month': month_start.strftime('%B'),
-            'tasks': Task.objects.filter(
-                created_at__gte=month_start,
-                created_at__lt=month_end
-            ).count(),
-            'completed': TaskAssignment.objects.filter(
-                completed_at__gte=month_start,
-                completed_at__lt=month_end
-            ).count()
-        })
+        months.append((month_start, month_end))
+
+    task_months = Task.objects.aggregate(**{
+        f'm{i}': Count('id', filter=Q(created_at__gte=start, created_at__lt=end))
+        for i, (start, end) in enumerate(months)
+    })
+    completed_months = TaskAssignment.objects.aggregate(**{
+        f'm{i}': Count('id', filter=Q(completed_at__gte=start, completed_at__lt=end))
+        for i, (start, end) in enumerate(months)
+    })
+
+    monthly_data = [
+        {
+            'month': start.strftime('%B'),
+            'tasks': task_months[f'm{i}'],
+            'completed': completed_months[f'm{i}'],
+        }
+        for i, (start, _) in enumerate(months)
+    ]
 
     context = {
         'tasks_by_status': tasks_by_status,
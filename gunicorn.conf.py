@@ -0,0 +1,23 @@
+"""
+Gunicorn sozlamalari.
+
+SERVER_MODE=wsgi  — oddiy sync workerlar (config.wsgi)
+SERVER_MODE=asgi  — uvicorn workerlar (config.asgi); sekin mobil mijozlar
+                    workerni band qilib qo'ymaydi, async viewlar event loopda ishlaydi
+"""
+import multiprocessing
+import os
+
+mode = os.environ.get('SERVER_MODE', 'wsgi')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+
+if mode == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'config.wsgi:application'
+    worker_class = 'sync'
@@ -0,0 +1,176 @@
+import os
+
+from django.contrib import admin
+from django.db.models import F
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
+
+from config.pagination import EstimatedCountPaginator
+from .models import SlowQuery, Profile
+
+
+class SuperuserOnlyMixin:
+    """Ko'rish va o'chirish faqat superuser uchun, qo'shish/tahrirlash yo'q"""
+
+    def has_module_permission(self, request):
+        return request.user.is_superuser
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_delete_permission(self, request, obj=None):
+        return request.user.is_superuser
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(SuperuserOnlyMixin, admin.ModelAdmin):
+    """Eng ko'p vaqt olgan fingerprintlar"""
+    list_display = [
+        'fingerprint_short',
+        'source',
+        'calls',
+        'total_time_display',
+        'avg_time_display',
+        'max_time_display',
+        'has_plan',
+        'last_seen',
+    ]
+    list_filter = ['source']
+    search_fields = ['fingerprint', 'source']
+    ordering = ['-total_time']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = [
+        'source', 'fingerprint', 'sql', 'plan_display', 'plan_at',
+        'calls', 'total_time', 'max_time', 'first_seen', 'last_seen',
+    ]
+    fields = readonly_fields
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            avg_time_value=F('total_time') / F('calls')
+        )
+
+    # ==================== USTUNLAR ====================
+    def fingerprint_short(self, obj):
+        return format_html('<code>{}</code>', obj.fingerprint[:120])
+
+    fingerprint_short.short_description = _("Fingerprint")
+    fingerprint_short.admin_order_field = 'fingerprint'
+
+    def _seconds(self, value):
+        if value >= 1:
+            color = '#e74c3c'
+        elif value >= 0.5:
+            color = '#f39c12'
+        else:
+            color = '#2c3e50'
+        return format_html('<span style="color:{};">{} s</span>', color, f"{value:.3f}")
+
+    def total_time_display(self, obj):
+        return self._seconds(obj.total_time)
+
+    total_time_display.short_description = _("Jami")
+    total_time_display.admin_order_field = 'total_time'
+
+    def avg_time_display(self, obj):
+        return self._seconds(obj.avg_time_value)
+
+    avg_time_display.short_description = _("O'rtacha")
+    avg_time_display.admin_order_field = 'avg_time_value'
+
+    def max_time_display(self, obj):
+        return self._seconds(obj.max_time)
+
+    max_time_display.short_description = _("Eng uzun")
+    max_time_display.admin_order_field = 'max_time'
+
+    def has_plan(self, obj):
+        return bool(obj.plan)
+
+    has_plan.short_description = _("Reja")
+    has_plan.boolean = True
+
+    def plan_display(self, obj):
+        return format_html('<pre style="white-space:pre-wrap;">{}</pre>', obj.plan or '-')
+
+    plan_display.short_description = _("EXPLAIN rejasi")
+
+
+@admin.register(Profile)
+class ProfileAdmin(SuperuserOnlyMixin, admin.ModelAdmin):
+    """Profillar; ikkala rejim ham collapsed stack (flamegraph.pl, speedscope) beradi"""
+    list_display = [
+        'created_at',
+        'kind',
+        'target',
+        'mode',
+        'duration_display',
+        'samples',
+        'query_count',
+        'status_code',
+        'download_link',
+    ]
+    list_filter = ['kind', 'mode']
+    search_fields = ['target']
+    ordering = ['-created_at']
+    list_select_related = ['created_by']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = [
+        'kind', 'target', 'mode', 'duration', 'samples', 'query_count', 'status_code',
+        'created_by', 'created_at', 'download_link', 'summary_display',
+    ]
+    fields = readonly_fields
+
+    def get_urls(self):
+        return [
+            path(
+                '<path:object_id>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='monitoring_profile_download',
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, object_id):
+        if not self.has_view_permission(request):
+            raise Http404
+        profile = get_object_or_404(Profile, pk=object_id)
+        if not profile.file:
+            raise Http404
+        return FileResponse(
+            profile.file.open('rb'),
+            as_attachment=True,
+            filename=os.path.basename(profile.file.name),
+            content_type='text/plain',
+        )
+
+    def duration_display(self, obj):
+        return f"{obj.duration:.3f} s"
+
+    duration_display.short_description = _("Davomiyligi")
+    duration_display.admin_order_field = 'duration'
+
+    def download_link(self, obj):
+        if not obj.file:
+            return '-'
+        return format_html(
+            '<a href="{}">⬇ {}</a>',
+            reverse('admin:monitoring_profile_download', args=[obj.pk]), _("collapsed")
+        )
+
+    download_link.short_description = _("Yuklab olish")
+
+    def summary_display(self, obj):
+        return format_html('<pre style="white-space:pre-wrap;">{}</pre>', obj.summary or '-')
+
+    summary_display.short_description = _("Qisqacha")
@@ -0,0 +1,52 @@
+import argparse
+from contextlib import ExitStack
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from monitoring import profiling
+from monitoring.middleware import QueryRecorder
+
+
+class Command(BaseCommand):
+    help = (
+        "Boshqa buyruqni profillab ishga tushirish: "
+        "manage.py profile_command --mode sample bench --repeat 1"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=profiling.MODES, default='sample')
+        parser.add_argument('--output', help="Faylni media dan tashqari shu yo'lga ham yozish")
+        parser.add_argument('name', help="Buyruq nomi")
+        parser.add_argument('command_args', nargs=argparse.REMAINDER)
+
+    def handle(self, *args, **options):
+        name = options['name']
+        if name == 'profile_command':
+            raise CommandError("O'zini profillab bo'lmaydi")
+
+        recorder = QueryRecorder(slow_seconds=float('inf'))
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            result, _ = profiling.run(
+                options['mode'], call_command, name, *options['command_args'],
+                stdout=self.stdout._out, stderr=self.stderr._out
+            )
+
+        record = profiling.save_profile(
+            result,
+            kind='command',
+            target=' '.join([name, *options['command_args']]),
+            query_count=len(recorder.statements),
+        )
+        if options['output']:
+            with open(options['output'], 'wb') as f:
+                f.write(result.data)
+
+        self.stdout.write(result.summary)
+        self.stdout.write(self.style.SUCCESS(
+            f"Profil #{record.pk}: {result.duration:.2f}s, {result.samples} namuna, "
+            f"{record.query_count} SQL -> {record.file.name}"
+        ))
@@ -0,0 +1,197 @@
+"""
+Jarayon ichidagi ko'rsatkichlar va Prometheus matn formati.
+
+Tashqi kutubxonasiz: Counter va Histogram label qiymatlari kortej bo'yicha
+saqlanadi. Ko'rsatkichlar worker jarayoni ichida: /metrics javob bergan
+worker ning qiymatlarini qaytaradi (hermes_process_info dagi process_id).
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1000, 10000, 100000, 1000000, 10000000)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def collect(self):
+        lines = self.header()
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [bucket hisoblari..., +Inf, sum]
+        self._values = {}
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 2)
+            row[index] += 1
+            row[-1] += value
+
+    def count(self, labels=()):
+        row = self._values.get(labels)
+        return sum(row[:-1]) if row else 0
+
+    def collect(self):
+        lines = self.header()
+        with self._lock:
+            items = [(labels, list(row)) for labels, row in self._values.items()]
+        for labels, row in items:
+            cumulative = 0
+            for bound, hits in zip(self.buckets + (float('inf'),), row[:-1]):
+                cumulative += hits
+                le = _labels(self.labelnames, labels, [('le', _number(float(bound)))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            base = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {_number(row[-1])}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+class SlowSamples:
+    """Oxirgi sekin so'rovlar va ularning eng qimmat SQL lari (halqa bufer)"""
+    name = 'hermes_slow_request_sql_seconds'
+
+    def __init__(self, size=20):
+        self._samples = deque(maxlen=size)
+
+    def add(self, view, duration, statements):
+        self._samples.append((view, duration, statements, time.time()))
+
+    def resize(self, size):
+        if size != self._samples.maxlen:
+            self._samples = deque(self._samples, maxlen=size)
+
+    def clear(self):
+        self._samples.clear()
+
+    def __iter__(self):
+        return iter(list(self._samples))
+
+    def collect(self):
+        lines = [
+            f"# HELP {self.name} Oxirgi sekin so'rovlardagi eng qimmat SQL lar",
+            f"# TYPE {self.name} gauge",
+        ]
+        for view, _, statements, at in self:
+            for rank, (sql, seconds) in enumerate(statements, 1):
+                label = _labels(
+                    ('view', 'rank', 'sql', 'sampled_at'),
+                    (view, rank, sql, int(at)),
+                )
+                lines.append(f"{self.name}{label} {_number(round(seconds, 6))}")
+        return lines
+
+
+# ==================== KO'RSATKICHLAR ====================
+VIEW_LABELS = ('view', 'method')
+
+REQUESTS = Counter(
+    'hermes_http_requests_total', "HTTP so'rovlar soni",
+    ('view', 'method', 'status'),
+)
+LATENCY = Histogram(
+    'hermes_http_request_duration_seconds', "So'rovni qayta ishlash vaqti",
+    VIEW_LABELS, LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'hermes_db_queries_per_request', "Bir so'rovdagi SQL lar soni",
+    VIEW_LABELS, QUERY_BUCKETS,
+)
+DB_TIME = Histogram(
+    'hermes_db_time_seconds', "Bir so'rovdagi SQL vaqti",
+    VIEW_LABELS, LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'hermes_http_response_size_bytes', "Javob hajmi",
+    VIEW_LABELS, SIZE_BUCKETS,
+)
+SLOW_REQUESTS = Counter(
+    'hermes_slow_requests_total', "MONITORING_SLOW_REQUEST_SECONDS dan sekin so'rovlar",
+    ('view',),
+)
+SLOW_SAMPLES = SlowSamples()
+
+REGISTRY = [REQUESTS, LATENCY, DB_QUERIES, DB_TIME, RESPONSE_SIZE, SLOW_REQUESTS, SLOW_SAMPLES]
+
+
+def render():
+    """Prometheus text exposition format (0.0.4)"""
+    lines = [
+        "# HELP hermes_process_info Worker jarayoni",
+        "# TYPE hermes_process_info gauge",
+        f'hermes_process_info{{process_id="{os.getpid()}"}} 1',
+    ]
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    for metric in REGISTRY:
+        metric.clear()
@@ -0,0 +1,243 @@
+"""
+So'rov va SQL instrumentatsiyasi.
+
+MetricsMiddleware MIDDLEWARE ro'yxatida birinchi turadi: har bir so'rov
+uchun barcha DB ulanishlariga execute_wrapper o'rnatadi, SQL soni va vaqtini
+yig'adi, so'ng view bo'yicha gistogrammalarga yozadi. Sekin so'rovlarning
+eng qimmat SQL lari SLOW_SAMPLES ga, chegaradan sekin SQL lar esa
+SlowQuery jadvaliga (monitoring.slow) tushadi.
+
+Middleware lar sinxron va asinxron zanjirda ishlaydi. Async view larda ORM
+so'rovlari sync_to_async (thread_sensitive) oqimida bajariladi, DB ulanishlari
+esa oqimga bog'langan — shuning uchun execute_wrapper o'sha oqimda o'rnatiladi
+va olib tashlanadi.
+"""
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from . import metrics, profiling, slow
+from .sql import fingerprint
+
+
+# method yorlig'i qiymatlari cheklangan: ixtiyoriy metodlar qator sonini oshirmasin
+METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper uchun: (sql, soniya) ro'yxati.
+    Chegaradan sekinlari parametrlari bilan slow ga tushadi.
+    """
+
+    __slots__ = ('statements', 'total', 'slow', 'slow_seconds')
+
+    def __init__(self, slow_seconds=None):
+        self.statements = []
+        self.total = 0.0
+        self.slow = []
+        if slow_seconds is None:
+            slow_seconds = settings.MONITORING_SLOW_QUERY_SECONDS
+        self.slow_seconds = slow_seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.total += elapsed
+            self.statements.append((sql, elapsed))
+            if elapsed >= self.slow_seconds and not many:
+                self.slow.append((sql, params, elapsed))
+
+    def top(self, limit):
+        """Fingerprint bo'yicha jamlangan eng qimmat SQL lar"""
+        grouped = {}
+        for sql, elapsed in self.statements:
+            key = fingerprint(sql)
+            grouped[key] = grouped.get(key, 0.0) + elapsed
+        ranked = sorted(grouped.items(), key=lambda item: item[1], reverse=True)
+        return [(sql[:500], seconds) for sql, seconds in ranked[:limit]]
+
+
+def install_recorder(stack, recorder):
+    """recorder ni joriy oqimdagi barcha DB ulanishlariga o'rnatish (stack yopilganda olinadi)"""
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(recorder))
+
+
+async def acall_recorded(get_response, request, recorder):
+    """Async zanjir: recorder ORM so'rovlari bajariladigan oqimda o'rnatiladi"""
+    stack = ExitStack()
+    await sync_to_async(install_recorder)(stack, recorder)
+    try:
+        return await get_response(request)
+    finally:
+        await sync_to_async(stack.close)()
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.slow_seconds = settings.MONITORING_SLOW_REQUEST_SECONDS
+        self.top_sql = settings.MONITORING_SLOW_SQL_TOP
+        metrics.SLOW_SAMPLES.resize(settings.MONITORING_SLOW_SAMPLES)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            install_recorder(stack, recorder)
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        self.record(request, response, duration, recorder)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        response = await acall_recorded(self.get_response, request, recorder)
+        duration = time.perf_counter() - start
+
+        if recorder.slow:
+            # Sekin SQL lar sinxron rejimda shu yerda bazaga yoziladi
+            await sync_to_async(self.record)(request, response, duration, recorder)
+        else:
+            self.record(request, response, duration, recorder)
+        return response
+
+    def record(self, request, response, duration, recorder):
+        view = view_name(request)
+        method = request.method if request.method in METHODS else 'OTHER'
+        labels = (view, method)
+
+        metrics.REQUESTS.inc((view, method, str(response.status_code)))
+        metrics.LATENCY.observe(labels, duration)
+        metrics.DB_QUERIES.observe(labels, len(recorder.statements))
+        metrics.DB_TIME.observe(labels, recorder.total)
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.observe(labels, len(response.content))
+
+        if duration >= self.slow_seconds:
+            metrics.SLOW_REQUESTS.inc((view,))
+            metrics.SLOW_SAMPLES.add(view, duration, recorder.top(self.top_sql))
+        if recorder.slow:
+            slow.submit(view, recorder.slow)
+
+
+class ProfilerMiddleware:
+    """
+    Superuser so'rovini profillash: ?_profile=sample|cprofile yoki
+    X-Profile sarlavhasi. AuthenticationMiddleware dan keyin turishi kerak.
+    Javobga X-Profile-Id qo'shiladi, profil admin da yuklab olinadi.
+
+    ASGI da sync view lar sync_to_async oqimida bajariladi, voqealar tsikli
+    oqimida emas — shuning uchun ular process_view da, view chaqiruvining
+    o'zi profillanadi (middleware lar profilga kirmaydi). process_view dan
+    keyingi middleware lar process_view siz bo'lishi kerak.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _requested(self, request):
+        return request.GET.get('_profile') or request.headers.get('X-Profile')
+
+    def _mode(self, request, user):
+        mode = self._requested(request)
+        if not mode or user is None or not user.is_superuser:
+            return None
+        return mode if mode in profiling.MODES else 'sample'
+
+    def _save(self, request, response, result, recorder):
+        record = profiling.save_profile(
+            result,
+            kind='request',
+            target=f"{request.method} {request.get_full_path()}",
+            user=request.user,
+            status_code=response.status_code,
+            query_count=len(recorder.statements),
+        )
+        response['X-Profile-Id'] = str(record.pk)
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        mode = self._mode(request, getattr(request, 'user', None))
+        if mode is None:
+            return self.get_response(request)
+
+        recorder = QueryRecorder(slow_seconds=float('inf'))
+        with ExitStack() as stack:
+            install_recorder(stack, recorder)
+            result, response = profiling.run(mode, self.get_response, request)
+
+        return self._save(request, response, result, recorder)
+
+    async def __acall__(self, request):
+        # Foydalanuvchi faqat profil so'ralganda yuklanadi
+        if not self._requested(request) or not hasattr(request, 'auser'):
+            return await self.get_response(request)
+        mode = self._mode(request, await request.auser())
+        if mode is None:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder(slow_seconds=float('inf'))
+        if not self._async_view(request):
+            # Profil process_view da, view bajariladigan oqimda olinadi
+            request._profile_mode = mode
+            response = await acall_recorded(self.get_response, request, recorder)
+            result = getattr(request, '_profile_result', None)
+            if result is None:
+                return response
+        else:
+            # Async view: namunalar voqealar tsikli oqimidan (view korutinasi steki)
+            with profiling.profile(mode) as result:
+                response = await acall_recorded(self.get_response, request, recorder)
+
+        return await sync_to_async(self._save)(request, response, result, recorder)
+
+    def _async_view(self, request):
+        try:
+            match = resolve(request.path_info, getattr(request, 'urlconf', None))
+        except Resolver404:
+            return False
+        return iscoroutinefunction(match.func)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        mode = getattr(request, '_profile_mode', None)
+        if mode is None:
+            return None
+        request._profile_result, response = profiling.run(
+            mode, view_func, request, *view_args, **view_kwargs
+        )
+        return response
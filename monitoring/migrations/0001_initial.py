@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-19 01:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint_hash', models.CharField(max_length=32, verbose_name='Fingerprint xeshi')),
+                ('fingerprint', models.TextField(verbose_name='Fingerprint')),
+                ('source', models.CharField(help_text='view, admin sahifasi yoki buyruq nomi', max_length=200, verbose_name='Manba')),
+                ('sql', models.TextField(verbose_name='Oxirgi SQL')),
+                ('plan', models.TextField(blank=True, verbose_name='EXPLAIN rejasi')),
+                ('plan_at', models.DateTimeField(blank=True, null=True, verbose_name='Reja olingan')),
+                ('calls', models.PositiveIntegerField(default=0, verbose_name='Soni')),
+                ('total_time', models.FloatField(default=0, verbose_name='Jami vaqt (s)')),
+                ('max_time', models.FloatField(default=0, verbose_name='Eng uzun (s)')),
+                ('first_seen', models.DateTimeField(auto_now_add=True, verbose_name='Birinchi marta')),
+                ('last_seen', models.DateTimeField(db_index=True, verbose_name='Oxirgi marta')),
+            ],
+            options={
+                'verbose_name': "Sekin so'rov",
+                'verbose_name_plural': "Sekin so'rovlar",
+                'ordering': ['-total_time'],
+                'indexes': [models.Index(fields=['-total_time'], name='monitoring__total_t_fa441f_idx')],
+                'unique_together': {('fingerprint_hash', 'source')},
+            },
+        ),
+    ]
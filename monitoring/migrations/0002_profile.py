@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-19 01:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Profile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('request', "So'rov"), ('command', 'Buyruq')], max_length=20, verbose_name='Turi')),
+                ('target', models.CharField(max_length=300, verbose_name='Manzil / buyruq')),
+                ('mode', models.CharField(choices=[('sample', 'Stek namunalari'), ('cprofile', 'cProfile')], max_length=20, verbose_name='Rejim')),
+                ('file', models.FileField(upload_to='profiles/%Y/%m/', verbose_name='Fayl')),
+                ('summary', models.TextField(blank=True, verbose_name='Qisqacha')),
+                ('duration', models.FloatField(default=0, verbose_name='Davomiyligi (s)')),
+                ('samples', models.PositiveIntegerField(default=0, help_text='sample: stek namunalari, cprofile: funksiyalar soni', verbose_name='Namunalar')),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='HTTP holati')),
+                ('query_count', models.PositiveIntegerField(blank=True, null=True, verbose_name='SQL soni')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Kim')),
+            ],
+            options={
+                'verbose_name': 'Profil',
+                'verbose_name_plural': 'Profillar',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
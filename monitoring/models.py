@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SlowQuery(models.Model):
+    """
+    Sekin SQL lar fingerprint va manba bo'yicha jamlangan holda.
+    Jadval halqa bufer: MONITORING_SLOW_QUERY_MAX_ROWS dan oshsa eng eski
+    (last_seen) qatorlar o'chiriladi.
+    """
+
+    # ==================== KALIT ====================
+    fingerprint_hash = models.CharField(_("Fingerprint xeshi"), max_length=32)
+    fingerprint = models.TextField(_("Fingerprint"))
+    source = models.CharField(
+        _("Manba"),
+        max_length=200,
+        help_text=_("view, admin sahifasi yoki buyruq nomi")
+    )
+
+    # ==================== NAMUNA ====================
+    sql = models.TextField(_("Oxirgi SQL"))
+    plan = models.TextField(_("EXPLAIN rejasi"), blank=True)
+    plan_at = models.DateTimeField(_("Reja olingan"), null=True, blank=True)
+
+    # ==================== STATISTIKA ====================
+    calls = models.PositiveIntegerField(_("Soni"), default=0)
+    total_time = models.FloatField(_("Jami vaqt (s)"), default=0)
+    max_time = models.FloatField(_("Eng uzun (s)"), default=0)
+
+    # ==================== VAQT ====================
+    first_seen = models.DateTimeField(_("Birinchi marta"), auto_now_add=True)
+    last_seen = models.DateTimeField(_("Oxirgi marta"), db_index=True)
+
+    class Meta:
+        verbose_name = _("Sekin so'rov")
+        verbose_name_plural = _("Sekin so'rovlar")
+        ordering = ['-total_time']
+        unique_together = ['fingerprint_hash', 'source']
+        indexes = [
+            models.Index(fields=['-total_time']),
+        ]
+
+    def __str__(self):
+        return f"{self.source}: {self.fingerprint[:80]}"
+
+    @property
+    def avg_time(self):
+        return self.total_time / self.calls if self.calls else 0
+
+
+class Profile(models.Model):
+    """Bitta so'rov yoki buyruq profili (fayl media storage da)"""
+
+    class Kind(models.TextChoices):
+        REQUEST = 'request', _("So'rov")
+        COMMAND = 'command', _("Buyruq")
+
+    class Mode(models.TextChoices):
+        SAMPLE = 'sample', _("Stek namunalari")
+        CPROFILE = 'cprofile', _("cProfile")
+
+    kind = models.CharField(_("Turi"), max_length=20, choices=Kind.choices)
+    target = models.CharField(_("Manzil / buyruq"), max_length=300)
+    mode = models.CharField(_("Rejim"), max_length=20, choices=Mode.choices)
+
+    # ==================== NATIJA ====================
+    file = models.FileField(_("Fayl"), upload_to='profiles/%Y/%m/')
+    summary = models.TextField(_("Qisqacha"), blank=True)
+    duration = models.FloatField(_("Davomiyligi (s)"), default=0)
+    samples = models.PositiveIntegerField(
+        _("Namunalar"),
+        default=0,
+        help_text=_("sample: stek namunalari, cprofile: funksiyalar soni")
+    )
+    status_code = models.PositiveSmallIntegerField(_("HTTP holati"), null=True, blank=True)
+    query_count = models.PositiveIntegerField(_("SQL soni"), null=True, blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Kim")
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _("Profil")
+        verbose_name_plural = _("Profillar")
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.target}"
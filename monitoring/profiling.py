@@ -0,0 +1,240 @@
+"""
+Bitta so'rov yoki buyruqni profillash.
+
+Ikki rejim:
+- sample  — devor soati bo'yicha stek namunalari (fon oqimi har
+  MONITORING_PROFILE_INTERVAL soniyada nishon oqim stekini oladi).
+  Natija flamegraph.pl / speedscope uchun "collapsed stack" matni.
+- cprofile — cProfile; chaqiruvchi -> chaqiriluvchi statistikasi collapsed
+  stack ga aylantiriladi (collapsed_from_stats) va kumulyativ vaqt bo'yicha
+  qisqa jadval beriladi.
+
+Ikkala rejimda ham fayl flamegraph.pl / speedscope uchun collapsed stack.
+Chaqiriluvchini run() orqali profillang: cprofile da steklar profiled()
+kadridan boshlanadi. cProfile profil yoqilishidan oldin boshlangan kadrlarni
+ko'rmaydi, rekursiv zanjirlar (Django middleware lari) esa o'zlarini
+chaqirgani uchun ildizsiz qoladi.
+
+Profil media storage ga yoziladi va monitoring.Profile qatorida saqlanadi.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+
+MODES = ('sample', 'cprofile')
+
+_SITE_MARKERS = ('site-packages' + os.sep, 'dist-packages' + os.sep)
+
+
+def _short_path(filename):
+    for marker in _SITE_MARKERS:
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        return filename[len(base):]
+    return os.path.basename(filename)
+
+
+class StackSampler:
+    """Nishon oqimning stekini davriy o'qib, collapsed stack hisoblarini yig'adi"""
+
+    def __init__(self, thread_id=None, interval=None, max_seconds=None):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval or settings.MONITORING_PROFILE_INTERVAL
+        self.max_seconds = max_seconds or settings.MONITORING_PROFILE_MAX_SECONDS
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._labels = {}
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({_short_path(code.co_filename)})"
+        return label
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        if stack:
+            stack.reverse()
+            self.stacks[';'.join(stack)] += 1
+            self.samples += 1
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval):
+            self._sample()
+            if time.monotonic() > deadline:
+                break
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self):
+        """'a (f.py);b (g.py) 12' satrlari — flamegraph.pl formati"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _func_label(func):
+    filename, _, name = func
+    if filename == '~':
+        # Ichki funksiyalar: "<built-in method time.sleep>"
+        return name
+    return f"{name} ({_short_path(filename)})"
+
+
+def collapsed_from_stats(stats, roots=None, min_seconds=1e-5, max_depth=64):
+    """
+    cProfile statistikasi (Profile.stats) -> collapsed stack matni, qiymatlar
+    mikrosekundda. cProfile to'liq steklarni emas, faqat chaqiruvchi ->
+    chaqiriluvchi juftliklarini saqlaydi, shuning uchun funksiya vaqti
+    chaqiruvchilari orasida shu juftlik ulushiga ko'ra taqsimlanadi.
+    roots — ildiz funksiyalar kalitlari; None bo'lsa chaqiruvchisizlari.
+    min_seconds dan arzon shoxlar tashlab yuboriladi.
+    """
+    children = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    stacks = Counter()
+    path = []
+    active = set()
+
+    def walk(func, share):
+        _, _, tt, ct, _ = stats[func]
+        path.append(_func_label(func))
+        active.add(func)
+        stacks[';'.join(path)] += tt * share
+        if len(path) < max_depth:
+            for child, edge_ct in children.get(func, ()):
+                child_ct = stats[child][3]
+                if child in active or child_ct <= 0 or edge_ct * share < min_seconds:
+                    continue
+                walk(child, share * edge_ct / child_ct)
+        active.discard(func)
+        path.pop()
+
+    if roots is None:
+        roots = [func for func, (_, _, _, _, callers) in stats.items() if not callers]
+    for func in roots:
+        if func in stats and stats[func][3] >= min_seconds:
+            walk(func, 1.0)
+
+    lines = []
+    for stack, seconds in stacks.most_common():
+        micros = round(seconds * 1e6)
+        if micros > 0:
+            lines.append(f"{stack} {micros}\n")
+    return ''.join(lines)
+
+
+class ProfileResult:
+    def __init__(self, mode):
+        self.mode = mode
+        self.duration = 0.0
+        self.samples = 0
+        self.data = b''
+        self.summary = ''
+
+    # Ikkala rejim ham collapsed stack yozadi
+    extension = 'collapsed'
+
+
+@contextmanager
+def profile(mode, root=None):
+    """
+    with profile('sample') as result:
+        ...
+    result.data — fayl mazmuni, result.summary — qisqa matn.
+    root — cprofile steklari boshlanadigan funksiya (run() uchun).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Noma'lum rejim: {mode}")
+
+    result = ProfileResult(mode)
+    start = time.perf_counter()
+
+    if mode == 'sample':
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            yield result
+        finally:
+            sampler.stop()
+            result.duration = time.perf_counter() - start
+            result.samples = sampler.samples
+            result.data = sampler.collapsed().encode()
+            top = sampler.stacks.most_common(10)
+            result.summary = '\n'.join(f"{count:>6}  {stack.rsplit(';', 1)[-1]}" for stack, count in top)
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        result.duration = time.perf_counter() - start
+        profiler.create_stats()
+        roots = [cProfile.label(root.__code__)] if root is not None else None
+        result.data = collapsed_from_stats(profiler.stats, roots).encode()
+        result.samples = len(profiler.stats)
+
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(30)
+        result.summary = out.getvalue()
+
+
+def profiled(func, args, kwargs):
+    """run() dagi collapsed stack ildizi — hech qachon rekursiv emas"""
+    return func(*args, **kwargs)
+
+
+def run(mode, func, *args, **kwargs):
+    """func(*args, **kwargs) ni profillab chaqirish; (ProfileResult, natija)"""
+    with profile(mode, root=profiled) as result:
+        value = profiled(func, args, kwargs)
+    return result, value
+
+
+def save_profile(result, kind, target, user=None, **extra):
+    """ProfileResult ni media storage ga yozib, Profile qatorini qaytaradi"""
+    from .models import Profile
+
+    record = Profile(
+        kind=kind,
+        target=target[:300],
+        mode=result.mode,
+        duration=result.duration,
+        samples=result.samples,
+        summary=result.summary,
+        created_by=user if user is not None and user.is_authenticated else None,
+        **extra,
+    )
+    name = f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.{result.extension}"
+    record.file.save(name, ContentFile(result.data), save=False)
+    record.save()
+    return record
@@ -0,0 +1,157 @@
+"""
+Sekin SQL larni yozib olish.
+
+QueryRecorder MONITORING_SLOW_QUERY_SECONDS dan uzoq bajarilgan SQL larni
+parametrlari bilan eslab qoladi. So'rov (yoki buyruq) tugagach submit()
+ularni fon oqimiga beradi: u yerda EXPLAIN (ANALYZE off) rejasi olinadi va
+SlowQuery jadvaliga jamlab yoziladi. Javob vaqti EXPLAIN ni kutmaydi.
+
+Buyruqlar uchun:
+
+    @capture('command:refresh_segments')
+    def handle(self, *args, **options): ...
+"""
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .sql import fingerprint
+
+
+logger = logging.getLogger(__name__)
+
+# EXPLAIN faqat o'qiydigan so'rovlar uchun
+_EXPLAINABLE = ('SELECT', 'WITH')
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slowquery')
+        return _executor
+
+
+# ==================== YIG'ISH ====================
+def submit(source, slow, alias='default'):
+    """
+    slow — [(sql, params, soniya), ...]. MONITORING_SLOW_QUERY_ASYNC = False
+    bo'lsa (testlarda) shu oqimda yoziladi.
+    """
+    global _pending
+    if not slow:
+        return
+    if not settings.MONITORING_SLOW_QUERY_ASYNC:
+        record(source, slow, alias)
+        return
+
+    with _executor_lock:
+        # Baza sekinlashganda navbat cheksiz o'smasin
+        if _pending >= settings.MONITORING_SLOW_QUERY_QUEUE:
+            return
+        _pending += 1
+    _get_executor().submit(_record_in_thread, source, slow, alias)
+
+
+def _record_in_thread(source, slow, alias):
+    global _pending
+    try:
+        record(source, slow, alias)
+    except Exception:
+        logger.exception("Sekin so'rovni yozib bo'lmadi")
+    finally:
+        connections.close_all()
+        with _executor_lock:
+            _pending -= 1
+
+
+@contextmanager
+def capture(source):
+    """View dan tashqaridagi kod (buyruqlar) uchun sekin SQL larni yig'ish"""
+    from .middleware import QueryRecorder
+
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+    submit(source, recorder.slow)
+
+
+# ==================== YOZISH ====================
+def explain(sql, params, alias='default'):
+    """Reja matni; EXPLAIN qilib bo'lmasa bo'sh satr"""
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return ''
+
+    connection = connections[alias]
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with transaction.atomic(using=alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f"{prefix} {sql}", params)
+                rows = cursor.fetchall()
+    except Exception as exc:
+        return f"EXPLAIN xatosi: {exc}"
+    return '\n'.join(' '.join(str(col) for col in row) for row in rows)
+
+
+def record(source, slow, alias='default'):
+    from .models import SlowQuery
+
+    now = timezone.now()
+    plan_ttl = settings.MONITORING_SLOW_QUERY_PLAN_TTL
+    source = source[:200]
+
+    for sql, params, seconds in slow:
+        key = fingerprint(sql)
+        key_hash = hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+        lookup = SlowQuery.objects.filter(fingerprint_hash=key_hash, source=source)
+
+        updated = lookup.update(
+            calls=F('calls') + 1,
+            total_time=F('total_time') + seconds,
+            max_time=Greatest('max_time', seconds),
+            sql=sql,
+            last_seen=now,
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    SlowQuery.objects.create(
+                        fingerprint_hash=key_hash, fingerprint=key, source=source,
+                        sql=sql, calls=1, total_time=seconds, max_time=seconds,
+                        last_seen=now,
+                    )
+            except IntegrityError:
+                # Boshqa worker bir vaqtda yaratdi
+                continue
+            _trim()
+
+        stale = now - timedelta(seconds=plan_ttl)
+        if lookup.filter(Q(plan_at__isnull=True) | Q(plan_at__lt=stale)).exists():
+            lookup.update(plan=explain(sql, params, alias), plan_at=now)
+
+
+def _trim():
+    from .models import SlowQuery
+
+    limit = settings.MONITORING_SLOW_QUERY_MAX_ROWS
+    boundary = list(
+        SlowQuery.objects.order_by('-last_seen').values_list('last_seen', flat=True)[limit:limit + 1]
+    )
+    if boundary:
+        SlowQuery.objects.filter(last_seen__lte=boundary[0]).delete()
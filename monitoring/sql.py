@@ -0,0 +1,12 @@
+"""SQL matnlarini guruhlash uchun yordamchilar"""
+import re
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\bIN \((?:\s*%s\s*,?)+\)")
+
+
+def fingerprint(sql):
+    """Literallarsiz SQL — takrorlanuvchi so'rovlarni guruhlash uchun"""
+    sql = _LITERALS.sub('%s', sql)
+    return _IN_LISTS.sub('IN (...)', sql)
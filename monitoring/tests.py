@@ -0,0 +1,295 @@
+import io
+import tempfile
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from benchmarks import dataset
+from monitoring import metrics, profiling
+from monitoring.models import SlowQuery, Profile
+from monitoring.slow import capture
+from tasks.models import Task
+
+
+class MetricsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build()
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_histogram_render(self):
+        histogram = metrics.Histogram('t_seconds', "test", ('view',), buckets=(0.1, 1))
+        histogram.observe(('a',), 0.05)
+        histogram.observe(('a',), 0.5)
+        histogram.observe(('a',), 5)
+
+        lines = histogram.collect()
+        self.assertIn('t_seconds_bucket{view="a",le="0.1"} 1', lines)
+        self.assertIn('t_seconds_bucket{view="a",le="1"} 2', lines)
+        self.assertIn('t_seconds_bucket{view="a",le="+Inf"} 3', lines)
+        self.assertIn('t_seconds_count{view="a"} 3', lines)
+        self.assertIn('t_seconds_sum{view="a"} 5.55', lines)
+
+    def test_request_is_recorded(self):
+        self.client.force_login(self.dataset.admin)
+        self.client.get(reverse('dashboard:home'))
+
+        labels = ('dashboard:home', 'GET')
+        self.assertEqual(metrics.REQUESTS.value(('dashboard:home', 'GET', '200')), 1)
+        self.assertEqual(metrics.LATENCY.count(labels), 1)
+        self.assertEqual(metrics.DB_QUERIES.count(labels), 1)
+        self.assertEqual(metrics.RESPONSE_SIZE.count(labels), 1)
+
+    @override_settings(MONITORING_SLOW_REQUEST_SECONDS=0)
+    def test_slow_request_sampled(self):
+        self.client.force_login(self.dataset.admin)
+        self.client.get(reverse('tasks:task_list'))
+
+        self.assertEqual(metrics.SLOW_REQUESTS.value(('tasks:task_list',)), 1)
+        view, _, statements, _ = list(metrics.SLOW_SAMPLES)[-1]
+        self.assertEqual(view, 'tasks:task_list')
+        self.assertTrue(1 <= len(statements) <= 3)
+
+    @override_settings(MONITORING_SLOW_REQUEST_SECONDS=0)
+    async def test_async_request_is_recorded(self):
+        await self.async_client.aforce_login(self.dataset.admin)
+        response = await self.async_client.get(reverse('api:task_list'))
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(metrics.REQUESTS.value(('api:task_list', 'GET', '200')), 1)
+        # ORM so'rovlari sync_to_async oqimida — ular ham yozilishi kerak
+        view, _, statements, _ = list(metrics.SLOW_SAMPLES)[-1]
+        self.assertEqual(view, 'api:task_list')
+        self.assertTrue(statements)
+
+    def test_unknown_method_label(self):
+        self.client.generic('PROPFIND', reverse('dashboard:home'))
+        self.assertEqual(metrics.REQUESTS.value(('dashboard:home', 'OTHER', '302')), 1)
+        self.assertEqual(metrics.REQUESTS.value(('dashboard:home', 'PROPFIND', '302')), 0)
+
+    @override_settings(MONITORING_METRICS_TOKEN='secret', MONITORING_ALLOWED_IPS=[])
+    def test_metrics_endpoint_access(self):
+        url = reverse('monitoring:metrics')
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        response = self.client.get(url, headers={'Authorization': 'Bearer secret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE hermes_http_requests_total counter', response.content.decode())
+
+        self.client.force_login(self.dataset.admin)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+@override_settings(MONITORING_SLOW_QUERY_ASYNC=False, MONITORING_SLOW_QUERY_SECONDS=0)
+class SlowQueryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build()
+
+    def test_statistics_queries_recorded_with_plan(self):
+        self.client.force_login(self.dataset.admin)
+        self.client.get(reverse('dashboard:statistics'))
+
+        rows = SlowQuery.objects.filter(source='dashboard:statistics')
+        self.assertTrue(rows.exists())
+        sample = rows.filter(sql__startswith='SELECT').first()
+        self.assertEqual(sample.calls, 1)
+        self.assertTrue(sample.plan)
+        self.assertIsNotNone(sample.plan_at)
+
+        # Ikkinchi marta: jamlanadi, reja qayta olinmaydi
+        plan_at = sample.plan_at
+        self.client.get(reverse('dashboard:statistics'))
+        sample.refresh_from_db()
+        self.assertEqual(sample.calls, 2)
+        self.assertEqual(sample.plan_at, plan_at)
+
+    def test_capture_for_commands(self):
+        with capture('command:test'):
+            Task.objects.filter(title__startswith='x').count()
+        row = SlowQuery.objects.get(source='command:test')
+        self.assertIn('%s', row.fingerprint)
+
+    @override_settings(MONITORING_SLOW_QUERY_MAX_ROWS=2)
+    def test_ring_buffer(self):
+        for n in range(4):
+            with capture(f'command:{n}'):
+                Task.objects.count()
+        self.assertEqual(SlowQuery.objects.count(), 2)
+        self.assertEqual(
+            set(SlowQuery.objects.values_list('source', flat=True)),
+            {'command:2', 'command:3'},
+        )
+
+    def test_admin_superuser_only(self):
+        with capture('command:test'):
+            Task.objects.count()
+        url = reverse('admin:monitoring_slowquery_changelist')
+
+        self.client.force_login(self.dataset.admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        staff = self.dataset.leader
+        staff.is_staff = True
+        staff.save()
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class ProfilingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build()
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name, MONITORING_PROFILE_INTERVAL=0.001)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_sampler_collapsed_format(self):
+        with profiling.profile('sample') as result:
+            deadline = time.monotonic() + 0.05
+            while time.monotonic() < deadline:
+                sum(range(1000))
+
+        self.assertGreater(result.samples, 0)
+        line = result.data.decode().splitlines()[0]
+        stack, count = line.rsplit(' ', 1)
+        self.assertIn('test_sampler_collapsed_format (monitoring/tests.py)', stack)
+        self.assertGreater(int(count), 0)
+
+    def test_cprofile_collapsed_format(self):
+        def leaf():
+            deadline = time.monotonic() + 0.02
+            while time.monotonic() < deadline:
+                sum(range(1000))
+
+        with profiling.profile('cprofile') as result:
+            leaf()
+
+        self.assertEqual(result.extension, 'collapsed')
+        lines = result.data.decode().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, micros = line.rsplit(' ', 1)
+            self.assertGreater(int(micros), 0)
+        self.assertTrue(any('leaf (monitoring/tests.py)' in line for line in lines))
+
+    def test_run_roots_recursive_call(self):
+        # Rekursiv funksiya o'zini chaqiradi — chaqiruvchisiz ildiz yo'q
+        def recurse(n):
+            if n:
+                return recurse(n - 1)
+            deadline = time.monotonic() + 0.02
+            while time.monotonic() < deadline:
+                sum(range(1000))
+            return 'ok'
+
+        result, value = profiling.run('cprofile', recurse, 3)
+        self.assertEqual(value, 'ok')
+        lines = result.data.decode().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(all(line.startswith('profiled (monitoring/profiling.py)') for line in lines))
+        self.assertTrue(any('recurse (monitoring/tests.py)' in line for line in lines))
+
+    def test_collapsed_from_stats_splits_by_caller(self):
+        # main -> a (0.3s), main -> b (0.1s); a va b ikkalasi ham c ni chaqiradi
+        main, a, b, c = (('app.py', i, name) for i, name in enumerate('main a b c'.split()))
+        stats = {
+            main: (1, 1, 0.1, 0.5, {}),
+            a: (1, 1, 0.1, 0.3, {main: (1, 1, 0.1, 0.3)}),
+            b: (1, 1, 0.0, 0.1, {main: (1, 1, 0.0, 0.1)}),
+            c: (2, 2, 0.3, 0.3, {a: (1, 1, 0.2, 0.2), b: (1, 1, 0.1, 0.1)}),
+        }
+        lines = dict(
+            line.rsplit(' ', 1) for line in profiling.collapsed_from_stats(stats).splitlines()
+        )
+        self.assertEqual(lines, {
+            'main (app.py)': '100000',
+            'main (app.py);a (app.py)': '100000',
+            'main (app.py);a (app.py);c (app.py)': '200000',
+            'main (app.py);b (app.py);c (app.py)': '100000',
+        })
+
+    def test_request_profiled_for_superuser_only(self):
+        url = reverse('tasks:task_results', args=[self.dataset.task.pk])
+
+        leader = self.dataset.leader
+        leader.is_staff = True
+        leader.save()
+        self.client.force_login(leader)
+        response = self.client.get(url, {'_profile': 'sample'})
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(Profile.objects.exists())
+
+        self.client.force_login(self.dataset.admin)
+        response = self.client.get(url, headers={'X-Profile': 'cprofile'})
+        profile = Profile.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual(profile.mode, Profile.Mode.CPROFILE)
+        self.assertEqual(profile.status_code, 200)
+        self.assertGreater(profile.query_count, 0)
+        self.assertIn('cumulative', profile.summary)
+        self.assertTrue(profile.file.name.endswith('.collapsed'))
+        self.assertIn('task_results (tasks/views.py)', self._stacks(profile))
+
+    def _stacks(self, profile):
+        with profile.file.open('rb') as f:
+            data = f.read().decode()
+        self.assertTrue(data)
+        return data
+
+    async def test_async_request_profiled(self):
+        url = reverse('api:task_list')
+        response = await self.async_client.get(url, {'_profile': 'sample'})
+        self.assertNotIn('X-Profile-Id', response)
+
+        await self.async_client.aforce_login(self.dataset.admin)
+        response = await self.async_client.get(url, {'_profile': 'cprofile'})
+        self.assertEqual(response.status_code, 200)
+        profile = await Profile.objects.aget(pk=response['X-Profile-Id'])
+        self.assertEqual(profile.mode, Profile.Mode.CPROFILE)
+        self.assertGreater(profile.query_count, 0)
+        stacks = await sync_to_async(self._stacks)(profile)
+        self.assertIn('task_list (api/views.py)', stacks)
+
+    async def test_async_request_sync_view_profiled(self):
+        # ASGI: sync view sync_to_async oqimida — profil o'sha oqimda olinishi kerak
+        await self.async_client.aforce_login(self.dataset.admin)
+        response = await self.async_client.get(reverse('dashboard:home'), {'_profile': 'cprofile'})
+        self.assertEqual(response.status_code, 200)
+        profile = await Profile.objects.aget(pk=response['X-Profile-Id'])
+        self.assertEqual(profile.status_code, 200)
+        self.assertGreater(profile.query_count, 0)
+        stacks = await sync_to_async(self._stacks)(profile)
+        self.assertTrue(stacks.startswith('profiled (monitoring/profiling.py);'))
+        self.assertIn(';home (dashboard/views.py);', stacks)
+
+    def test_admin_download(self):
+        self.client.force_login(self.dataset.admin)
+        response = self.client.get(reverse('dashboard:home'), {'_profile': 'sample'})
+        profile = Profile.objects.get(pk=response['X-Profile-Id'])
+
+        response = self.client.get(reverse('admin:monitoring_profile_download', args=[profile.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content), profile.file.open('rb').read())
+        profile.file.close()
+
+    def test_profile_command(self):
+        out = io.StringIO()
+        call_command('profile_command', '--mode', 'sample', 'check', stdout=out)
+        profile = Profile.objects.get(kind=Profile.Kind.COMMAND)
+        self.assertEqual(profile.target, 'check')
+        self.assertIn(f"Profil #{profile.pk}", out.getvalue())
@@ -0,0 +1,28 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from . import metrics
+
+
+def _allowed(request):
+    token = settings.MONITORING_METRICS_TOKEN
+    if token:
+        given = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if hmac.compare_digest(given, token):
+            return True
+    if request.META.get('REMOTE_ADDR') in settings.MONITORING_ALLOWED_IPS:
+        return True
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_superuser
+
+
+def metrics_view(request):
+    """Prometheus uchun ichki endpoint; ruxsatsiz so'rovlarga 404"""
+    if not _allowed(request):
+        raise Http404
+    return HttpResponse(
+        metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,16 @@
+'use strict';
+{
+    const $ = django.jQuery;
+
+    // Tanlangan qiymat bilan changelist ni qayta ochish
+    $(function() {
+        $('.autocomplete-filter').on('change', function() {
+            if (!this.value) {
+                return;
+            }
+            window.location.search = this.dataset.queryTemplate.replace(
+                '__value__', encodeURIComponent(this.value)
+            );
+        });
+    });
+}
@@ -0,0 +1,42 @@
+'use strict';
+{
+    // Bog'langan hudud select lari.
+    // Ota select: data-geo-child="<bola select id>".
+    // Bola select: data-geo-url (accounts:geography_children), data-geo-empty (bo'sh variant matni).
+    function reset(select) {
+        select.innerHTML = '';
+        select.add(new Option(select.dataset.geoEmpty || '', ''));
+        const child = document.getElementById(select.dataset.geoChild || '');
+        if (child) {
+            reset(child);
+        }
+    }
+
+    function load(select, parent) {
+        reset(select);
+        if (!parent) {
+            return;
+        }
+        fetch(`${select.dataset.geoUrl}?parent=${encodeURIComponent(parent)}`, {
+            credentials: 'same-origin',
+        })
+            .then((response) => response.ok ? response.json() : Promise.reject(response.status))
+            .then((data) => {
+                for (const item of data.items) {
+                    select.add(new Option(item.name, item.id));
+                }
+            })
+            .catch(() => {
+                select.add(new Option('Yuklab bo\'lmadi', '', false, false));
+            });
+    }
+
+    document.addEventListener('DOMContentLoaded', () => {
+        document.querySelectorAll('select[data-geo-child]').forEach((parent) => {
+            const child = document.getElementById(parent.dataset.geoChild);
+            if (child) {
+                parent.addEventListener('change', () => load(child, parent.value));
+            }
+        });
+    });
+}
@@ -1,15 +1,36 @@
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, F, FloatField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
-from django.urls import reverse
+from django.urls import path, reverse
 from django.utils import timezone
-from .models import Task, Question, TaskAssignment, Answer, TaskHistory
+
+from config.admin_filters import (
+    AutocompleteFilter, AutocompleteFilterMixin, PrefixSearchMixin, is_autocomplete
+)
+from config.pagination import EstimatedCountPaginator
+from . import audience, ordering
+from .models import Task, Question, TaskAssignment, Answer, TaskHistory, Segment
+
+
+def _through_count(field):
+    """Vazifaning M2M nishon maydonidagi hududlar soni (subquery)"""
+    through = Task._meta.get_field(field).remote_field.through
+    count = through.objects.filter(
+        task=OuterRef('pk')
+    ).order_by().values('task').annotate(n=Count('id')).values('n')
+    return Coalesce(Subquery(count), 0)
 
 
 class QuestionInline(admin.TabularInline):
+    # Tartib kaliti qo'lda kiritilmaydi — "Savollar tartibi" sahifasida o'zgartiriladi
     model = Question
     extra = 1
-    fields = ['order', 'text', 'question_type', 'is_required', 'choices']
+    fields = ['text', 'question_type', 'is_required', 'choices']
     ordering = ['order']
 
 
@@ -20,6 +41,9 @@ class TaskAssignmentInline(admin.TabularInline):
     readonly_fields = ['progress_display', 'sent_at', 'completed_at']
     ordering = ['-sent_at']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_progress().select_related('leader')
+
     def progress_display(self, obj):
         percent = obj.progress_percent
         if percent == 100:
@@ -41,7 +65,7 @@ class TaskAssignmentInline(admin.TabularInline):
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(PrefixSearchMixin, AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = [
         'title',
         'task_type_badge',
@@ -57,13 +81,17 @@ class TaskAdmin(admin.ModelAdmin):
         'status',
         'priority',
         'task_type',
-        'target_region',
-        'target_district',
+        'target_regions',
+        ('target_districts', AutocompleteFilter),
         'created_at'
     ]
     search_fields = ['title', 'description', 'created_by__username']
+    prefix_search_fields = ['title']
     ordering = ['-created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     date_hierarchy = 'created_at'
+    list_select_related = ['created_by']
 
     readonly_fields = [
         'stats_total_assigned',
@@ -82,7 +110,11 @@ class TaskAdmin(admin.ModelAdmin):
             'fields': ('title', 'description', 'task_type', 'status', 'priority')
         }),
         (_('Manzil (kimga)'), {
-            'fields': ('target_region', 'target_district', 'target_mahallas')
+            'fields': ('target_regions', 'target_districts', 'target_mahallas', 'target_segments')
+        }),
+        (_('Istisnolar'), {
+            'fields': ('exclude_regions', 'exclude_districts', 'exclude_mahallas'),
+            'classes': ('collapse',)
         }),
         (_('Muddat'), {
             'fields': ('deadline', 'start_date', 'reminder_enabled', 'reminder_hours')
@@ -111,11 +143,26 @@ class TaskAdmin(admin.ModelAdmin):
         }),
     )
 
-    filter_horizontal = ['target_mahallas']
-    autocomplete_fields = ['target_region', 'target_district', 'created_by']
+    autocomplete_fields = [
+        'target_regions', 'target_districts', 'target_mahallas', 'target_segments',
+        'exclude_regions', 'exclude_districts', 'exclude_mahallas',
+        'created_by',
+    ]
     inlines = [QuestionInline, TaskAssignmentInline]
 
-    actions = ['publish_tasks', 'complete_tasks', 'update_stats']
+    actions = ['publish_tasks', 'complete_tasks', 'update_stats', 'reorder_questions']
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if is_autocomplete(request):
+            return queryset
+        # Har bir nishon maydoni alohida korrelyatsiyalangan subquery —
+        # bir nechta M2M JOIN qatorlarni ko'paytirib yubormasligi uchun
+        return queryset.annotate(**{
+            f'{field}_total': _through_count(field) for field in audience.FIELDS
+        }).annotate(target_areas_total=sum(
+            (F(f'{field}_total') for field in audience.INCLUDE + (audience.SEGMENTS,)), Value(0)
+        ))
 
     def task_type_badge(self, obj):
         icons = {
@@ -128,6 +175,7 @@ class TaskAdmin(admin.ModelAdmin):
         return format_html('{} {}', icon, obj.get_task_type_display())
 
     task_type_badge.short_description = _("Turi")
+    task_type_badge.admin_order_field = 'task_type'
 
     def status_badge(self, obj):
         colors = {
@@ -146,6 +194,7 @@ class TaskAdmin(admin.ModelAdmin):
         )
 
     status_badge.short_description = _("Holat")
+    status_badge.admin_order_field = 'status'
 
     def priority_badge(self, obj):
         colors = {
@@ -161,18 +210,29 @@ class TaskAdmin(admin.ModelAdmin):
         )
 
     priority_badge.short_description = _("Muhimlik")
+    priority_badge.admin_order_field = 'priority'
 
     def target_display(self, obj):
-        if obj.target_mahallas.exists():
-            count = obj.target_mahallas.count()
-            return format_html('<span title="Mahallalar">{} ta mahalla</span>', count)
-        elif obj.target_district:
-            return obj.target_district.name
-        elif obj.target_region:
-            return obj.target_region.name
-        return _("Hammaga")
+        parts = [
+            f'{count} ta {label}'
+            for count, label in (
+                (obj.target_regions_total, 'viloyat'),
+                (obj.target_districts_total, 'tuman'),
+                (obj.target_mahallas_total, 'mahalla'),
+                (obj.target_segments_total, 'segment'),
+            )
+            if count
+        ]
+        target = ', '.join(parts) if parts else _("Hammaga")
+        excluded = sum(getattr(obj, f'{field}_total') for field in audience.EXCLUDE)
+        if excluded:
+            return format_html(
+                '{} <span style="color:#e74c3c;" title="Istisnolar">−{}</span>', target, excluded
+            )
+        return target
 
     target_display.short_description = _("Kimga")
+    target_display.admin_order_field = 'target_areas_total'
 
     def deadline_display(self, obj):
         if obj.is_overdue:
@@ -192,6 +252,7 @@ class TaskAdmin(admin.ModelAdmin):
         return obj.deadline.strftime('%d.%m.%Y %H:%M')
 
     deadline_display.short_description = _("Muddat")
+    deadline_display.admin_order_field = 'deadline'
 
     def stats_display(self, obj):
         total = obj.stats_total_assigned
@@ -215,12 +276,49 @@ class TaskAdmin(admin.ModelAdmin):
         )
 
     stats_display.short_description = _("Bajarilish")
+    stats_display.admin_order_field = 'stats_completion_rate'
 
     def save_model(self, request, obj, form, change):
         if not change:
             obj.created_by = request.user
         super().save_model(request, obj, form, change)
 
+    def save_formset(self, request, form, formset, change):
+        if formset.model is Question:
+            # Yangi savollar mavjudlarining oxiriga, GAP oralig'i bilan
+            added = [f.instance for f in formset.forms
+                     if f.instance._state.adding and f.has_changed()
+                     and not formset._should_delete_form(f)]
+            if added:
+                last = Question.objects.filter(task=form.instance).aggregate(m=Max('order'))['m']
+                for question, key in zip(added, ordering.spaced(len(added), last or 0)):
+                    question.order = key
+        super().save_formset(request, form, formset, change)
+
+    # ==================== SAVOLLAR TARTIBI ====================
+
+    def get_urls(self):
+        return [
+            path(
+                '<path:object_id>/reorder-questions/',
+                self.admin_site.admin_view(self.reorder_view),
+                name='tasks_task_reorder_questions',
+            ),
+        ] + super().get_urls()
+
+    def reorder_view(self, request, object_id):
+        task = get_object_or_404(Task, pk=object_id)
+        if not self.has_change_permission(request, task):
+            raise PermissionDenied
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'original': task,
+            'title': _("Savollar tartibi"),
+            'questions': task.get_questions(),
+        }
+        return TemplateResponse(request, 'admin/tasks/task/reorder_questions.html', context)
+
     @admin.action(description=_("Tanlangan vazifalarni e'lon qilish"))
     def publish_tasks(self, request, queryset):
         count = 0
@@ -243,9 +341,17 @@ class TaskAdmin(admin.ModelAdmin):
             task.update_stats()
         self.message_user(request, f"{queryset.count()} ta vazifa statistikasi yangilandi.")
 
+    @admin.action(description=_("Savollar tartibini o'zgartirish"), permissions=['change'])
+    def reorder_questions(self, request, queryset):
+        tasks = list(queryset[:2])
+        if len(tasks) != 1:
+            self.message_user(request, _("Bitta vazifani tanlang."), level='warning')
+            return None
+        return redirect('admin:tasks_task_reorder_questions', tasks[0].pk)
+
 
 @admin.register(Question)
-class QuestionAdmin(admin.ModelAdmin):
+class QuestionAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = [
         'order',
         'text_short',
@@ -254,10 +360,16 @@ class QuestionAdmin(admin.ModelAdmin):
         'is_required_badge',
         'answers_count'
     ]
-    list_filter = ['question_type', 'is_required', 'task']
+    list_filter = ['question_type', 'is_required', ('task', AutocompleteFilter)]
     search_fields = ['text', 'task__title']
     ordering = ['task', 'order']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     autocomplete_fields = ['task']
+    list_select_related = ['task']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(answers_total=Count('answers'))
 
     def text_short(self, obj):
         if len(obj.text) > 50:
@@ -281,6 +393,7 @@ class QuestionAdmin(admin.ModelAdmin):
         return format_html('{} {}', icon, obj.get_question_type_display())
 
     question_type_badge.short_description = _("Turi")
+    question_type_badge.admin_order_field = 'question_type'
 
     def is_required_badge(self, obj):
         if obj.is_required:
@@ -288,16 +401,17 @@ class QuestionAdmin(admin.ModelAdmin):
         return format_html('<span style="color:#95a5a6;">✗ Yo\'q</span>')
 
     is_required_badge.short_description = _("Majburiy")
+    is_required_badge.admin_order_field = 'is_required'
 
     def answers_count(self, obj):
-        count = obj.answers.count()
-        return format_html('<span style="font-weight:bold;">{}</span>', count)
+        return format_html('<span style="font-weight:bold;">{}</span>', obj.answers_total)
 
     answers_count.short_description = _("Javoblar")
+    answers_count.admin_order_field = 'answers_total'
 
 
 @admin.register(TaskAssignment)
-class TaskAssignmentAdmin(admin.ModelAdmin):
+class TaskAssignmentAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = [
         'task',
         'leader',
@@ -307,12 +421,24 @@ class TaskAssignmentAdmin(admin.ModelAdmin):
         'sent_at',
         'completed_at'
     ]
-    list_filter = ['status', 'task', 'task__target_region', 'sent_at']
+    list_filter = [
+        'status',
+        ('task', AutocompleteFilter),
+        'region',
+        ('district', AutocompleteFilter),
+        'sent_at'
+    ]
     search_fields = ['task__title', 'leader__username', 'leader__first_name']
     ordering = ['-sent_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     autocomplete_fields = ['task', 'leader']
+    list_select_related = ['task', 'leader', 'mahalla']
 
     readonly_fields = [
+        'region',
+        'district',
+        'mahalla',
         'sent_at',
         'seen_at',
         'started_at',
@@ -321,12 +447,22 @@ class TaskAssignmentAdmin(admin.ModelAdmin):
         'last_reminder_at'
     ]
 
+    def get_queryset(self, request):
+        # Jarayon ustuni foiz ko'rsatadi — saralash ham javoblar ulushi bo'yicha
+        return super().get_queryset(request).with_progress().annotate(
+            progress_ratio=Coalesce(
+                Cast('answers_count', FloatField()) / NullIf(F('questions_total'), 0), Value(0.0)
+            )
+        )
+
     def leader_mahalla(self, obj):
-        if obj.leader.mahalla:
-            return obj.leader.mahalla.name
+        # Yuborilgan paytdagi mahalla (yetakchi keyin ko'chgan bo'lishi mumkin)
+        if obj.mahalla:
+            return obj.mahalla.name
         return "-"
 
     leader_mahalla.short_description = _("Mahalla")
+    leader_mahalla.admin_order_field = 'mahalla__name'
 
     def status_badge(self, obj):
         colors = {
@@ -354,11 +490,12 @@ class TaskAssignmentAdmin(admin.ModelAdmin):
         )
 
     status_badge.short_description = _("Holat")
+    status_badge.admin_order_field = 'status'
 
     def progress_bar(self, obj):
         percent = obj.progress_percent
         answered = obj.answered_count
-        total = obj.task.questions.count()
+        total = obj.questions_total_count
 
         if percent == 100:
             color = '#27ae60'
@@ -379,6 +516,7 @@ class TaskAssignmentAdmin(admin.ModelAdmin):
         )
 
     progress_bar.short_description = _("Jarayon")
+    progress_bar.admin_order_field = 'progress_ratio'
 
 
 @admin.register(Answer)
@@ -398,14 +536,30 @@ class AnswerAdmin(admin.ModelAdmin):
         'question__text'
     ]
     ordering = ['-created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     autocomplete_fields = ['assignment', 'question']
+    list_select_related = ['assignment__leader', 'assignment__task', 'question']
 
     readonly_fields = ['created_at', 'updated_at']
 
+    def get_queryset(self, request):
+        # Question.order — siyrak kalit; ko'rsatish uchun vazifadagi o'rni hisoblanadi
+        return super().get_queryset(request).annotate(
+            question_position=ordering.position('question__task', 'question__order')
+        )
+
+    def delete_queryset(self, request, queryset):
+        # Ommaviy o'chirish Answer.delete() ni chaqirmaydi — sanoq qayta hisoblanadi
+        assignment_ids = set(queryset.values_list('assignment_id', flat=True))
+        super().delete_queryset(request, queryset)
+        TaskAssignment.objects.filter(pk__in=assignment_ids).recount_answers()
+
     def question_order(self, obj):
-        return f"#{obj.question.order}"
+        return f"#{obj.question_position}"
 
     question_order.short_description = _("№")
+    question_order.admin_order_field = 'question__order'
 
     def question_text_short(self, obj):
         text = obj.question.text
@@ -446,7 +600,10 @@ class TaskHistoryAdmin(admin.ModelAdmin):
     list_filter = ['action', 'created_at']
     search_fields = ['task__title', 'actor__username', 'description']
     ordering = ['-created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     date_hierarchy = 'created_at'
+    list_select_related = ['task', 'actor']
 
     readonly_fields = [
         'task',
@@ -480,6 +637,7 @@ class TaskHistoryAdmin(admin.ModelAdmin):
         )
 
     action_badge.short_description = _("Harakat")
+    action_badge.admin_order_field = 'action'
 
     def description_short(self, obj):
         if len(obj.description) > 50:
@@ -495,4 +653,86 @@ class TaskHistoryAdmin(admin.ModelAdmin):
         return False
 
     def has_delete_permission(self, request, obj=None):
-        return False
\ No newline at end of file
+        return False
+
+
+@admin.register(Segment)
+class SegmentAdmin(admin.ModelAdmin):
+    list_display = [
+        'name',
+        'filters_display',
+        'members_display',
+        'refreshed_at',
+        'is_active'
+    ]
+    list_filter = ['is_active', 'regions']
+    search_fields = ['name', 'description']
+    ordering = ['name']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    autocomplete_fields = ['regions', 'districts']
+    readonly_fields = ['members_count', 'refreshed_at', 'created_by', 'created_at', 'updated_at']
+
+    fieldsets = (
+        (_('Asosiy'), {
+            'fields': ('name', 'description', 'is_active')
+        }),
+        (_('Hudud'), {
+            'fields': ('regions', 'districts')
+        }),
+        (_('Faollik va tarix'), {
+            'fields': (
+                'active_within_days',
+                'min_completion_rate',
+                'max_completion_rate',
+                'history_days',
+                'min_assignments'
+            )
+        }),
+        (_('Tizim'), {
+            'fields': ('members_count', 'refreshed_at', 'created_by', 'created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
+
+    actions = ['refresh_segments']
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+    def save_related(self, request, form, formsets, change):
+        # Hudud M2M lari saqlangandan keyin — a'zolar darhol yangi filtrlar bo'yicha
+        super().save_related(request, form, formsets, change)
+        if form.instance.is_active:
+            form.instance.refresh()
+
+    def filters_display(self, obj):
+        parts = []
+        if obj.active_within_days is not None:
+            parts.append(f"{obj.active_within_days} kunda faol")
+        if obj.uses_completion:
+            low = obj.min_completion_rate if obj.min_completion_rate is not None else 0
+            high = obj.max_completion_rate if obj.max_completion_rate is not None else 100
+            parts.append(f"bajarilish {float(low):g}–{float(high):g}%")
+        return ', '.join(parts) or '-'
+
+    filters_display.short_description = _("Filtrlar")
+
+    def members_display(self, obj):
+        return format_html('<span style="font-weight:bold;">{}</span>', obj.members_count)
+
+    members_display.short_description = _("A'zolar")
+    members_display.admin_order_field = 'members_count'
+
+    @admin.action(description=_("A'zolarni yangilash"))
+    def refresh_segments(self, request, queryset):
+        added = removed = 0
+        for segment in queryset:
+            result = segment.refresh()
+            added += result['added']
+            removed += result['removed']
+        self.message_user(
+            request, f"{queryset.count()} ta segment yangilandi: +{added} / -{removed} a'zo."
+        )
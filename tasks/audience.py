@@ -0,0 +1,181 @@
+"""
+Vazifa auditoriyasi: nishon hududlari bo'yicha yetakchilar to'plami.
+
+Auditoriya = (viloyatlar ∪ tumanlar ∪ mahallalar) − (istisno hududlar).
+Har bir hudud mahalla ID lari to'plamiga yoyiladi va to'plam amallari
+SQL da bajariladi (UNION / EXCEPT) — natija bitta subquery:
+
+    mahalla_id IN (<nishon mahallalari> EXCEPT <istisno mahallalari>)
+
+Yetakchilar faqat mahalla_id bo'yicha tanlanadi (faol yetakchilar uchun
+qisman indeks) — viloyat/tuman jadvallari bilan OR-zanjirli JOIN va
+distinct() kerak emas. Nishon bo'sh bo'lsa — barcha faol yetakchilar
+(mahallasi yo'qlari ham), istisnolardan tashqari.
+
+Segmentlar nishonda bo'lsa, yetakchilar segment jadvalidan olinadi
+(SegmentMember) va hududiy nishon yetakchilari bilan UNION qilinadi.
+"""
+from collections import namedtuple
+
+from django.db.models import Count, Q, Value
+
+from accounts.geography import Area
+
+
+INCLUDE = ('target_regions', 'target_districts', 'target_mahallas')
+EXCLUDE = ('exclude_regions', 'exclude_districts', 'exclude_mahallas')
+SEGMENTS = 'target_segments'
+FIELDS = INCLUDE + EXCLUDE + (SEGMENTS,)
+
+# Maydon -> through jadvalidagi ustun (hududlar uchun daraja nomi ham shu)
+COLUMNS = {
+    'target_segments': 'segment',
+    'target_regions': 'region',
+    'target_districts': 'district',
+    'target_mahallas': 'mahalla',
+    'exclude_regions': 'region',
+    'exclude_districts': 'district',
+    'exclude_mahallas': 'mahalla',
+}
+
+AudienceSize = namedtuple('AudienceSize', ['total', 'excluded'])
+
+
+class Targeting:
+    """Vazifa nishoni: maydon -> [Area]"""
+
+    def __init__(self, areas):
+        self.areas = {field: areas.get(field, []) for field in FIELDS}
+
+    def __getitem__(self, field):
+        return self.areas[field]
+
+    def ids(self, field):
+        return [area.pk for area in self.areas[field]]
+
+    @property
+    def is_everyone(self):
+        return not any(self.areas[field] for field in INCLUDE + (SEGMENTS,))
+
+    @property
+    def has_exclusions(self):
+        return any(self.areas[field] for field in EXCLUDE)
+
+    def breakdown_level(self):
+        """
+        Natijalar kesimi: eng keng nishon darajasi, u yagona hudud bo'lsa —
+        bir daraja pastroq. Nishon bo'sh bo'lsa viloyatlar kesimi.
+        """
+        for field, lower in (('target_regions', 'district'), ('target_districts', 'mahalla')):
+            if self.areas[field]:
+                return lower if len(self.areas[field]) == 1 else COLUMNS[field]
+        return 'mahalla' if self.areas['target_mahallas'] else 'region'
+
+
+def get_targeting(task):
+    """Barcha nishon va istisno hududlari nomlari bilan — bitta UNION ALL so'rov"""
+    if task._state.adding:
+        return Targeting({})
+
+    parts = []
+    for field in FIELDS:
+        column = COLUMNS[field]
+        through = task._meta.get_field(field).remote_field.through
+        parts.append(
+            through.objects.filter(task_id=task.pk).order_by().values_list(
+                Value(field), column, f'{column}__name'
+            )
+        )
+
+    areas = {}
+    for field, pk, name in parts[0].union(*parts[1:], all=True):
+        areas.setdefault(field, []).append(Area(pk, name))
+    for items in areas.values():
+        items.sort(key=lambda area: area.name)
+    return Targeting(areas)
+
+
+def mahalla_ids(regions=(), districts=(), mahallas=()):
+    """Hududlar mahalla ID lari birlashmasi (queryset); hammasi bo'sh bo'lsa None"""
+    from accounts.models import Mahalla
+
+    base = Mahalla.objects.order_by()
+    parts = []
+    if regions:
+        parts.append(base.filter(district__region_id__in=regions).values('id'))
+    if districts:
+        parts.append(base.filter(district_id__in=districts).values('id'))
+    if mahallas:
+        parts.append(base.filter(pk__in=mahallas).values('id'))
+
+    if not parts:
+        return None
+    if len(parts) == 1:
+        return parts[0]
+    return parts[0].union(*parts[1:])
+
+
+def _sets(targeting):
+    include = mahalla_ids(*(targeting.ids(field) for field in INCLUDE))
+    exclude = mahalla_ids(*(targeting.ids(field) for field in EXCLUDE))
+    return include, exclude
+
+
+def active_leaders():
+    from accounts.models import User
+
+    return User.objects.filter(role=User.Role.LEADER, status=User.Status.ACTIVE)
+
+
+def segment_leaders(segments, include=None):
+    """Segment a'zolari ID lari; hududiy nishon bo'lsa uning yetakchilari bilan UNION"""
+    from .models import SegmentMember
+
+    members = SegmentMember.objects.filter(segment_id__in=segments).values('leader_id')
+    if include is not None:
+        members = members.union(
+            active_leaders().order_by().filter(mahalla_id__in=include).values('pk')
+        )
+    return members
+
+
+def resolve(targeting):
+    """Auditoriyadagi faol yetakchilar (takrorlarsiz, distinct siz)"""
+    include, exclude = _sets(targeting)
+    segments = targeting.ids(SEGMENTS)
+    leaders = active_leaders()
+
+    if segments:
+        leaders = leaders.filter(pk__in=segment_leaders(segments, include))
+    elif include is not None:
+        if exclude is not None:
+            include = include.difference(exclude)
+        return leaders.filter(mahalla_id__in=include)
+
+    if exclude is not None:
+        return leaders.exclude(mahalla_id__in=exclude)
+    return leaders
+
+
+def size(targeting):
+    """
+    Auditoriya hajmi: AudienceSize(total, excluded) — bitta aggregate so'rov.
+    excluded — nishondagi, lekin istisno tufayli tushib qolgan yetakchilar.
+    """
+    include, exclude = _sets(targeting)
+    segments = targeting.ids(SEGMENTS)
+    leaders = active_leaders().order_by()
+
+    if segments:
+        leaders = leaders.filter(pk__in=segment_leaders(segments, include))
+    elif include is not None:
+        leaders = leaders.filter(mahalla_id__in=include)
+
+    if exclude is None:
+        return AudienceSize(leaders.count(), 0)
+
+    counts = leaders.aggregate(
+        matched=Count('id'),
+        excluded=Count('id', filter=Q(mahalla_id__in=exclude)),
+    )
+    return AudienceSize(counts['matched'] - counts['excluded'], counts['excluded'])
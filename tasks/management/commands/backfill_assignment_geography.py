@@ -0,0 +1,53 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from monitoring.slow import capture
+from tasks.models import LEADER_GEOGRAPHY, TaskAssignment
+
+
+class Command(BaseCommand):
+    help = (
+        "Geografiya nusxasi bo'lmagan tayinlashlarni to'ldirish (region/district/mahalla). "
+        "Eski tayinlashlar uchun yetakchining hozirgi joylashuvi olinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--task', help="Faqat shu vazifa tayinlashlari")
+
+    @capture('command:backfill_assignment_geography')
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        User = get_user_model()
+
+        # Yetakchisida ham joylashuv yo'q qatorlar NULL qoladi — shuning uchun
+        # "region IS NULL" ni qayta so'ramasdan pk bo'yicha oldinga yuriladi
+        pending = TaskAssignment.objects.filter(region__isnull=True).order_by('pk')
+        if options['task']:
+            pending = pending.filter(task_id=options['task'])
+
+        leader = User.objects.filter(pk=OuterRef('leader_id')).annotate(**LEADER_GEOGRAPHY)
+        values = {
+            f'{name}_id': Subquery(leader.values(f'geo_{name}')[:1])
+            for name in ('region', 'district', 'mahalla')
+        }
+
+        started = time.perf_counter()
+        total = 0
+        last = None
+        while True:
+            batch = pending if last is None else pending.filter(pk__gt=last)
+            ids = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            last = ids[-1]
+
+            with transaction.atomic():
+                total += TaskAssignment.objects.filter(pk__in=ids).update(**values)
+            self.stdout.write(f"  {total} ta ({time.perf_counter() - started:.1f}s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Tayyor: {total} ta tayinlash to'ldirildi"))
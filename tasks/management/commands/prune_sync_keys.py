@@ -0,0 +1,50 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from monitoring.slow import capture
+from tasks.models import AnswerSyncKey
+
+
+class Command(BaseCommand):
+    help = (
+        "Eski offline sinxronlash kalitlarini o'chirish. Cron orqali muntazam "
+        "ishga tushiring, masalan har kuni: manage.py prune_sync_keys"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ANSWER_SYNC_KEY_RETENTION_DAYS,
+            help="Shuncha kundan eski kalitlar o'chiriladi"
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    @capture('command:prune_sync_keys')
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        batch_size = options['batch_size']
+
+        # pk bo'yicha partiyalar: eski kalitlar jadval boshida, yangisi uchrashi bilan to'xtaymiz
+        started = time.perf_counter()
+        deleted = 0
+        last = 0
+        while True:
+            rows = list(
+                AnswerSyncKey.objects.filter(pk__gt=last).order_by('pk')
+                .values_list('pk', 'created_at')[:batch_size]
+            )
+            if not rows:
+                break
+            last = rows[-1][0]
+            old = [pk for pk, created_at in rows if created_at < cutoff]
+            if old:
+                deleted += AnswerSyncKey.objects.filter(pk__in=old).delete()[0]
+            if len(old) < len(rows):
+                break
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: {deleted} ta kalit o'chirildi ({time.perf_counter() - started:.1f}s)"
+        ))
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from monitoring.slow import capture
+from tasks.models import Answer, TaskAssignment
+
+
+class Command(BaseCommand):
+    help = (
+        "TaskAssignment.answers_count ni javoblar jadvali bilan solishtirib, "
+        "farq qilgan qatorlarni tuzatish"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--task', help="Faqat shu vazifa tayinlashlari")
+        parser.add_argument('--dry-run', action='store_true', help="Faqat sanash, yozmaslik")
+
+    @capture('command:reconcile_answer_counts')
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        assignments = TaskAssignment.objects.order_by('pk')
+        if options['task']:
+            assignments = assignments.filter(task_id=options['task'])
+
+        actual = Coalesce(Subquery(
+            Answer.objects.filter(
+                assignment=OuterRef('pk')
+            ).order_by().values('assignment').annotate(n=Count('id')).values('n')
+        ), 0)
+
+        started = time.perf_counter()
+        checked = drifted = 0
+        last = None
+        while True:
+            batch = assignments if last is None else assignments.filter(pk__gt=last)
+            ids = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            last = ids[-1]
+            checked += len(ids)
+
+            wrong = TaskAssignment.objects.filter(pk__in=ids).exclude(answers_count=actual)
+            if options['dry_run']:
+                drifted += wrong.count()
+            else:
+                with transaction.atomic():
+                    drifted += TaskAssignment.objects.filter(
+                        pk__in=list(wrong.values_list('pk', flat=True))
+                    ).recount_answers()
+            self.stdout.write(
+                f"  {checked} ta tekshirildi, {drifted} ta farq ({time.perf_counter() - started:.1f}s)"
+            )
+
+        verb = "topildi" if options['dry_run'] else "tuzatildi"
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: {checked} ta tayinlashdan {drifted} tasida farq {verb}"
+        ))
@@ -0,0 +1,52 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from monitoring.slow import capture
+from tasks.models import Segment
+
+
+class Command(BaseCommand):
+    help = (
+        "Segmentlar a'zoligini filtrlar bo'yicha yangilash (faqat farqi yoziladi). "
+        "Cron orqali muntazam ishga tushiring, masalan har soatda: "
+        "manage.py refresh_segments --older-than 55"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--segment', type=int, action='append', help="Faqat shu segment(lar)")
+        parser.add_argument(
+            '--older-than', type=int, metavar='MINUTES',
+            help="Faqat oxirgi marta shuncha daqiqadan oldin yangilanganlar"
+        )
+
+    @capture('command:refresh_segments')
+    def handle(self, *args, **options):
+        now = timezone.now()
+        segments = Segment.objects.filter(is_active=True).order_by('pk')
+        if options['segment']:
+            segments = segments.filter(pk__in=options['segment'])
+        if options['older_than'] is not None:
+            cutoff = now - timedelta(minutes=options['older_than'])
+            segments = segments.filter(Q(refreshed_at__isnull=True) | Q(refreshed_at__lt=cutoff))
+
+        started = time.perf_counter()
+        count = added = removed = 0
+        for segment in segments:
+            step = time.perf_counter()
+            result = segment.refresh(now)
+            count += 1
+            added += result['added']
+            removed += result['removed']
+            self.stdout.write(
+                f"  {segment.name}: +{result['added']} / -{result['removed']}, "
+                f"jami {result['total']} ({time.perf_counter() - step:.2f}s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: {count} ta segment, +{added} / -{removed} a'zo "
+            f"({time.perf_counter() - started:.1f}s)"
+        ))
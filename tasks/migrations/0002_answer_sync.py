@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-19 00:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='client_updated_at',
+            field=models.DateTimeField(blank=True, help_text="Offline sinxronlashda oxirgi yozuv g'olib bo'ladi", null=True, verbose_name='Mijozdagi vaqt'),
+        ),
+        migrations.CreateModel(
+            name='AnswerSyncKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key_hash', models.BigIntegerField(verbose_name='Kalit xeshi')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_keys', to='tasks.taskassignment', verbose_name='Tayinlash')),
+            ],
+            options={
+                'verbose_name': 'Sinxronlash kaliti',
+                'verbose_name_plural': 'Sinxronlash kalitlari',
+                'unique_together': {('assignment', 'key_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS tasks_task_title_upper_prefix '
+        'ON tasks_task (UPPER(title::text) text_pattern_ops)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS tasks_task_title_upper_prefix')
+
+
+class Migration(migrations.Migration):
+    """Admin autocomplete uchun title__istartswith indeksi (faqat PostgreSQL)"""
+
+    dependencies = [
+        ('tasks', '0002_answer_sync'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+# tasks.search.TASK_VECTOR_SQL bilan bir xil ifoda
+TASK_VECTOR = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS tasks_task_search_gin ON tasks_task USING gin (({TASK_VECTOR}))'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS tasks_task_search_gin')
+
+
+class Migration(migrations.Migration):
+    """Vazifalar uchun full-text qidiruv indeksi (faqat PostgreSQL)"""
+
+    dependencies = [
+        ('tasks', '0003_task_title_prefix_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.9 on 2026-10-19 01:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_leader_search_indexes'),
+        ('tasks', '0004_task_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskassignment',
+            name='district',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.district', verbose_name='Tuman'),
+        ),
+        migrations.AddField(
+            model_name='taskassignment',
+            name='mahalla',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.mahalla', verbose_name='Mahalla'),
+        ),
+        migrations.AddField(
+            model_name='taskassignment',
+            name='region',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.region', verbose_name='Viloyat'),
+        ),
+        migrations.AddIndex(
+            model_name='taskassignment',
+            index=models.Index(fields=['task', 'region', 'status'], name='tasks_taska_task_id_21190c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskassignment',
+            index=models.Index(fields=['task', 'district', 'status'], name='tasks_taska_task_id_056353_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskassignment',
+            index=models.Index(fields=['task', 'mahalla', 'status'], name='tasks_taska_task_id_853142_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-19 01:19
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counts(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Question = apps.get_model('tasks', 'Question')
+    count = Question.objects.filter(
+        task=OuterRef('pk')
+    ).order_by().values('task').annotate(n=Count('id')).values('n')
+    Task.objects.update(questions_count=Coalesce(Subquery(count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_assignment_geography'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='questions_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Savollar soni'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='questions_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Savollar keshi kaliti', verbose_name='Savollar versiyasi'),
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-19 01:23
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counts(apps, schema_editor):
+    TaskAssignment = apps.get_model('tasks', 'TaskAssignment')
+    Answer = apps.get_model('tasks', 'Answer')
+    count = Answer.objects.filter(
+        assignment=OuterRef('pk')
+    ).order_by().values('assignment').annotate(n=Count('id')).values('n')
+    TaskAssignment.objects.update(answers_count=Coalesce(Subquery(count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_questions_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskassignment',
+            name='answers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Javoblar soni'),
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
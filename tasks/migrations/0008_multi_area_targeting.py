@@ -0,0 +1,93 @@
+# Generated by Django 5.2.9 on 2026-10-19 01:51
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def copy_targets(apps, schema_editor):
+    """
+    Eski nishon ustuvorligi saqlanadi: mahallalar > tuman > viloyat.
+    Mahallasi bor vazifalarda viloyat/tuman e'tiborga olinmas edi.
+    """
+    Task = apps.get_model('tasks', 'Task')
+    Regions = Task.target_regions.through
+    Districts = Task.target_districts.through
+
+    tasks = Task.objects.exclude(
+        pk__in=Task.target_mahallas.through.objects.values('task_id')
+    ).order_by()
+
+    Districts.objects.bulk_create([
+        Districts(task_id=pk, district_id=district_id)
+        for pk, district_id in tasks.filter(
+            target_district__isnull=False
+        ).values_list('pk', 'target_district_id').iterator()
+    ], batch_size=1000)
+    Regions.objects.bulk_create([
+        Regions(task_id=pk, region_id=region_id)
+        for pk, region_id in tasks.filter(
+            target_district__isnull=True, target_region__isnull=False
+        ).values_list('pk', 'target_region_id').iterator()
+    ], batch_size=1000)
+
+
+def restore_targets(apps, schema_editor):
+    """Orqaga: har bir vazifaga bitta viloyat/tuman (birinchisi) qaytariladi"""
+    Task = apps.get_model('tasks', 'Task')
+    for through, column in (
+        (Task.target_regions.through, 'region_id'),
+        (Task.target_districts.through, 'district_id'),
+    ):
+        rows = through.objects.values('task_id').annotate(area=Min(column))
+        for row in rows.iterator():
+            Task.objects.filter(pk=row['task_id']).update(**{f'target_{column}': row['area']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_active_leader_mahalla_index'),
+        ('tasks', '0007_assignment_answers_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='exclude_districts',
+            field=models.ManyToManyField(blank=True, related_name='excluding_tasks', to='accounts.district', verbose_name='Istisno tumanlar'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='exclude_mahallas',
+            field=models.ManyToManyField(blank=True, help_text="Istisno hududlar yetakchilari nishonda bo'lsa ham yuborilmaydi", related_name='excluding_tasks', to='accounts.mahalla', verbose_name='Istisno mahallalar'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='exclude_regions',
+            field=models.ManyToManyField(blank=True, related_name='excluding_tasks', to='accounts.region', verbose_name='Istisno viloyatlar'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='target_districts',
+            field=models.ManyToManyField(blank=True, help_text='Tumanning barcha mahallalari', related_name='tasks', to='accounts.district', verbose_name='Tumanlar'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='target_regions',
+            field=models.ManyToManyField(blank=True, help_text='Viloyatning barcha mahallalari', related_name='tasks', to='accounts.region', verbose_name='Viloyatlar'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='target_mahallas',
+            field=models.ManyToManyField(blank=True, help_text="Viloyat, tuman va mahalla nishonlari birlashtiriladi; hammasi bo'sh = barcha yetakchilar", related_name='tasks', to='accounts.mahalla', verbose_name='Mahallalar'),
+        ),
+        migrations.RunPython(copy_targets, restore_targets),
+        migrations.RemoveField(
+            model_name='task',
+            name='target_district',
+        ),
+        migrations.RemoveField(
+            model_name='task',
+            name='target_region',
+        ),
+    ]
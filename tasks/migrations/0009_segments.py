@@ -0,0 +1,61 @@
+# Generated by Django 5.2.9 on 2026-10-19 01:57
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_active_leader_mahalla_index'),
+        ('tasks', '0008_multi_area_targeting'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Segment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Nomi')),
+                ('description', models.TextField(blank=True, verbose_name='Tavsif')),
+                ('is_active', models.BooleanField(default=True, help_text="Nofaol segmentlar yangilanmaydi va formada ko'rinmaydi", verbose_name='Faol')),
+                ('active_within_days', models.PositiveIntegerField(blank=True, help_text="Oxirgi N kun ichida faol bo'lganlar (User.last_activity)", null=True, verbose_name='Faollik (kun)')),
+                ('min_completion_rate', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)], verbose_name='Bajarilish % (dan)')),
+                ('max_completion_rate', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)], verbose_name='Bajarilish % (gacha)')),
+                ('history_days', models.PositiveIntegerField(blank=True, help_text="Bajarilish % oxirgi N kun tayinlashlari bo'yicha; bo'sh = barchasi", null=True, verbose_name='Tarix (kun)')),
+                ('min_assignments', models.PositiveIntegerField(default=1, help_text='Bajarilish % shuncha tayinlashdan keyin hisoblanadi', validators=[django.core.validators.MinValueValidator(1)], verbose_name='Kamida tayinlashlar')),
+                ('members_count', models.PositiveIntegerField(default=0, editable=False, verbose_name="A'zolar soni")),
+                ('refreshed_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Yangilangan')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Yangilangan')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_segments', to=settings.AUTH_USER_MODEL, verbose_name='Yaratuvchi')),
+                ('districts', models.ManyToManyField(blank=True, help_text='Viloyat va tumanlar birlashtiriladi', related_name='segments', to='accounts.district', verbose_name='Tumanlar')),
+                ('regions', models.ManyToManyField(blank=True, related_name='segments', to='accounts.region', verbose_name='Viloyatlar')),
+            ],
+            options={
+                'verbose_name': 'Segment',
+                'verbose_name_plural': 'Segmentlar',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='target_segments',
+            field=models.ManyToManyField(blank=True, help_text="Segment a'zolari (SegmentMember) hududiy nishonlar bilan birlashtiriladi", related_name='tasks', to='tasks.segment', verbose_name='Segmentlar'),
+        ),
+        migrations.CreateModel(
+            name='SegmentMember',
+            fields=[
+                ('pk', models.CompositePrimaryKey('segment', 'leader', blank=True, editable=False, primary_key=True, serialize=False)),
+                ('leader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segment_memberships', to=settings.AUTH_USER_MODEL, verbose_name='Yetakchi')),
+                ('segment', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='members', to='tasks.segment', verbose_name='Segment')),
+            ],
+            options={
+                'verbose_name': "Segment a'zosi",
+                'verbose_name_plural': "Segment a'zolari",
+            },
+        ),
+    ]
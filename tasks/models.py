@@ -1,5 +1,5 @@
 import uuid
-from django.db import models
+from django.db import connection, models, transaction
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import (
@@ -8,10 +8,15 @@ from django.core.validators import (
     FileExtensionValidator
 )
 from django.core.exceptions import ValidationError
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 
+from config.tracking import FieldTrackerMixin
+from . import audience, segments
+from . import questions as question_cache
 
-class Task(models.Model):
+
+class Task(FieldTrackerMixin, models.Model):
     """
     Asosiy vazifa modeli.
     Admin yaratadi, yetakchilarga yuboriladi.
@@ -82,24 +87,22 @@ class Task(models.Model):
     )
 
     # ==================== MANZIL TARGETING ====================
-    target_region = models.ForeignKey(
+    # Auditoriya = (viloyatlar ∪ tumanlar ∪ mahallalar) − istisnolar;
+    # nishon bo'sh bo'lsa — barcha yetakchilar (tasks/audience.py)
+    target_regions = models.ManyToManyField(
         'accounts.Region',
-        on_delete=models.SET_NULL,
-        null=True,
         blank=True,
         related_name='tasks',
-        verbose_name=_("Viloyat"),
-        help_text=_("Bo'sh = barcha viloyatlar")
+        verbose_name=_("Viloyatlar"),
+        help_text=_("Viloyatning barcha mahallalari")
     )
 
-    target_district = models.ForeignKey(
+    target_districts = models.ManyToManyField(
         'accounts.District',
-        on_delete=models.SET_NULL,
-        null=True,
         blank=True,
         related_name='tasks',
-        verbose_name=_("Tuman"),
-        help_text=_("Bo'sh = barcha tumanlar")
+        verbose_name=_("Tumanlar"),
+        help_text=_("Tumanning barcha mahallalari")
     )
 
     target_mahallas = models.ManyToManyField(
@@ -107,7 +110,37 @@ class Task(models.Model):
         blank=True,
         related_name='tasks',
         verbose_name=_("Mahallalar"),
-        help_text=_("Bo'sh = barcha mahallalar")
+        help_text=_("Viloyat, tuman va mahalla nishonlari birlashtiriladi; hammasi bo'sh = barcha yetakchilar")
+    )
+
+    target_segments = models.ManyToManyField(
+        'Segment',
+        blank=True,
+        related_name='tasks',
+        verbose_name=_("Segmentlar"),
+        help_text=_("Segment a'zolari (SegmentMember) hududiy nishonlar bilan birlashtiriladi")
+    )
+
+    exclude_regions = models.ManyToManyField(
+        'accounts.Region',
+        blank=True,
+        related_name='excluding_tasks',
+        verbose_name=_("Istisno viloyatlar")
+    )
+
+    exclude_districts = models.ManyToManyField(
+        'accounts.District',
+        blank=True,
+        related_name='excluding_tasks',
+        verbose_name=_("Istisno tumanlar")
+    )
+
+    exclude_mahallas = models.ManyToManyField(
+        'accounts.Mahalla',
+        blank=True,
+        related_name='excluding_tasks',
+        verbose_name=_("Istisno mahallalar"),
+        help_text=_("Istisno hududlar yetakchilari nishonda bo'lsa ham yuborilmaydi")
     )
 
     # ==================== MUDDAT ====================
@@ -153,6 +186,21 @@ class Task(models.Model):
         blank=True
     )
 
+    # ==================== SAVOLLAR (avtomatik yangilanadi) ====================
+    # Question.save/delete va tasks.questions.refresh_counts() yangilaydi
+    questions_count = models.PositiveIntegerField(
+        _("Savollar soni"),
+        default=0,
+        editable=False
+    )
+
+    questions_version = models.PositiveIntegerField(
+        _("Savollar versiyasi"),
+        default=0,
+        editable=False,
+        help_text=_("Savollar keshi kaliti")
+    )
+
     # ==================== STATISTIKA (avtomatik yangilanadi) ====================
     stats_total_assigned = models.PositiveIntegerField(
         _("Jami tayinlangan"),
@@ -257,13 +305,19 @@ class Task(models.Model):
                 })
 
     def save(self, *args, **kwargs):
-        if self.pk:
-            old = Task.objects.filter(pk=self.pk).first()
-            if old and old.status != self.status:
-                if self.status == self.Status.ACTIVE and not self.published_at:
-                    self.published_at = timezone.now()
-                elif self.status == self.Status.COMPLETED:
-                    self.completed_at = timezone.now()
+        # Eski holat bazadan qayta o'qilmaydi — FieldTrackerMixin snapshoti
+        if self.has_changed('status'):
+            stamp = None
+            if self.status == self.Status.ACTIVE and not self.published_at:
+                self.published_at = timezone.now()
+                stamp = 'published_at'
+            elif self.status == self.Status.COMPLETED:
+                self.completed_at = timezone.now()
+                stamp = 'completed_at'
+
+            update_fields = kwargs.get('update_fields')
+            if stamp and update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, stamp}
 
         super().save(*args, **kwargs)
 
@@ -300,28 +354,31 @@ class Task(models.Model):
         else:
             return f"{minutes} daqiqa"
 
-    @property
-    def questions_count(self):
-        return self.questions.count()
-
     # ==================== METHODS ====================
-    def get_target_leaders(self):
-        """Vazifa yuborilishi kerak bo'lgan yetakchilar"""
-        from accounts.models import User
+    def get_questions(self):
+        """Savollar tartib bo'yicha — jarayon keshidan (questions_version bo'yicha)"""
+        return question_cache.get_questions(self)
 
-        leaders = User.objects.filter(
-            role=User.Role.LEADER,
-            status=User.Status.ACTIVE
-        )
+    def refresh_questions(self):
+        """Savollar bulk o'zgartirilgandan keyin: sanoq va versiyani yangilash"""
+        question_cache.refresh_counts([self.pk])
+        self.refresh_from_db(fields=['questions_count', 'questions_version'])
+
+    def get_targeting(self):
+        """Nishon va istisno hududlari (bitta so'rov)"""
+        return audience.get_targeting(self)
 
-        if self.target_mahallas.exists():
-            leaders = leaders.filter(mahalla__in=self.target_mahallas.all())
-        elif self.target_district:
-            leaders = leaders.filter(mahalla__district=self.target_district)
-        elif self.target_region:
-            leaders = leaders.filter(mahalla__district__region=self.target_region)
+    def get_target_leaders(self, targeting=None):
+        """Vazifa yuborilishi kerak bo'lgan yetakchilar"""
+        if targeting is None:
+            targeting = self.get_targeting()
+        return audience.resolve(targeting)
 
-        return leaders.distinct()
+    def audience_size(self, targeting=None):
+        """Auditoriya hajmi: (total, excluded) — bitta aggregate so'rov"""
+        if targeting is None:
+            targeting = self.get_targeting()
+        return audience.size(targeting)
 
     def publish(self):
         """Vazifani faollashtirish va yetakchilarga yuborish"""
@@ -332,20 +389,39 @@ class Task(models.Model):
         self.published_at = timezone.now()
         self.save()
 
-        # Har bir yetakchi uchun assignment yaratish
-        leaders = self.get_target_leaders()
-        assignments = []
-
-        for leader in leaders:
-            assignments.append(
+        # Har bir yetakchi uchun assignment yaratish (joylashuv nusxasi bilan)
+        leaders = self.get_target_leaders().annotate(**LEADER_GEOGRAPHY)
+
+        if connection.vendor == 'postgresql':
+            # Bitta INSERT ... SELECT: yetakchilar (segment jadvalidan ham) Python ga o'qilmaydi
+            from .services import insert_select
+
+            now = timezone.now()
+            rows = leaders.annotate(
+                a_id=models.Func(function='gen_random_uuid', output_field=models.UUIDField()),
+                a_task=models.Value(self.pk, output_field=models.UUIDField()),
+                a_status=models.Value(TaskAssignment.Status.PENDING.value),
+                a_zero=models.Value(0),
+                a_now=models.Value(now, output_field=models.DateTimeField()),
+            ).values_list(
+                'a_id', 'a_task', 'pk', 'geo_region', 'geo_district', 'geo_mahalla',
+                'a_status', 'a_zero', 'a_zero', 'a_zero', 'a_now', 'a_now',
+            )
+            insert_select(TaskAssignment, ASSIGNMENT_INSERT_FIELDS, rows, ignore_conflicts=True)
+        else:
+            assignments = [
                 TaskAssignment(
                     task=self,
-                    leader=leader,
+                    leader_id=leader['pk'],
+                    region_id=leader['geo_region'],
+                    district_id=leader['geo_district'],
+                    mahalla_id=leader['geo_mahalla'],
                     status=TaskAssignment.Status.PENDING
                 )
-            )
+                for leader in leaders.values('pk', *LEADER_GEOGRAPHY)
+            ]
+            TaskAssignment.objects.bulk_create(assignments, ignore_conflicts=True)
 
-        TaskAssignment.objects.bulk_create(assignments, ignore_conflicts=True)
         self.update_stats()
 
         return True
@@ -501,6 +577,20 @@ class Question(models.Model):
     def __str__(self):
         return f"{self.order}. {self.text[:50]}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        question_cache.refresh_counts([self.task_id])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            # Kaskad bilan o'chadigan javoblar sanoqdan ayiriladi
+            TaskAssignment.objects.filter(answers__question=self).update(
+                answers_count=Greatest(models.F('answers_count') - 1, 0)
+            )
+            result = super().delete(*args, **kwargs)
+        question_cache.refresh_counts([self.task_id])
+        return result
+
     def clean(self):
         super().clean()
 
@@ -572,6 +662,54 @@ class Question(models.Model):
         return errors
 
 
+class TaskAssignmentQuerySet(models.QuerySet):
+
+    def with_progress(self):
+        """progress_percent uchun savollar sonini vazifadan olish (JOIN, subquery siz)"""
+        return self.annotate(questions_total=models.F('task__questions_count'))
+
+    def recount_answers(self):
+        """answers_count ni javoblar jadvalidan qayta hisoblash (bitta UPDATE)"""
+        answers = Answer.objects.filter(
+            assignment=models.OuterRef('pk')
+        ).order_by().values('assignment').annotate(n=models.Count('id')).values('n')
+        return self.update(answers_count=Coalesce(models.Subquery(answers), 0))
+
+    def breakdown(self, level='region'):
+        """
+        Hudud kesimida sanoqlar: [{'<level>_id', 'total', 'seen', 'completed'}, ...]
+
+        Tayinlashdagi nusxa ustunlari bo'yicha bitta jadvalda GROUP BY —
+        yetakchi/mahalla/tuman jadvallari bilan JOIN kerak emas.
+        """
+        if level not in GEOGRAPHY_LEVELS:
+            raise ValueError(f"Noma'lum daraja: {level}")
+        column = f'{level}_id'
+        Status = TaskAssignment.Status
+        return self.order_by().values(column).annotate(
+            total=models.Count('id'),
+            seen=models.Count('id', filter=~models.Q(status=Status.PENDING)),
+            completed=models.Count('id', filter=models.Q(status=Status.COMPLETED)),
+        ).order_by('-total', column)
+
+
+GEOGRAPHY_LEVELS = ('region', 'district', 'mahalla')
+
+# User querysetiga qo'llanadi: yetakchining hozirgi joylashuvi. Mahalla zanjiri
+# ustun, u bo'lmasa profildagi tuman/viloyat olinadi.
+LEADER_GEOGRAPHY = {
+    'geo_mahalla': models.F('mahalla_id'),
+    'geo_district': Coalesce('mahalla__district_id', 'district_id'),
+    'geo_region': Coalesce('mahalla__district__region_id', 'district__region_id', 'region_id'),
+}
+
+# Task.publish dagi INSERT ... SELECT ustunlari (SELECT tartibi shu)
+ASSIGNMENT_INSERT_FIELDS = [
+    'id', 'task', 'leader', 'region', 'district', 'mahalla', 'status',
+    'current_question_order', 'answers_count', 'reminder_sent_count', 'sent_at', 'updated_at',
+]
+
+
 class TaskAssignment(models.Model):
     """
     Vazifa tayinlash modeli.
@@ -607,6 +745,40 @@ class TaskAssignment(models.Model):
         verbose_name=_("Yetakchi")
     )
 
+    # ==================== GEOGRAFIYA ====================
+    # Yuborilgan paytdagi yetakchi joylashuvi. Yetakchi keyin boshqa mahallaga
+    # o'tsa ham eski tayinlashlar o'z hududida qoladi. Alohida FK indekslari
+    # o'rniga Meta dagi (task, ..., status) indekslari ishlatiladi.
+    region = models.ForeignKey(
+        'accounts.Region',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='+',
+        verbose_name=_("Viloyat")
+    )
+
+    district = models.ForeignKey(
+        'accounts.District',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='+',
+        verbose_name=_("Tuman")
+    )
+
+    mahalla = models.ForeignKey(
+        'accounts.Mahalla',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='+',
+        verbose_name=_("Mahalla")
+    )
+
     # ==================== HOLAT ====================
     status = models.CharField(
         _("Holat"),
@@ -622,6 +794,13 @@ class TaskAssignment(models.Model):
         help_text=_("Yetakchi qaysi savolda turibdi")
     )
 
+    # Answer.save/delete F-ifoda bilan yangilaydi; reconcile_answer_counts tuzatadi
+    answers_count = models.PositiveIntegerField(
+        _("Javoblar soni"),
+        default=0,
+        editable=False
+    )
+
     # ==================== VAQT BELGILARI ====================
     sent_at = models.DateTimeField(
         _("Yuborilgan"),
@@ -661,6 +840,8 @@ class TaskAssignment(models.Model):
     # ==================== VAQT ====================
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskAssignmentQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Tayinlash")
         verbose_name_plural = _("Tayinlashlar")
@@ -669,19 +850,30 @@ class TaskAssignment(models.Model):
         indexes = [
             models.Index(fields=['task', 'status']),
             models.Index(fields=['leader', 'status']),
+            models.Index(fields=['task', 'region', 'status']),
+            models.Index(fields=['task', 'district', 'status']),
+            models.Index(fields=['task', 'mahalla', 'status']),
         ]
 
     def __str__(self):
         return f"{self.leader} - {self.task.title}"
 
     # ==================== PROPERTIES ====================
+    # with_progress() annotatsiyalari bo'lsa qo'shimcha so'rov yuborilmaydi
+    @property
+    def questions_total_count(self):
+        total = getattr(self, 'questions_total', None)
+        if total is None:
+            total = self.task.questions_count
+        return total
+
     @property
     def progress_percent(self):
         """Bajarilish foizi"""
-        total = self.task.questions.count()
+        total = self.questions_total_count
         if total == 0:
             return 0
-        answered = self.answers.count()
+        answered = self.answered_count
         return int((answered / total) * 100)
 
     @property
@@ -693,51 +885,62 @@ class TaskAssignment(models.Model):
 
     @property
     def answered_count(self):
-        return self.answers.count()
+        return self.answers_count
 
     @property
     def remaining_count(self):
-        return self.task.questions.count() - self.answered_count
+        return self.questions_total_count - self.answered_count
 
     # ==================== METHODS ====================
+    def _transition(self, status, stamp_field):
+        from .services import transition_assignments
+
+        now = timezone.now()
+        if transition_assignments([self.pk], status, now=now):
+            self.status = status
+            setattr(self, stamp_field, now)
+            self.updated_at = now
+            return True
+        return False
+
     def mark_seen(self):
         """Ko'rilgan deb belgilash"""
-        if self.status == self.Status.PENDING:
-            self.status = self.Status.SEEN
-            self.seen_at = timezone.now()
-            self.save(update_fields=['status', 'seen_at', 'updated_at'])
-            self.task.update_stats()
+        return self._transition(self.Status.SEEN, 'seen_at')
 
     def mark_started(self):
         """Boshlangan deb belgilash"""
-        if self.status in [self.Status.PENDING, self.Status.SEEN]:
-            self.status = self.Status.IN_PROGRESS
-            self.started_at = timezone.now()
-            self.save(update_fields=['status', 'started_at', 'updated_at'])
-            self.task.update_stats()
+        return self._transition(self.Status.IN_PROGRESS, 'started_at')
 
     def mark_completed(self):
         """Yakunlangan deb belgilash"""
-        self.status = self.Status.COMPLETED
-        self.completed_at = timezone.now()
-        self.save(update_fields=['status', 'completed_at', 'updated_at'])
-        self.task.update_stats()
+        return self._transition(self.Status.COMPLETED, 'completed_at')
+
+    def add_answers(self, delta):
+        """answers_count ga delta qo'shish va bazadagi yangi qiymatni olish"""
+        from .services import add_answers
+
+        count = add_answers(self.pk, delta)
+        if count is not None:
+            self.answers_count = count
+        return self.answers_count
 
     def get_next_question(self):
         """Keyingi savolni olish"""
-        answered_orders = self.answers.values_list('question__order', flat=True)
-        return self.task.questions.exclude(order__in=answered_orders).first()
+        answered = set(self.answers.values_list('question_id', flat=True))
+        return next((q for q in self.task.get_questions() if q.pk not in answered), None)
 
     def get_current_question(self):
         """Joriy savolni olish"""
-        return self.task.questions.filter(order=self.current_question_order).first()
+        return next(
+            (q for q in self.task.get_questions() if q.order == self.current_question_order),
+            None
+        )
 
     def check_completion(self):
         """Bajarilganini tekshirish"""
-        total = self.task.questions.count()
-        answered = self.answers.count()
+        total = self.task.questions_count
 
-        if total > 0 and answered >= total:
+        if total > 0 and self.answers_count >= total:
             self.mark_completed()
             return True
         return False
@@ -834,6 +1037,13 @@ class Answer(models.Model):
         auto_now=True
     )
 
+    client_updated_at = models.DateTimeField(
+        _("Mijozdagi vaqt"),
+        null=True,
+        blank=True,
+        help_text=_("Offline sinxronlashda oxirgi yozuv g'olib bo'ladi")
+    )
+
     class Meta:
         verbose_name = _("Javob")
         verbose_name_plural = _("Javoblar")
@@ -908,11 +1118,53 @@ class Answer(models.Model):
         self.validation_errors = errors if errors else None
 
     def save(self, *args, **kwargs):
+        # Onlayn yozuv (bot/forma): sinxronlashda server vaqti (updated_at) bilan solishtiriladi
+        self.client_updated_at = None
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'client_updated_at', 'updated_at'}
+
+        adding = self._state.adding
         super().save(*args, **kwargs)
 
+        # Faqat (tayinlash, savol) uchun birinchi yozuv sanoqni oshiradi
+        if adding:
+            self.assignment.add_answers(1)
+
         # Bajarilganini tekshirish
         self.assignment.check_completion()
 
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.assignment.add_answers(-1)
+        return result
+
+
+class AnswerSyncKey(models.Model):
+    """
+    Offline sinxronlash idempotentlik kalitlari.
+    Mijoz kaliti 64-bitli xeshga aylantirib saqlanadi.
+    ANSWER_SYNC_KEY_RETENTION_DAYS dan eskilari prune_sync_keys bilan o'chiriladi.
+    """
+
+    assignment = models.ForeignKey(
+        TaskAssignment,
+        on_delete=models.CASCADE,
+        related_name='sync_keys',
+        verbose_name=_("Tayinlash")
+    )
+
+    key_hash = models.BigIntegerField(_("Kalit xeshi"))
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Sinxronlash kaliti")
+        verbose_name_plural = _("Sinxronlash kalitlari")
+        unique_together = ['assignment', 'key_hash']
+
+    def __str__(self):
+        return f"{self.assignment_id}:{self.key_hash}"
+
 
 class TaskHistory(models.Model):
     """
@@ -1004,4 +1256,179 @@ class TaskHistory(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.task.title} - {self.get_action_display()}"
\ No newline at end of file
+        return f"{self.task.title} - {self.get_action_display()}"
+
+
+class Segment(models.Model):
+    """
+    Saqlangan yetakchilar segmenti.
+    Filtrlar User va tayinlashlar tarixi bo'yicha; a'zolar SegmentMember
+    jadvalida saqlanadi va refresh_segments buyrug'i bilan yangilanadi.
+    """
+
+    # ==================== ASOSIY ====================
+    name = models.CharField(
+        _("Nomi"),
+        max_length=200
+    )
+
+    description = models.TextField(
+        _("Tavsif"),
+        blank=True
+    )
+
+    is_active = models.BooleanField(
+        _("Faol"),
+        default=True,
+        help_text=_("Nofaol segmentlar yangilanmaydi va formada ko'rinmaydi")
+    )
+
+    # ==================== FILTRLAR ====================
+    # Barcha filtrlar AND bilan birlashadi; bo'sh filtr cheklamaydi
+    regions = models.ManyToManyField(
+        'accounts.Region',
+        blank=True,
+        related_name='segments',
+        verbose_name=_("Viloyatlar")
+    )
+
+    districts = models.ManyToManyField(
+        'accounts.District',
+        blank=True,
+        related_name='segments',
+        verbose_name=_("Tumanlar"),
+        help_text=_("Viloyat va tumanlar birlashtiriladi")
+    )
+
+    active_within_days = models.PositiveIntegerField(
+        _("Faollik (kun)"),
+        null=True,
+        blank=True,
+        help_text=_("Oxirgi N kun ichida faol bo'lganlar (User.last_activity)")
+    )
+
+    min_completion_rate = models.DecimalField(
+        _("Bajarilish % (dan)"),
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0), MaxValueValidator(100)]
+    )
+
+    max_completion_rate = models.DecimalField(
+        _("Bajarilish % (gacha)"),
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(0), MaxValueValidator(100)]
+    )
+
+    history_days = models.PositiveIntegerField(
+        _("Tarix (kun)"),
+        null=True,
+        blank=True,
+        help_text=_("Bajarilish % oxirgi N kun tayinlashlari bo'yicha; bo'sh = barchasi")
+    )
+
+    min_assignments = models.PositiveIntegerField(
+        _("Kamida tayinlashlar"),
+        default=1,
+        validators=[MinValueValidator(1)],
+        help_text=_("Bajarilish % shuncha tayinlashdan keyin hisoblanadi")
+    )
+
+    # ==================== MATERIALIZATSIYA ====================
+    members_count = models.PositiveIntegerField(
+        _("A'zolar soni"),
+        default=0,
+        editable=False
+    )
+
+    refreshed_at = models.DateTimeField(
+        _("Yangilangan"),
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    # ==================== VAQT BELGILARI ====================
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='created_segments',
+        verbose_name=_("Yaratuvchi")
+    )
+
+    created_at = models.DateTimeField(
+        _("Yaratilgan"),
+        auto_now_add=True
+    )
+
+    updated_at = models.DateTimeField(
+        _("Yangilangan"),
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = _("Segment")
+        verbose_name_plural = _("Segmentlar")
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        super().clean()
+
+        if (
+            self.min_completion_rate is not None
+            and self.max_completion_rate is not None
+            and self.min_completion_rate > self.max_completion_rate
+        ):
+            raise ValidationError({
+                'max_completion_rate': _("Yuqori chegara quyi chegaradan kichik")
+            })
+
+    @property
+    def uses_completion(self):
+        return self.min_completion_rate is not None or self.max_completion_rate is not None
+
+    def refresh(self, now=None):
+        """A'zolarni filtrlar bo'yicha yangilash — faqat farqi yoziladi"""
+        return segments.refresh(self, now)
+
+
+class SegmentMember(models.Model):
+    """
+    Segment a'zoligi: faqat (segment, leader) juftligi, alohida id siz.
+    Jadval Segment.refresh() tomonidan to'ldiriladi — qo'lda o'zgartirilmaydi.
+    """
+
+    pk = models.CompositePrimaryKey('segment', 'leader')
+
+    # Birlamchi kalit (segment, leader) segment bo'yicha qidiruvni qoplaydi
+    segment = models.ForeignKey(
+        Segment,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='members',
+        verbose_name=_("Segment")
+    )
+
+    leader = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='segment_memberships',
+        verbose_name=_("Yetakchi")
+    )
+
+    class Meta:
+        verbose_name = _("Segment a'zosi")
+        verbose_name_plural = _("Segment a'zolari")
+
+    def __str__(self):
+        return f"{self.segment_id} - {self.leader_id}"
@@ -0,0 +1,158 @@
+"""
+Savollar tartibi uchun siyrak kalitlar.
+
+Question.order — zich raqam emas, o'sib boruvchi kalit: yangi savollar
+GAP qadam bilan (1024, 2048, ...) joylanadi. Bitta savolni ko'chirish uchun
+faqat uning kaliti qo'shnilari orasidagi bo'sh joyga o'zgaradi — qolgan
+qatorlarga tegilmaydi. Bo'sh joy tugaganda (yoki eski zich 1, 2, 3
+tartibli vazifalarda) vazifa savollari GAP bilan qayta taqsimlanadi.
+
+Foydalanuvchiga ko'rsatiladigan raqam — ro'yxatdagi o'rin (forloop.counter),
+kalitning o'zi emas.
+"""
+from bisect import bisect_left
+
+from django.db import transaction
+
+from . import questions as question_cache
+
+
+GAP = 1024
+
+# PositiveIntegerField (int4) ichida qolish uchun; undan oshsa qayta taqsimlanadi
+MAX_KEY = 2 ** 30
+
+
+def spaced(count, start=0):
+    """start dan keyingi count ta kalit: start + GAP, start + 2*GAP, ..."""
+    return [start + GAP * (i + 1) for i in range(count)]
+
+
+def _increasing_run(keys):
+    """Eng uzun o'suvchi qism-ketma-ketlik indekslari (None lar hisobga olinmaydi)"""
+    tails, tail_idx = [], []
+    prev = {}
+    for i, key in enumerate(keys):
+        if key is None:
+            continue
+        pos = bisect_left(tails, key)
+        prev[i] = tail_idx[pos - 1] if pos else None
+        if pos == len(tails):
+            tails.append(key)
+            tail_idx.append(i)
+        else:
+            tails[pos] = key
+            tail_idx[pos] = i
+
+    run = []
+    i = tail_idx[-1] if tail_idx else None
+    while i is not None:
+        run.append(i)
+        i = prev[i]
+    return set(run)
+
+
+def assign_keys(keys):
+    """
+    keys — yangi tartibdagi elementlarning joriy kalitlari (yangi element
+    uchun None). Qaytaradi: (yangi kalitlar, qayta_taqsimlandimi).
+
+    O'suvchi eng uzun qism-ketma-ketlik o'z kalitini saqlaydi, qolganlari
+    qo'shnilari orasiga teng bo'lib joylanadi — o'zgargan qatorlar soni
+    minimal. Joy yetmasa hammasi GAP bilan qayta taqsimlanadi.
+    """
+    result = [None] * len(keys)
+    for i in _increasing_run(keys):
+        result[i] = keys[i]
+
+    i = 0
+    while i < len(result):
+        if result[i] is not None:
+            i += 1
+            continue
+        j = i
+        while j < len(result) and result[j] is None:
+            j += 1
+
+        low = result[i - 1] if i else 0
+        if j == len(result):
+            result[i:j] = spaced(j - i, low)
+        else:
+            step = (result[j] - low) // (j - i + 1)
+            if step < 1:
+                return spaced(len(keys)), True
+            result[i:j] = [low + step * (n + 1) for n in range(j - i)]
+        i = j
+
+    if result and result[-1] > MAX_KEY:
+        return spaced(len(keys)), True
+    return result, False
+
+
+def write_orders(changes, ceiling):
+    """
+    changes — [(question, yangi_kalit), ...]; ceiling — vazifadagi eski va
+    yangi kalitlarning eng kattasi.
+
+    (task, order) unikal va darhol tekshiriladi: yangi kalit boshqa
+    ko'chayotgan qatorning eski kaliti bilan to'qnashsa, avval hech kim
+    band qilmagan vaqtinchalik kalitlarga o'tiladi.
+    """
+    from .models import Question
+
+    if not changes:
+        return 0
+
+    current = {q.order for q, _ in changes}
+    if current & {key for _, key in changes}:
+        temp = ceiling + 1
+        for n, (q, key) in enumerate(changes):
+            q.order = temp + n
+        Question.objects.bulk_update([q for q, _ in changes], ['order'])
+
+    for q, key in changes:
+        q.order = key
+    Question.objects.bulk_update([q for q, _ in changes], ['order'])
+    return len(changes)
+
+
+def position(task='task', order='order'):
+    """
+    Savolning vazifadagi o'rni (1 dan) — korrelyatsiyalangan subquery:
+    qs.annotate(position=position()). Tashqi so'rov filtrlari o'ringa ta'sir
+    qilmaydi, shuning uchun javobsiz savollar tanlanganda ham to'g'ri.
+    """
+    from django.db.models import Count, OuterRef, Subquery
+    from .models import Question
+
+    return Subquery(
+        Question.objects.filter(task=OuterRef(task), order__lte=OuterRef(order))
+        .order_by().values('task').annotate(n=Count('id')).values('n')
+    )
+
+
+def reorder_questions(task, question_ids):
+    """
+    Savollarni berilgan ID tartibiga keltirish. question_ids vazifaning
+    barcha savollarini aynan bir martadan o'z ichiga olishi kerak.
+    Qaytaradi: {'moved': o'zgargan qatorlar, 'rebalanced': bool}
+    """
+    from .models import Question
+
+    with transaction.atomic():
+        existing = {
+            str(q.pk): q
+            for q in Question.objects.select_for_update().filter(task=task).order_by('order')
+        }
+        ids = [str(pk) for pk in question_ids]
+        if len(ids) != len(existing) or set(ids) != set(existing):
+            raise ValueError("Savollar ro'yxati vazifa savollariga mos emas")
+
+        sequence = [existing[pk] for pk in ids]
+        keys, rebalanced = assign_keys([q.order for q in sequence])
+        changes = [(q, key) for q, key in zip(sequence, keys) if q.order != key]
+        moved = write_orders(changes, max([q.order for q in sequence] + keys, default=0))
+        if moved:
+            question_cache.refresh_counts([task.pk])
+
+    return {'moved': moved, 'rebalanced': rebalanced}
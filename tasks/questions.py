@@ -0,0 +1,66 @@
+"""
+Vazifa savollari keshi.
+
+Savollar ro'yxati jarayon ichida (task_id, questions_version) kaliti bilan
+saqlanadi. Savollar o'zgarganda refresh_counts() Task.questions_count ni
+qayta hisoblaydi va questions_version ni oshiradi — boshqa workerlar
+vazifani bazadan o'qiganda yangi versiyani ko'radi va keshni chetlab o'tadi.
+Alohida invalidatsiya xabari kerak emas.
+
+Tartib muhim: avval savollar yoziladi, keyin versiya oshiriladi. Aks holda
+oraliqda o'qigan worker eski savollarni yangi versiya ostida saqlab qo'yishi
+mumkin edi.
+
+Keshdagi Question obyektlari oqimlar orasida umumiy — ularni o'zgartirmang.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def refresh_counts(task_ids):
+    """questions_count ni qayta hisoblash va questions_version ni oshirish (bitta UPDATE)"""
+    from .models import Question, Task
+
+    count = Question.objects.filter(
+        task=OuterRef('pk')
+    ).order_by().values('task').annotate(n=Count('id')).values('n')
+
+    Task.objects.filter(pk__in=list(task_ids)).update(
+        questions_count=Coalesce(Subquery(count), 0),
+        questions_version=F('questions_version') + 1,
+    )
+
+
+def get_questions(task):
+    """Vazifa savollari tartib bo'yicha (tuple); versiya o'zgarmagan bo'lsa so'rovsiz"""
+    from .models import Question
+
+    key = (task.pk, task.questions_version)
+    with _lock:
+        questions = _cache.get(key)
+        if questions is not None:
+            _cache.move_to_end(key)
+            return questions
+
+    questions = tuple(Question.objects.filter(task_id=task.pk).order_by('order'))
+
+    with _lock:
+        for stale in [k for k in _cache if k[0] == task.pk and k[1] < key[1]]:
+            del _cache[stale]
+        _cache[key] = questions
+        while len(_cache) > settings.TASK_QUESTION_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return questions
+
+
+def clear():
+    with _lock:
+        _cache.clear()
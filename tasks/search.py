@@ -0,0 +1,56 @@
+"""
+Vazifalarni qidirish.
+
+PostgreSQL da title (A) va description (B) bo'yicha 'simple' konfiguratsiyali
+full-text qidiruv: o'zak ajratilmaydi, har bir so'z prefiks sifatida
+qidiriladi (o'zbekcha qo'shimchalar uchun: "maktab" -> "maktablarda").
+Ifoda tasks_task_search_gin indeksi bilan bir xil bo'lishi kerak.
+Boshqa bazalarda icontains.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+TASK_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(\"tasks_task\".\"title\", '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(\"tasks_task\".\"description\", '')), 'B')"
+)
+
+_WORDS = re.compile(r'\w+')
+
+
+def prefix_tsquery(term):
+    """'maktab hisobot' -> 'maktab:* & hisobot:*' (faqat so'z belgilar)"""
+    words = _WORDS.findall(term.lower())
+    return ' & '.join(f'{w}:*' for w in words)
+
+
+def search_tasks(queryset, term):
+    """Qidiruv natijalari; PostgreSQL da search_rank annotatsiyasi bilan"""
+    term = (term or '').strip()
+    if not term:
+        return queryset
+
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.filter(
+            Q(title__icontains=term) | Q(description__icontains=term)
+        )
+
+    raw = prefix_tsquery(term)
+    if not raw:
+        return queryset.none()
+
+    vector = RawSQL(TASK_VECTOR_SQL, [], output_field=SearchVectorField())
+    query = SearchQuery(raw, config='simple', search_type='raw')
+
+    return queryset.alias(
+        search_vector=vector
+    ).filter(
+        search_vector=query
+    ).annotate(
+        search_rank=SearchRank(vector, query)
+    )
@@ -0,0 +1,94 @@
+"""
+Saqlangan segmentlar a'zoligini materializatsiya qilish.
+
+Segment filtrlari bitta SQL so'rovga aylanadi (members_query). refresh()
+jadvalni to'liq qayta yozmaydi — faqat farq qo'llanadi:
+
+    DELETE  — endi mos kelmaydigan a'zolar
+    INSERT ... SELECT — yangi mos kelganlar (hali jadvalda yo'qlari)
+
+Shunday qilib o'zgarmagan a'zolar qatorlariga tegilmaydi va yangilash
+jadvalni bo'sh holatda qoldirmaydi. refresh_segments buyrug'i cron orqali
+muntazam ishga tushiriladi (faollik oynasi vaqt o'tishi bilan siljiydi).
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Value
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from . import audience
+
+
+def completion_leaders(segment, now):
+    """Bajarilish darajasi oralig'idagi yetakchilar ID lari (GROUP BY ... HAVING subquery)"""
+    from .models import TaskAssignment
+
+    history = TaskAssignment.objects.order_by()
+    if segment.history_days:
+        history = history.filter(sent_at__gte=now - timedelta(days=segment.history_days))
+
+    stats = history.values('leader_id').alias(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status=TaskAssignment.Status.COMPLETED)),
+    ).alias(
+        # Cast: aks holda butun sonli bo'lish (2/3 -> 66, 66.67 emas)
+        rate=Cast(F('completed'), FloatField()) * Value(100.0) / F('total')
+    ).filter(total__gte=max(segment.min_assignments, 1))
+
+    if segment.min_completion_rate is not None:
+        stats = stats.filter(rate__gte=segment.min_completion_rate)
+    if segment.max_completion_rate is not None:
+        stats = stats.filter(rate__lte=segment.max_completion_rate)
+    return stats.values('leader_id')
+
+
+def members_query(segment, now=None):
+    """Segment filtrlariga mos faol yetakchilar ID lari (queryset)"""
+    now = now or timezone.now()
+    leaders = audience.active_leaders().order_by()
+
+    areas = audience.mahalla_ids(
+        list(segment.regions.values_list('pk', flat=True)),
+        list(segment.districts.values_list('pk', flat=True)),
+    )
+    if areas is not None:
+        leaders = leaders.filter(mahalla_id__in=areas)
+
+    if segment.active_within_days is not None:
+        leaders = leaders.filter(
+            last_activity__gte=now - timedelta(days=segment.active_within_days)
+        )
+
+    if segment.uses_completion:
+        leaders = leaders.filter(pk__in=completion_leaders(segment, now))
+
+    return leaders.values('pk')
+
+
+def refresh(segment, now=None):
+    """
+    A'zolikni filtrlar bilan tenglashtirish.
+    Qaytaradi: {'added', 'removed', 'total'}
+    """
+    from .models import Segment, SegmentMember
+    from .services import insert_select
+
+    now = now or timezone.now()
+    desired = members_query(segment, now)
+    members = SegmentMember.objects.filter(segment_id=segment.pk)
+
+    with transaction.atomic():
+        removed, _ = members.exclude(leader_id__in=desired).delete()
+        added = insert_select(
+            SegmentMember,
+            ['segment', 'leader'],
+            desired.exclude(pk__in=members.values('leader_id'))
+            .annotate(segment_id=Value(segment.pk)).values_list('segment_id', 'pk'),
+        )
+        total = members.count()
+        Segment.objects.filter(pk=segment.pk).update(members_count=total, refreshed_at=now)
+
+    segment.members_count, segment.refreshed_at = total, now
+    return {'added': added, 'removed': removed, 'total': total}
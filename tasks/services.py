@@ -0,0 +1,575 @@
+import hashlib
+import uuid
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Case, When, Value, F, DecimalField, FloatField, IntegerField
+from django.db.models.functions import Cast, Greatest, Round
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import ordering
+from .models import Task, Question, TaskAssignment, Answer, AnswerSyncKey
+
+
+Status = TaskAssignment.Status
+
+# Maqsad holat -> (qaysi holatlardan o'tish mumkin, qo'yiladigan vaqt belgisi).
+# completed ga faqat barcha savollarga javob berilgan bo'lsa (answers_count,
+# check_completion bilan bir xil shart) o'tiladi
+TRANSITIONS = {
+    Status.SEEN: ([Status.PENDING], 'seen_at'),
+    Status.IN_PROGRESS: ([Status.PENDING, Status.SEEN], 'started_at'),
+    Status.COMPLETED: ([Status.PENDING, Status.SEEN, Status.IN_PROGRESS, Status.OVERDUE], 'completed_at'),
+}
+
+# Task.stats_* hisoblagichlari qaysi holatlarni sanaydi (update_stats bilan bir xil)
+SEEN_STATES = {Status.SEEN, Status.IN_PROGRESS, Status.COMPLETED}
+STARTED_STATES = {Status.IN_PROGRESS, Status.COMPLETED}
+
+
+def _update_returning(ids, to_status, from_statuses, stamp_field, now, leader_id):
+    """
+    Bitta shartli UPDATE ... RETURNING.
+    Qaytaradi: [(assignment_id, task_id, eski_holat), ...]
+    """
+    table = connection.ops.quote_name(TaskAssignment._meta.db_table)
+    pk_field = TaskAssignment._meta.pk
+    id_params = [pk_field.get_db_prep_value(pk, connection) for pk in ids]
+
+    where = [
+        f"id IN ({', '.join(['%s'] * len(id_params))})",
+        f"status IN ({', '.join(['%s'] * len(from_statuses))})",
+    ]
+    params = [to_status, now, now, *id_params, *from_statuses]
+    if leader_id is not None:
+        where.append("leader_id = %s")
+        params.append(leader_id)
+    if to_status == Status.COMPLETED:
+        task_table = connection.ops.quote_name(Task._meta.db_table)
+        where.append(
+            f"EXISTS (SELECT 1 FROM {task_table} AS t WHERE t.id = cur.task_id "
+            f"AND t.questions_count > 0 AND cur.answers_count >= t.questions_count)"
+        )
+
+    # Eski holat RETURNING da kerak, shuning uchun qatorlar avval qulflanadi
+    sql = (
+        f"UPDATE {table} AS a "
+        f"SET status = %s, {stamp_field} = %s, updated_at = %s "
+        f"FROM (SELECT id, status FROM {table} AS cur WHERE {' AND '.join(where)} FOR UPDATE) AS prev "
+        f"WHERE a.id = prev.id "
+        f"RETURNING a.id, a.task_id, prev.status"
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [
+            (pk_field.to_python(row[0]), Task._meta.pk.to_python(row[1]), row[2])
+            for row in cursor.fetchall()
+        ]
+
+
+def _update_fallback(ids, to_status, from_statuses, stamp_field, now, leader_id):
+    """RETURNING ... FROM qo'llanmaydigan bazalar uchun (SQLite testlar)"""
+    qs = TaskAssignment.objects.filter(pk__in=ids, status__in=from_statuses)
+    if leader_id is not None:
+        qs = qs.filter(leader_id=leader_id)
+    if to_status == Status.COMPLETED:
+        qs = qs.filter(task__questions_count__gt=0, answers_count__gte=F('task__questions_count'))
+
+    rows = list(qs.select_for_update().values_list('id', 'task_id', 'status'))
+    if rows:
+        TaskAssignment.objects.filter(pk__in=[r[0] for r in rows]).update(
+            status=to_status,
+            updated_at=now,
+            **{stamp_field: now}
+        )
+    return rows
+
+
+def insert_select(model, fields, queryset, ignore_conflicts=False):
+    """
+    INSERT INTO <model> (fields) SELECT ... — qatorlar Python ga o'qilmaydi.
+    queryset — values_list, ustunlari fields tartibida. Qo'shilgan qatorlar sonini qaytaradi.
+    """
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    columns = ', '.join(qn(model._meta.get_field(name).column) for name in fields)
+    sql, params = queryset.order_by().query.sql_with_params()
+    suffix = ' ON CONFLICT DO NOTHING' if ignore_conflicts else ''
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {table} ({columns}) {sql}{suffix}", params)
+        return cursor.rowcount
+
+
+def add_answers(assignment_id, delta):
+    """
+    TaskAssignment.answers_count ga delta qo'shish (0 dan pastga tushmaydi).
+    Yangi qiymatni qaytaradi; PostgreSQL da bitta UPDATE ... RETURNING.
+    """
+    if connection.vendor == 'postgresql':
+        table = connection.ops.quote_name(TaskAssignment._meta.db_table)
+        pk = TaskAssignment._meta.pk.get_db_prep_value(assignment_id, connection)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET answers_count = GREATEST(answers_count + %s, 0) "
+                f"WHERE id = %s RETURNING answers_count",
+                [delta, pk]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    qs = TaskAssignment.objects.filter(pk=assignment_id)
+    qs.update(answers_count=Greatest(F('answers_count') + delta, 0))
+    return qs.values_list('answers_count', flat=True).first()
+
+
+def _apply_stat_deltas(deltas):
+    """Vazifalar statistikasini bitta UPDATE bilan yangilash"""
+
+    def case(key):
+        return Case(
+            *[When(pk=task_id, then=Value(d[key])) for task_id, d in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField()
+        )
+
+    completed = F('stats_total_completed') + case('completed')
+    rate = Case(
+        When(
+            stats_total_assigned__gt=0,
+            then=Round(
+                # Butun sonli bo'lish kasr qismini tashlab yubormasligi uchun
+                Cast(completed, FloatField()) * Value(100.0) / F('stats_total_assigned'),
+                2
+            )
+        ),
+        default=F('stats_completion_rate'),
+        output_field=DecimalField(max_digits=5, decimal_places=2)
+    )
+
+    Task.objects.filter(pk__in=list(deltas)).update(
+        stats_total_seen=F('stats_total_seen') + case('seen'),
+        stats_total_started=F('stats_total_started') + case('started'),
+        stats_total_completed=completed,
+        stats_completion_rate=rate,
+    )
+
+
+def transition_assignments(ids, to_status, leader=None, now=None):
+    """
+    Tayinlashlarni ommaviy ravishda yangi holatga o'tkazish.
+
+    Faqat ruxsat etilgan holatdagi qatorlar o'zgaradi (completed — faqat
+    barcha savollarga javob berilganlari). Vazifa statistikasi
+    to'liq qayta sanalmaydi — o'zgarishlar farqi bitta UPDATE da qo'shiladi.
+    O'tkazilgan tayinlashlar ID lari ro'yxatini qaytaradi.
+    """
+    if to_status not in TRANSITIONS:
+        raise ValueError(f"Noto'g'ri holat: {to_status}")
+
+    ids = list(ids)
+    if not ids:
+        return []
+
+    from_statuses, stamp_field = TRANSITIONS[to_status]
+    now = now or timezone.now()
+    leader_id = leader.pk if leader is not None else None
+
+    if connection.vendor == 'postgresql':
+        update = _update_returning
+    else:
+        update = _update_fallback
+
+    with transaction.atomic():
+        rows = update(ids, to_status, [str(s) for s in from_statuses], stamp_field, now, leader_id)
+        if not rows:
+            return []
+
+        deltas = defaultdict(lambda: {'seen': 0, 'started': 0, 'completed': 0})
+        for _, task_id, old_status in rows:
+            d = deltas[task_id]
+            d['seen'] += (to_status in SEEN_STATES) - (old_status in SEEN_STATES)
+            d['started'] += (to_status in STARTED_STATES) - (old_status in STARTED_STATES)
+            d['completed'] += (to_status == Status.COMPLETED) - (old_status == Status.COMPLETED)
+
+        _apply_stat_deltas(deltas)
+
+    return [row[0] for row in rows]
+
+
+def _key_hash(key):
+    """Idempotentlik kalitini ixcham 64-bitli songa aylantirish"""
+    digest = hashlib.blake2b(str(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def _parse_sync_item(item):
+    assignment_id = uuid.UUID(str(item['assignment']))
+    question_id = uuid.UUID(str(item['question']))
+    client_ts = parse_datetime(str(item['client_ts']))
+    if client_ts is None:
+        raise ValueError("client_ts")
+    if timezone.is_naive(client_ts):
+        client_ts = timezone.make_aware(client_ts, dt_timezone.utc)
+    return {
+        'key': str(item['key']),
+        'hash': _key_hash(item['key']),
+        'assignment': assignment_id,
+        'question': question_id,
+        'client_ts': client_ts,
+        'value': item.get('value'),
+    }
+
+
+def _clean_sync_value(question, value):
+    """
+    Ustun turini talab qiladigan qiymatlarni oldindan tekshirish.
+    Yaroqsiz qiymat ValidationError beradi — faqat shu yozuv rad etiladi.
+    """
+    if value is None or value == '':
+        return value
+
+    q_type = question.question_type
+    if q_type == Question.Type.NUMBER:
+        field = Answer._meta.get_field('value_number')
+        field.run_validators(round(field.to_python(value), field.decimal_places))
+    elif q_type == Question.Type.DATE:
+        value = Answer._meta.get_field('value_date').to_python(value)
+    elif q_type == Question.Type.CHOICE:
+        Answer._meta.get_field('value_choice').run_validators(str(value))
+    return value
+
+
+def _answer_ts(answer):
+    """Javob vaqti: offline yozuvda mijozdagi vaqt, onlayn yozuvda server vaqti"""
+    return answer.client_updated_at or answer.updated_at
+
+
+def _claim_sync_keys(pairs, now):
+    """
+    Idempotentlik kalitlarini egallash: [(assignment_id, key_hash), ...].
+    Faqat shu chaqiruvda yozilgan (avval bo'lmagan) juftliklarni qaytaradi —
+    parallel so'rovlar bitta kalitni ikki marta qo'llay olmaydi.
+    """
+    if not pairs:
+        return set()
+
+    if connection.vendor == 'postgresql':
+        table = connection.ops.quote_name(AnswerSyncKey._meta.db_table)
+        pk_field = TaskAssignment._meta.pk
+        params = []
+        for assignment_id, key_hash in pairs:
+            params += [pk_field.get_db_prep_value(assignment_id, connection), key_hash, now]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (assignment_id, key_hash, created_at) "
+                f"VALUES {', '.join(['(%s, %s, %s)'] * len(pairs))} "
+                f"ON CONFLICT (assignment_id, key_hash) DO NOTHING "
+                f"RETURNING assignment_id, key_hash",
+                params
+            )
+            return {(pk_field.to_python(row[0]), row[1]) for row in cursor.fetchall()}
+
+    # Boshqa bazalar: tayinlashlar qulflangan, shuning uchun o'qib yozish yetarli
+    taken = set(
+        AnswerSyncKey.objects.filter(
+            assignment_id__in={pair[0] for pair in pairs},
+            key_hash__in={pair[1] for pair in pairs}
+        ).values_list('assignment_id', 'key_hash')
+    )
+    claimed = [pair for pair in pairs if pair not in taken]
+    AnswerSyncKey.objects.bulk_create([
+        AnswerSyncKey(assignment_id=assignment_id, key_hash=key_hash)
+        for assignment_id, key_hash in claimed
+    ])
+    return set(claimed)
+
+
+def sync_answers(leader, items):
+    """
+    Offline to'plangan javoblarni bitta so'rovda sinxronlash.
+
+    - takroriy kalitlar (qayta yuborish) e'tiborsiz qoldiriladi: kalitlar
+      tranzaksiya ichida INSERT ... ON CONFLICT DO NOTHING RETURNING bilan
+      egallanadi va faqat egallanganlari qo'llanadi
+    - har bir (tayinlash, savol) uchun client_ts bo'yicha oxirgi yozuv g'olib;
+      onlayn (bot/forma) yozilgan javob uchun uning server vaqti olinadi
+    - yaroqsiz qiymat faqat o'sha yozuvni rad etadi, to'plamni emas
+    - javoblar bulk_create / bulk_update bilan yoziladi
+
+    Qaytaradi: {'results': [...], 'server': [...], 'assignments': {...}}
+    'server' — mijoz yutqazgan juftliklar uchun serverdagi joriy qiymat.
+    """
+    results = []
+    parsed = []
+
+    for item in items:
+        try:
+            parsed.append(_parse_sync_item(item))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            key = item.get('key') if isinstance(item, dict) else None
+            results.append({'key': key, 'result': 'rejected', 'error': "Noto'g'ri format"})
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Tayinlashlar qulflanadi — bir tayinlash bo'yicha parallel sinxronlashlar navbat bilan
+        assignments = {
+            a.pk: a for a in TaskAssignment.objects.filter(
+                pk__in={p['assignment'] for p in parsed},
+                leader=leader
+            ).select_related('task').select_for_update(of=('self',)).order_by('pk')
+        }
+
+        questions = {
+            q.pk: q for q in Question.objects.filter(
+                pk__in={p['question'] for p in parsed},
+                task_id__in={a.task_id for a in assignments.values()}
+            )
+        }
+
+        candidates = []
+        for p in parsed:
+            assignment = assignments.get(p['assignment'])
+            question = questions.get(p['question'])
+
+            if assignment is None or question is None or question.task_id != assignment.task_id:
+                results.append({'key': p['key'], 'result': 'rejected', 'error': "Topilmadi"})
+                continue
+
+            try:
+                p['value'] = _clean_sync_value(question, p['value'])
+            except ValidationError as e:
+                results.append({'key': p['key'], 'result': 'rejected', 'error': '; '.join(e.messages)})
+                continue
+            candidates.append(p)
+
+        claimed = _claim_sync_keys(
+            list(dict.fromkeys((p['assignment'], p['hash']) for p in candidates)), now
+        )
+
+        # Har bir juftlik uchun eng yangi yozuvni tanlash
+        winners = {}
+        accepted = []
+        for p in candidates:
+            if (p['assignment'], p['hash']) not in claimed:
+                results.append({'key': p['key'], 'result': 'duplicate'})
+                continue
+            claimed.discard((p['assignment'], p['hash']))
+            accepted.append(p)
+
+            pair = (p['assignment'], p['question'])
+            if pair not in winners or p['client_ts'] > winners[pair]['client_ts']:
+                winners[pair] = p
+
+        existing = {}
+        if winners:
+            for answer in Answer.objects.filter(
+                assignment_id__in={pair[0] for pair in winners},
+                question_id__in={pair[1] for pair in winners}
+            ):
+                answer.question = questions[answer.question_id]
+                existing[(answer.assignment_id, answer.question_id)] = answer
+
+        to_create = []
+        to_update = []
+        applied = set()
+
+        for pair, p in winners.items():
+            answer = existing.get(pair)
+            if answer is not None and _answer_ts(answer) >= p['client_ts']:
+                continue
+
+            if answer is None:
+                answer = Answer(assignment=assignments[pair[0]], question=questions[pair[1]])
+                to_create.append(answer)
+            else:
+                to_update.append(answer)
+
+            answer.set_value(p['value'])
+            answer.client_updated_at = p['client_ts']
+            answer.updated_at = now
+            applied.add(id(p))
+            existing[pair] = answer
+
+        if to_update:
+            Answer.objects.bulk_update(to_update, [
+                'value_text', 'value_number', 'value_choice', 'value_multiple',
+                'value_boolean', 'value_date', 'is_valid', 'validation_errors',
+                'client_updated_at', 'updated_at',
+            ])
+
+        if to_create:
+            # Sinxronlashdan tashqari (bot/forma) parallel yozilgan juftlik
+            # konflikt beradi — qaysi qatorlar yozilmaganini pk bo'yicha aniqlaymiz
+            Answer.objects.bulk_create(to_create, ignore_conflicts=True)
+            written = set(
+                Answer.objects.filter(pk__in=[a.pk for a in to_create]).values_list('pk', flat=True)
+            )
+            lost = {(a.assignment_id, a.question_id) for a in to_create if a.pk not in written}
+            if lost:
+                for answer in Answer.objects.filter(
+                    assignment_id__in={pair[0] for pair in lost},
+                    question_id__in={pair[1] for pair in lost}
+                ):
+                    pair = (answer.assignment_id, answer.question_id)
+                    if pair in lost:
+                        answer.question = questions[answer.question_id]
+                        existing[pair] = answer
+                applied -= {id(winners[pair]) for pair in lost}
+                to_create = [a for a in to_create if a.pk in written]
+
+        if to_create:
+            created_for = {answer.assignment_id for answer in to_create}
+            recounted = TaskAssignment.objects.filter(pk__in=created_for)
+            recounted.recount_answers()
+            for pk, count in recounted.values_list('pk', 'answers_count'):
+                assignments[pk].answers_count = count
+
+        touched = {pair[0] for pair in winners}
+        statuses = _advance_assignments(touched, assignments) if (to_create or to_update) else {}
+
+    server = []
+    for p in accepted:
+        pair = (p['assignment'], p['question'])
+        if id(p) in applied:
+            results.append({'key': p['key'], 'result': 'applied'})
+            continue
+
+        results.append({'key': p['key'], 'result': 'stale'})
+        answer = existing.get(pair)
+        if answer is not None:
+            server.append({
+                'assignment': answer.assignment_id,
+                'question': answer.question_id,
+                'value': answer.value,
+                'is_valid': answer.is_valid,
+                'client_ts': _answer_ts(answer),
+            })
+
+    return {
+        'results': results,
+        'server': server,
+        'assignments': {
+            str(a.pk): statuses.get(a.pk, a.status) for a in assignments.values()
+        },
+    }
+
+
+def _advance_assignments(assignment_ids, assignments):
+    """Javob olgan tayinlashlarni boshlangan yoki bajarilgan holatga o'tkazish"""
+    completed, started = [], []
+    for pk in assignment_ids:
+        total = assignments[pk].task.questions_count
+        if total and assignments[pk].answers_count >= total:
+            completed.append(pk)
+        else:
+            started.append(pk)
+
+    statuses = {}
+    for pk in transition_assignments(completed, Status.COMPLETED):
+        statuses[pk] = Status.COMPLETED
+    for pk in transition_assignments(started, Status.IN_PROGRESS):
+        statuses[pk] = Status.IN_PROGRESS
+    return statuses
+
+
+def _match_questions(existing, items):
+    """
+    Yuborilgan savollarni mavjudlari bilan juftlash.
+
+    Forma ID yuborgan bo'lsa faqat ID bo'yicha — ID siz qator yangi savol.
+    Aks holda avval aynan shu matn (iloji bo'lsa o'sha o'rinda), keyin o'rin
+    (tartib) bo'yicha. Qaytaradi: items bilan bir xil uzunlikdagi
+    [Question | None, ...]
+    """
+    used = set()
+    matched = [None] * len(items)
+
+    if any(item.get('id') for item in items):
+        by_id = {str(q.pk): q for q in existing}
+        for i, item in enumerate(items):
+            q = by_id.get(str(item.get('id') or ''))
+            if q is not None and q.pk not in used:
+                matched[i] = q
+                used.add(q.pk)
+        return matched
+
+    # existing tartib bo'yicha; o'rin — ro'yxatdagi indeks (kalit emas)
+    by_text = defaultdict(list)
+    for position, q in enumerate(existing):
+        by_text[q.text].append((position, q))
+    for i, item in enumerate(items):
+        candidates = [(p, q) for p, q in by_text.get(item['text'], []) if q.pk not in used]
+        if candidates:
+            q = next((c for p, c in candidates if p == i), candidates[0][1])
+            matched[i] = q
+            used.add(q.pk)
+
+    for i, item in enumerate(items):
+        if matched[i] is not None or i >= len(existing):
+            continue
+        q = existing[i]
+        if q.pk not in used:
+            matched[i] = q
+            used.add(q.pk)
+
+    return matched
+
+
+def save_question_set(task, items):
+    """
+    Vazifa savollarini yuborilgan ro'yxatga keltirish — bitta tranzaksiyada
+    delete + bulk_update + bulk_create, o'zgarmagan savollarga tegilmaydi.
+
+    items: [{'id': ixtiyoriy, 'text', 'question_type'}, ...] — ro'yxat
+    tartibida. Kalitlar tasks.ordering bo'yicha: joyi o'zgarmagan savollar
+    kalitini saqlaydi. Turi o'zgargan savol o'chirilib, o'rniga yangisi
+    yaratiladi — eski javoblar boshqa qiymat ustunida, ular bilan birga ketadi.
+    Qaytaradi: {'created', 'updated', 'deleted'}
+    """
+    with transaction.atomic():
+        existing = list(Question.objects.select_for_update().filter(task=task).order_by('order'))
+        matched = _match_questions(existing, items)
+        used = {q.pk for q in matched if q is not None}
+        keys, _ = ordering.assign_keys([q.order if q is not None else None for q in matched])
+
+        to_delete = [q.pk for q in existing if q.pk not in used]
+        to_create, to_update, moved = [], [], []
+        for key, item, q in zip(keys, items, matched):
+            if q is not None and q.question_type != item['question_type']:
+                to_delete.append(q.pk)
+                q = None
+            if q is None:
+                to_create.append(Question(
+                    task=task, order=key, text=item['text'], question_type=item['question_type']
+                ))
+                continue
+            if q.order != key:
+                moved.append((q, key))
+            if q.text != item['text']:
+                q.text = item['text']
+                to_update.append(q)
+
+        if to_delete:
+            Question.objects.filter(pk__in=to_delete).delete()
+            # Kaskad bilan o'chgan javoblar
+            task.assignments.filter(answers_count__gt=0).recount_answers()
+
+        ordering.write_orders(moved, max([q.order for q in existing] + keys, default=0))
+
+        now = timezone.now()
+        for q in to_update:
+            q.updated_at = now
+        Question.objects.bulk_update(to_update, ['text', 'updated_at'])
+        Question.objects.bulk_create(to_create)
+
+        updated = len({q.pk for q in to_update} | {q.pk for q, _ in moved})
+        if to_delete or updated or to_create:
+            task.refresh_questions()
+
+    return {'created': len(to_create), 'updated': updated, 'deleted': len(to_delete)}
@@ -191,4 +191,32 @@ def progress_bar(value, max_value=100, color='primary', height=8):
         'percentage': percentage,
         'color': color,
         'height': height,
-    }
\ No newline at end of file
+    }
+
+
+TARGETING_LABELS = (
+    ('target_regions', 'Viloyatlar'),
+    ('target_districts', 'Tumanlar'),
+    ('target_mahallas', 'Mahallalar'),
+    ('target_segments', 'Segmentlar'),
+    ('exclude_regions', 'Viloyatlar'),
+    ('exclude_districts', 'Tumanlar'),
+    ('exclude_mahallas', 'Mahallalar'),
+)
+
+
+@register.inclusion_tag('components/targeting.html')
+def targeting_summary(targeting):
+    """
+    Vazifa nishoni: kiritilgan va istisno hududlar nomlari.
+    Template da: {% targeting_summary targeting %}
+    """
+    rows = [
+        (field.startswith('exclude_'), label, ', '.join(area.name for area in targeting[field]))
+        for field, label in TARGETING_LABELS
+        if targeting[field]
+    ]
+    return {
+        'everyone': targeting.is_everyone,
+        'rows': rows,
+    }
@@ -1,3 +1,1123 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+
+import openpyxl
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from benchmarks import dataset
+from benchmarks.querybudget import QueryBudgetMixin
+from config.pagination import EstimatedCountPaginator
+from tasks import ordering, questions as question_cache
+from tasks.admin import TaskAssignmentAdmin
+from tasks.models import Task, Question, TaskAssignment, Answer, AnswerSyncKey, TaskHistory, Segment
+from tasks.search import prefix_tsquery, search_tasks
+from tasks.services import TRANSITIONS, save_question_set, sync_answers, transition_assignments
+
+
+class TaskViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    namespaces = ['tasks']
+    budgets = {
+        'tasks:task_list': (5, None),
+        # +1: faol segmentlar ro'yxati — create, edit
+        'tasks:task_create': (3, None),
+        # +1: nishon hududlari (bitta UNION ALL) — detail, edit, publish, results
+        'tasks:task_detail': (9, lambda t: [t.dataset.task.pk]),
+        'tasks:task_edit': (6, lambda t: [t.draft.pk]),
+        'tasks:task_delete': (3, lambda t: [t.dataset.task.pk]),
+        'tasks:task_publish': (8, lambda t: [t.draft.pk]),
+        # +2: hudud kesimi (GROUP BY) va hudud nomlari
+        'tasks:task_results': (10, lambda t: [t.dataset.task.pk]),
+        'tasks:task_export': (7, lambda t: [t.dataset.task.pk]),
+        'tasks:question_reorder': (None, None),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.draft, = dataset.create_tasks(cls.dataset, 1, 3, status=Task.Status.DRAFT)
+
+    def test_routes_have_budgets(self):
+        self.assertBudgetsCovered()
+
+    def test_query_budgets(self):
+        self.assertQueryBudgets()
+
+
+class TaskAdminQueryBudgetTests(QueryBudgetMixin, TestCase):
+    budgets = {
+        'admin:tasks_task_changelist': (8, None),
+        'admin:tasks_question_changelist': (5, None),
+        'admin:tasks_taskassignment_changelist': (6, None),
+        'admin:tasks_answer_changelist': (5, None),
+        'admin:tasks_taskhistory_changelist': (7, None),
+        'admin:tasks_task_reorder_questions': (5, lambda t: [t.dataset.task.pk]),
+        'admin:tasks_segment_changelist': (6, None),
+    }
+
+    def test_query_budgets(self):
+        self.assertQueryBudgets()
+
+    def test_sortable_columns(self):
+        for model in (Task, Question, TaskAssignment, Answer, TaskHistory):
+            with self.subTest(model=model.__name__):
+                self.assertChangelistSortable(model)
+
+    def test_progress_sorted_by_ratio(self):
+        first, second = self.dataset.tasks[:2]
+        Task.objects.filter(pk=first.pk).update(questions_count=10)
+        Task.objects.filter(pk=second.pk).update(questions_count=2)
+        TaskAssignment.objects.update(answers_count=0)
+        low = TaskAssignment.objects.filter(task=first).first()
+        high = TaskAssignment.objects.filter(task=second).first()
+        TaskAssignment.objects.filter(pk=low.pk).update(answers_count=3)    # 30%
+        TaskAssignment.objects.filter(pk=high.pk).update(answers_count=1)   # 50%
+
+        column = TaskAssignmentAdmin.list_display.index('progress_bar')
+        response, _ = self.capture(
+            reverse('admin:tasks_taskassignment_changelist'), data={'o': f'-{column + 1}'}
+        )
+        results = list(response.context['cl'].result_list)
+        self.assertEqual(results[:2], [high, low])
+
+    def test_autocomplete_filter_loads_only_selected(self):
+        task = self.dataset.task
+        url = reverse('admin:tasks_question_changelist')
+        response, _ = self.capture(url, data={'task__id__exact': task.pk})
+        self.assertContains(response, 'autocomplete-filter')
+        self.assertContains(response, f'<option value="{task.pk}" selected>')
+        self.assertNotContains(response, f'<option value="{self.dataset.tasks[1].pk}"')
+
+    def test_autocomplete_prefix_search(self):
+        url = reverse('admin:autocomplete')
+        params = {'app_label': 'tasks', 'model_name': 'question', 'field_name': 'task'}
+
+        response, _ = self.capture(url, data={**params, 'term': self.dataset.prefix})
+        self.assertEqual(len(response.json()['results']), len(self.dataset.tasks))
+
+        response, _ = self.capture(url, data={**params, 'term': 'vazifa'})
+        self.assertEqual(response.json()['results'], [])
+
+
+class EstimatedCountPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        dataset.build()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_exact_below_threshold(self):
+        queryset = TaskAssignment.objects.filter(status=TaskAssignment.Status.COMPLETED)
+        paginator = EstimatedCountPaginator(queryset, 10)
+        self.assertEqual(paginator.count, queryset.count())
+        self.assertFalse(paginator.approximate)
+
+    @skipUnless(connection.vendor == 'postgresql', "Faqat PostgreSQL taxmini")
+    def test_estimate_above_threshold(self):
+        queryset = TaskAssignment.objects.filter(status=TaskAssignment.Status.COMPLETED)
+        paginator = EstimatedCountPaginator(queryset, 10)
+        paginator.threshold = 0
+
+        self.assertIsInstance(paginator.count, int)
+        self.assertTrue(paginator.approximate)
+
+        with self.assertNumQueries(0):
+            cached = EstimatedCountPaginator(queryset, 10)
+            cached.threshold = 0
+            self.assertEqual(cached.count, paginator.count)
+
+
+class TaskSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(tasks=3)
+        cls.match = cls.dataset.tasks[1]
+        cls.match.title = "Maktablarda davomat"
+        cls.match.save()
+
+    def test_prefix_tsquery(self):
+        self.assertEqual(prefix_tsquery("Maktab  hisobot!"), "maktab:* & hisobot:*")
+        self.assertEqual(prefix_tsquery("--"), "")
+
+    def test_prefix_match(self):
+        results = search_tasks(Task.objects.all(), "maktab")
+        self.assertEqual(list(results), [self.match])
+
+    def test_empty_term(self):
+        self.assertEqual(search_tasks(Task.objects.all(), "  ").count(), Task.objects.count())
+
+    @skipUnless(connection.vendor == 'postgresql', "Faqat PostgreSQL full-text")
+    def test_title_ranks_above_description(self):
+        other = self.dataset.tasks[2]
+        other.description = "Maktab bo'yicha hisobot"
+        other.save()
+
+        results = list(search_tasks(Task.objects.all(), "maktab").order_by('-search_rank'))
+        self.assertEqual(results, [self.match, other])
+
+
+class TaskFieldTrackingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(tasks=1)
+
+    def test_changed_fields(self):
+        task = Task.objects.get(pk=self.dataset.task.pk)
+        self.assertEqual(task.changed_fields, {})
+
+        old_title = task.title
+        task.title = "Yangi nom"
+        self.assertTrue(task.has_changed('title'))
+        self.assertEqual(task.changed_fields, {'title': old_title})
+        self.assertEqual(task.initial_value('title'), old_title)
+
+    def test_save_writes_changed_fields_only(self):
+        task = Task.objects.get(pk=self.dataset.task.pk)
+        task.title = "Yangi nom"
+        with self.assertNumQueries(1) as ctx:
+            task.save()
+        sql = ctx.captured_queries[0]['sql']
+        self.assertIn('"title"', sql)
+        self.assertIn('"updated_at"', sql)
+        self.assertNotIn('"description"', sql)
+        self.assertEqual(task.changed_fields, {})
+
+    def test_status_transition_without_select(self):
+        task = Task.objects.get(pk=self.dataset.task.pk)
+        task.status = Task.Status.COMPLETED
+        with self.assertNumQueries(1):
+            task.save()
+        task.refresh_from_db()
+        self.assertIsNotNone(task.completed_at)
+
+        task.status = Task.Status.PAUSED
+        task.save(update_fields=['status'])
+        task.status = Task.Status.COMPLETED
+        before = task.completed_at
+        task.save(update_fields=['status'])
+        task.refresh_from_db()
+        self.assertGreater(task.completed_at, before)
+
+    def test_update_stats_does_not_reread(self):
+        task = Task.objects.get(pk=self.dataset.task.pk)
+        # 4 ta COUNT + 1 ta UPDATE
+        with self.assertNumQueries(5):
+            task.update_stats()
+
+    def test_deferred_field_assignment_is_saved(self):
+        task = Task.objects.defer('description').get(pk=self.dataset.task.pk)
+        task.description = "Yangi tavsif"
+        task.save()
+        self.assertEqual(Task.objects.get(pk=task.pk).description, "Yangi tavsif")
+
+
+class AssignmentGeographyTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(regions=2, districts=2, mahallas=1, leaders=2, tasks=1)
+        cls.draft, = dataset.create_tasks(cls.dataset, 1, 2, status=Task.Status.DRAFT)
+
+    def test_publish_snapshots_leader_geography(self):
+        self.draft.publish()
+        assignments = list(self.draft.assignments.select_related('leader'))
+        self.assertEqual(len(assignments), len(self.dataset.leaders))
+        for a in assignments:
+            self.assertEqual(a.mahalla_id, a.leader.mahalla_id)
+            self.assertEqual(a.district_id, a.leader.district_id)
+            self.assertEqual(a.region_id, a.leader.region_id)
+
+    def test_snapshot_survives_leader_move(self):
+        self.draft.publish()
+        leader = self.dataset.leaders[0]
+        old_mahalla = leader.mahalla_id
+        target = next(m for m in self.dataset.mahallas if m.pk != old_mahalla)
+        leader.mahalla = target
+        leader.save()
+
+        assignment = self.draft.assignments.get(leader=leader)
+        self.assertEqual(assignment.mahalla_id, old_mahalla)
+
+    def test_breakdown_is_single_table(self):
+        task = self.dataset.task
+        with self.assertNumQueries(1) as ctx:
+            rows = list(task.assignments.breakdown('district'))
+        self.assertNotIn('JOIN', ctx.captured_queries[0]['sql'])
+
+        self.assertEqual(len(rows), len(self.dataset.districts))
+        self.assertEqual(sum(r['total'] for r in rows), task.assignments.count())
+        completed = task.assignments.filter(status=TaskAssignment.Status.COMPLETED).count()
+        self.assertEqual(sum(r['completed'] for r in rows), completed)
+
+    def test_backfill(self):
+        task = self.dataset.task
+        task.assignments.update(region=None, district=None, mahalla=None)
+
+        call_command('backfill_assignment_geography', batch_size=3, stdout=StringIO())
+
+        for a in task.assignments.select_related('leader'):
+            self.assertEqual(a.region_id, a.leader.region_id)
+            self.assertEqual(a.mahalla_id, a.leader.mahalla_id)
+
+
+class QuestionCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(tasks=1, questions=3)
+
+    def setUp(self):
+        question_cache.clear()
+        self.task = Task.objects.get(pk=self.dataset.task.pk)
+
+    def test_count_maintained(self):
+        self.assertEqual(self.task.questions_count, 3)
+        version = self.task.questions_version
+
+        question = Question.objects.create(task=self.task, order=4, text="Yangi")
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.questions_count, 4)
+        self.assertGreater(self.task.questions_version, version)
+
+        question.delete()
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.questions_count, 3)
+
+    def test_cached_until_version_changes(self):
+        with self.assertNumQueries(1):
+            first = self.task.get_questions()
+        with self.assertNumQueries(0):
+            self.assertIs(self.task.get_questions(), first)
+        self.assertEqual([q.order for q in first], ordering.spaced(3))
+
+        Question.objects.create(task=self.task, order=ordering.GAP * 4, text="Yangi")
+        task = Task.objects.get(pk=self.task.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(task.get_questions()), 4)
+
+    def test_progress_without_question_queries(self):
+        assignment = TaskAssignment.objects.select_related('task').filter(
+            task=self.task
+        ).exclude(status=TaskAssignment.Status.COMPLETED).first()
+        assignment.task.get_questions()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(assignment.questions_total_count, 3)
+            assignment.get_current_question()
+            assignment.progress_percent
+            self.assertFalse(assignment.check_completion())
+
+    def test_with_progress_uses_counter(self):
+        assignment = TaskAssignment.objects.with_progress().filter(task=self.task).first()
+        self.assertEqual(assignment.questions_total, 3)
+
+
+class AnswerCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(tasks=1, questions=2, completion=0)
+
+    def _pending(self):
+        assignment = TaskAssignment.objects.select_related('task').filter(
+            task=self.dataset.task, answers_count=0
+        ).first()
+        return assignment, list(assignment.task.get_questions())
+
+    def test_dataset_counts_match(self):
+        for a in TaskAssignment.objects.filter(task=self.dataset.task):
+            self.assertEqual(a.answers_count, a.answers.count())
+
+    def test_insert_increments_and_completes(self):
+        assignment, questions = self._pending()
+
+        answer = Answer(assignment=assignment, question=questions[0])
+        answer.set_value("1")
+        answer.save()
+        self.assertEqual(assignment.answers_count, 1)
+
+        # Qayta saqlash sanoqni oshirmaydi
+        answer.save()
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.answers_count, 1)
+
+        last = Answer(assignment=assignment, question=questions[1])
+        last.set_value("2")
+        last.save()
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.answers_count, 2)
+        self.assertEqual(assignment.status, TaskAssignment.Status.COMPLETED)
+
+    def test_delete_decrements(self):
+        assignment, questions = self._pending()
+        answer = Answer(assignment=assignment, question=questions[0])
+        answer.set_value("1")
+        answer.save()
+
+        answer.delete()
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.answers_count, 0)
+
+    def test_question_delete_decrements(self):
+        assignment, questions = self._pending()
+        answer = Answer(assignment=assignment, question=questions[0])
+        answer.set_value("1")
+        answer.save()
+
+        Question.objects.get(pk=questions[0].pk).delete()
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.answers_count, 0)
+
+    def test_reconcile(self):
+        assignment, questions = self._pending()
+        TaskAssignment.objects.filter(pk=assignment.pk).update(answers_count=5)
+
+        out = StringIO()
+        call_command('reconcile_answer_counts', '--dry-run', stdout=out)
+        self.assertIn("1 tasida farq topildi", out.getvalue())
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.answers_count, 5)
+
+        call_command('reconcile_answer_counts', batch_size=2, stdout=StringIO())
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.answers_count, 0)
+
+    def test_sync_recounts(self):
+        assignment, questions = self._pending()
+        items = [
+            {'key': f'k{i}', 'assignment': str(assignment.pk), 'question': str(q.pk),
+             'value': "1", 'client_ts': '2026-01-01T10:00:00Z'}
+            for i, q in enumerate(questions)
+        ]
+        result = sync_answers(assignment.leader, items + items[:1])
+
+        assignment.refresh_from_db()
+        self.assertEqual(assignment.answers_count, 2)
+        self.assertEqual(result['assignments'][str(assignment.pk)], TaskAssignment.Status.COMPLETED)
+
+
+class QuestionSetEditorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(tasks=1, questions=4, completion=1)
+
+    def setUp(self):
+        self.task = Task.objects.get(pk=self.dataset.task.pk)
+        self.questions = list(self.task.questions.order_by('order'))
+
+    def _items(self, questions):
+        return [
+            {'id': str(q.pk), 'text': q.text, 'question_type': q.question_type}
+            for q in questions
+        ]
+
+    def test_unchanged_is_noop(self):
+        version = self.task.questions_version
+        result = save_question_set(self.task, self._items(self.questions))
+        self.assertEqual(result, {'created': 0, 'updated': 0, 'deleted': 0})
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.questions_version, version)
+
+    def test_reorder_keeps_ids(self):
+        reordered = list(reversed(self.questions))
+        result = save_question_set(self.task, self._items(reordered))
+        # Eng uzun o'suvchi qism (bitta savol) joyida qoladi
+        self.assertEqual(result['updated'], 3)
+
+        saved = list(self.task.questions.order_by('order').values_list('pk', flat=True))
+        self.assertEqual(saved, [q.pk for q in reordered])
+
+    def test_match_by_text_without_ids(self):
+        items = self._items([self.questions[1], self.questions[0]] + self.questions[2:])
+        for item in items:
+            item['id'] = ''
+        save_question_set(self.task, items)
+
+        saved = list(self.task.questions.order_by('order').values_list('pk', flat=True))
+        self.assertEqual(saved[:2], [self.questions[1].pk, self.questions[0].pk])
+
+    def test_edit_delete_and_add(self):
+        items = self._items(self.questions[:3])
+        items[0]['text'] = "Tahrirlangan"
+        items.append({'id': '', 'text': "Yangi savol", 'question_type': Question.Type.TEXT})
+
+        # Savollar soniga bog'liq emas: o'qish, delete (kaskad), recount,
+        # bulk_update, bulk_create, versiya
+        with self.assertNumQueries(11):
+            result = save_question_set(self.task, items)
+        self.assertEqual(result, {'created': 1, 'updated': 1, 'deleted': 1})
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.questions_count, 4)
+        self.assertEqual(
+            list(self.task.questions.order_by('order').values_list('text', flat=True)),
+            ["Tahrirlangan", self.questions[1].text, self.questions[2].text, "Yangi savol"]
+        )
+        self.assertTrue(Question.objects.filter(pk=self.questions[0].pk).exists())
+
+        # O'chirilgan savol javoblari sanoqdan chiqdi
+        for a in self.task.assignments.all():
+            self.assertEqual(a.answers_count, 3)
+
+    def test_type_change_replaces_question(self):
+        items = self._items(self.questions)
+        changed = self.questions[1]
+        new_type = Question.Type.NUMBER if changed.question_type != Question.Type.NUMBER else Question.Type.TEXT
+        items[1]['question_type'] = new_type
+        items[1]['text'] = "Turi o'zgardi"
+
+        result = save_question_set(self.task, items)
+        self.assertEqual(result, {'created': 1, 'updated': 0, 'deleted': 1})
+
+        saved = list(self.task.questions.order_by('order'))
+        self.assertEqual([q.pk for q in saved[::2]], [q.pk for q in self.questions[::2]])
+        self.assertEqual(saved[1].order, changed.order)
+        self.assertEqual((saved[1].text, saved[1].question_type), ("Turi o'zgardi", new_type))
+        self.assertFalse(Question.objects.filter(pk=changed.pk).exists())
+
+        # Eski turdagi javoblar savol bilan o'chdi, sanoq qayta hisoblandi
+        self.assertFalse(Answer.objects.filter(question=saved[1]).exists())
+        for a in self.task.assignments.all():
+            self.assertEqual(a.answers_count, 3)
+
+    def test_edit_view_posts_ids(self):
+        draft, = dataset.create_tasks(self.dataset, 1, 4, status=Task.Status.DRAFT)
+        self.client.force_login(self.dataset.admin)
+        reordered = list(draft.questions.order_by('-order'))
+        response = self.client.post(reverse('tasks:task_edit', args=[draft.pk]), {
+            'title': draft.title,
+            'task_type': draft.task_type,
+            'priority': draft.priority,
+            'deadline': draft.deadline.strftime('%Y-%m-%dT%H:%M'),
+            'question_id[]': [str(q.pk) for q in reordered] + [''],
+            'question_text[]': [q.text for q in reordered] + ["Yangi"],
+            'question_type[]': [q.question_type for q in reordered] + [Question.Type.TEXT],
+        })
+        self.assertEqual(response.status_code, 302)
+
+        saved = list(draft.questions.order_by('order').values_list('pk', flat=True))
+        self.assertEqual(saved[:4], [q.pk for q in reordered])
+        self.assertEqual(len(saved), 5)
+
+
+class AudienceTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(regions=3, districts=2, mahallas=2, leaders=2, tasks=0)
+        ds = cls.dataset
+        cls.homeless = User.objects.create(
+            username=f"{ds.prefix}_homeless", role=User.Role.LEADER, status=User.Status.ACTIVE
+        )
+        cls.blocked = ds.leaders[0]
+        User.objects.filter(pk=cls.blocked.pk).update(status=User.Status.BLOCKED)
+        cls.draft, = dataset.create_tasks(ds, 1, 2, status=Task.Status.DRAFT)
+
+    def _leaders(self, test):
+        return {
+            leader.pk for leader in self.dataset.leaders
+            if leader.pk != self.blocked.pk and test(leader)
+        }
+
+    def _resolved(self):
+        return set(self.draft.get_target_leaders().values_list('pk', flat=True))
+
+    def test_everyone(self):
+        expected = self._leaders(lambda l: True) | {self.homeless.pk}
+        self.assertEqual(self._resolved(), expected)
+        self.assertEqual(self.draft.audience_size(), (len(expected), 0))
+        self.assertEqual(self.draft.get_targeting().breakdown_level(), 'region')
+
+    def test_union_of_levels(self):
+        ds = self.dataset
+        region = ds.regions[0]
+        district = next(d for d in ds.districts if d.region_id == ds.regions[1].pk)
+        mahalla = next(m for m in ds.mahallas if m.district.region_id == ds.regions[2].pk)
+        self.draft.target_regions.set([region])
+        self.draft.target_districts.set([district])
+        self.draft.target_mahallas.set([mahalla])
+
+        expected = self._leaders(
+            lambda l: l.region_id == region.pk or l.district_id == district.pk
+            or l.mahalla_id == mahalla.pk
+        )
+        self.assertEqual(self._resolved(), expected)
+        self.assertEqual(self.draft.get_targeting().breakdown_level(), 'district')
+
+    def test_exclusions(self):
+        ds = self.dataset
+        districts = [d for d in ds.districts if d.region_id == ds.regions[0].pk]
+        mahalla = next(m for m in ds.mahallas if m.district_id == districts[1].pk)
+        self.draft.target_regions.set(ds.regions[:2])
+        self.draft.exclude_districts.set([districts[0]])
+        self.draft.exclude_mahallas.set([mahalla])
+
+        expected = self._leaders(
+            lambda l: l.region_id in (ds.regions[0].pk, ds.regions[1].pk)
+            and l.district_id != districts[0].pk and l.mahalla_id != mahalla.pk
+        )
+        self.assertEqual(self._resolved(), expected)
+
+        targeting = self.draft.get_targeting()
+        with self.assertNumQueries(1):
+            size = self.draft.audience_size(targeting)
+        matched = self._leaders(lambda l: l.region_id in (ds.regions[0].pk, ds.regions[1].pk))
+        self.assertEqual(size, (len(expected), len(matched) - len(expected)))
+        self.assertEqual(targeting.breakdown_level(), 'region')
+
+    def test_exclusion_only_keeps_leaders_without_mahalla(self):
+        region = self.dataset.regions[0]
+        self.draft.exclude_regions.set([region])
+
+        expected = self._leaders(lambda l: l.region_id != region.pk) | {self.homeless.pk}
+        self.assertEqual(self._resolved(), expected)
+
+    def test_single_subquery_without_distinct(self):
+        ds = self.dataset
+        self.draft.target_regions.set(ds.regions[:1])
+        self.draft.target_districts.set(ds.districts[-1:])
+        self.draft.exclude_mahallas.set(ds.mahallas[:1])
+
+        with self.assertNumQueries(1):
+            targeting = self.draft.get_targeting()
+        self.assertEqual(targeting.ids('target_regions'), [ds.regions[0].pk])
+
+        sql = str(self.draft.get_target_leaders(targeting).query).upper()
+        self.assertNotIn('DISTINCT', sql)
+        self.assertNotIn(' OR ', sql)
+        self.assertIn('EXCEPT', sql)
+
+    def test_publish_assigns_audience(self):
+        self.draft.target_districts.set(self.dataset.districts[:3])
+        self.draft.exclude_mahallas.set(self.dataset.mahallas[:1])
+        expected = self._resolved()
+
+        self.draft.publish()
+        self.assertEqual(
+            set(self.draft.assignments.values_list('leader_id', flat=True)), expected
+        )
+
+    def test_edit_and_publish_views(self):
+        ds = self.dataset
+        self.client.force_login(ds.admin)
+        response = self.client.post(reverse('tasks:task_edit', args=[self.draft.pk]), {
+            'title': self.draft.title,
+            'task_type': self.draft.task_type,
+            'priority': self.draft.priority,
+            'deadline': self.draft.deadline.strftime('%Y-%m-%dT%H:%M'),
+            'target_regions': [ds.regions[0].pk, ds.regions[1].pk],
+            'exclude_districts': [ds.districts[0].pk],
+            'question_text[]': ["Savol"],
+            'question_type[]': [Question.Type.TEXT],
+        })
+        self.assertEqual(response.status_code, 302)
+
+        targeting = self.draft.get_targeting()
+        self.assertEqual(set(targeting.ids('target_regions')), {ds.regions[0].pk, ds.regions[1].pk})
+        self.assertEqual(targeting.ids('exclude_districts'), [ds.districts[0].pk])
+
+        response = self.client.get(reverse('tasks:task_publish', args=[self.draft.pk]))
+        size = self.draft.audience_size()
+        self.assertEqual(response.context['target_leaders_count'], size.total)
+        self.assertContains(response, ds.districts[0].name)
+        self.assertContains(response, f"{size.excluded} ta yetakchi chiqarildi")
+
+
+class SegmentTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(regions=2, districts=2, mahallas=1, leaders=3, tasks=3)
+        ds = cls.dataset
+        now = timezone.now()
+        for n, leader in enumerate(ds.leaders):
+            leader.last_activity = now - timedelta(days=1 if n % 2 else 40)
+        User.objects.bulk_update(ds.leaders, ['last_activity'])
+        cls.draft, = dataset.create_tasks(ds, 1, 2, status=Task.Status.DRAFT)
+
+    def _rates(self):
+        rates = {}
+        for leader_id, status in TaskAssignment.objects.values_list('leader_id', 'status'):
+            total, completed = rates.get(leader_id, (0, 0))
+            rates[leader_id] = (total + 1, completed + (status == TaskAssignment.Status.COMPLETED))
+        return {pk: completed * 100 / total for pk, (total, completed) in rates.items()}
+
+    def _members(self, segment):
+        return set(segment.members.values_list('leader_id', flat=True))
+
+    def test_region_and_activity(self):
+        region = self.dataset.regions[0]
+        segment = Segment.objects.create(name="Faollar", active_within_days=7)
+        segment.regions.set([region])
+
+        result = segment.refresh()
+        expected = {
+            l.pk for l in self.dataset.leaders
+            if l.region_id == region.pk and l.last_activity > timezone.now() - timedelta(days=7)
+        }
+        self.assertEqual(self._members(segment), expected)
+        self.assertEqual(result, {'added': len(expected), 'removed': 0, 'total': len(expected)})
+        segment.refresh_from_db()
+        self.assertEqual(segment.members_count, len(expected))
+        self.assertIsNotNone(segment.refreshed_at)
+
+    def test_completion_rate(self):
+        segment = Segment.objects.create(name="Sust", max_completion_rate=50)
+        segment.refresh()
+        expected = {pk for pk, rate in self._rates().items() if rate <= 50}
+        self.assertTrue(expected)
+        self.assertEqual(self._members(segment), expected)
+
+    def test_completion_rate_not_truncated(self):
+        # 2/3 = 66.67% — butun sonli bo'lishda 66 bo'lib, chegaradan tushib qolardi
+        leader = self.dataset.leaders[0]
+        assignments = TaskAssignment.objects.filter(leader=leader).order_by('pk')
+        self.assertEqual(assignments.count(), 3)
+        TaskAssignment.objects.update(status=TaskAssignment.Status.PENDING)
+        TaskAssignment.objects.filter(pk__in=assignments.values('pk')[:2]).update(
+            status=TaskAssignment.Status.COMPLETED
+        )
+
+        segment = Segment.objects.create(name="Faol", min_completion_rate=Decimal('66.5'))
+        segment.refresh()
+        self.assertEqual(self._members(segment), {leader.pk})
+
+    def test_refresh_writes_only_difference(self):
+        segment = Segment.objects.create(name="Faollar", active_within_days=7)
+        segment.refresh()
+        before = self._members(segment)
+
+        gone = User.objects.get(pk=next(iter(before)))
+        came = next(l for l in self.dataset.leaders if l.pk not in before)
+        User.objects.filter(pk=gone.pk).update(last_activity=timezone.now() - timedelta(days=30))
+        User.objects.filter(pk=came.pk).update(last_activity=timezone.now())
+
+        result = segment.refresh()
+        self.assertEqual(result, {'added': 1, 'removed': 1, 'total': len(before)})
+        self.assertEqual(self._members(segment), before - {gone.pk} | {came.pk})
+        self.assertEqual(segment.refresh(), {'added': 0, 'removed': 0, 'total': len(before)})
+
+    def test_command(self):
+        fresh = Segment.objects.create(name="Yangi", active_within_days=7)
+        stale = Segment.objects.create(name="Eski", active_within_days=7)
+        Segment.objects.create(name="O'chirilgan", is_active=False)
+        fresh.refresh()
+        Segment.objects.filter(pk=fresh.pk).update(members_count=0)
+
+        call_command('refresh_segments', older_than=60, stdout=StringIO())
+        fresh.refresh_from_db()
+        stale.refresh_from_db()
+        self.assertEqual(fresh.members_count, 0)
+        self.assertEqual(stale.members_count, len(self._members(stale)))
+        self.assertGreater(stale.members_count, 0)
+
+    def test_publish_from_segment(self):
+        segment = Segment.objects.create(name="Faollar", active_within_days=7)
+        segment.refresh()
+        members = self._members(segment)
+        blocked = next(iter(members))
+        User.objects.filter(pk=blocked).update(status=User.Status.BLOCKED)
+
+        region = self.dataset.regions[1]
+        self.draft.target_segments.set([segment])
+        self.draft.target_regions.set([region])
+        expected = (members - {blocked}) | {
+            l.pk for l in self.dataset.leaders if l.region_id == region.pk and l.pk != blocked
+        }
+        self.assertEqual(self.draft.audience_size().total, len(expected))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.draft.publish()
+        self.assertEqual(
+            set(self.draft.assignments.values_list('leader_id', flat=True)), expected
+        )
+
+        if connection.vendor == 'postgresql':
+            inserts = [
+                q['sql'] for q in ctx.captured_queries
+                if q['sql'].startswith('INSERT INTO "tasks_taskassignment"')
+            ]
+            self.assertEqual(len(inserts), 1)
+            self.assertIn('"tasks_segmentmember"', inserts[0])
+
+    def test_form_targets_segment(self):
+        segment = Segment.objects.create(name="Hammasi")
+        segment.refresh()
+        self.client.force_login(self.dataset.admin)
+        response = self.client.post(reverse('tasks:task_edit', args=[self.draft.pk]), {
+            'title': self.draft.title,
+            'task_type': self.draft.task_type,
+            'priority': self.draft.priority,
+            'deadline': self.draft.deadline.strftime('%Y-%m-%dT%H:%M'),
+            'target_segments': [segment.pk],
+            'question_text[]': ["Savol"],
+            'question_type[]': [Question.Type.TEXT],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.draft.get_targeting().ids('target_segments'), [segment.pk])
+
+        response = self.client.get(reverse('tasks:task_publish', args=[self.draft.pk]))
+        self.assertContains(response, "Hammasi")
+        self.assertEqual(response.context['target_leaders_count'], len(self.dataset.leaders))
+
+
+class QuestionOrderingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(tasks=1, questions=6, completion=1)
+
+    def setUp(self):
+        question_cache.clear()
+        self.task = Task.objects.get(pk=self.dataset.task.pk)
+        self.questions = list(self.task.questions.order_by('order'))
+
+    def _ids(self, questions):
+        return [str(q.pk) for q in questions]
+
+    def _saved(self):
+        return list(self.task.questions.order_by('order').values_list('pk', flat=True))
+
+    def test_assign_keys_single_move(self):
+        keys = ordering.spaced(6)
+        moved = [keys[4]] + keys[:4] + keys[5:]
+        result, rebalanced = ordering.assign_keys(moved)
+        self.assertFalse(rebalanced)
+        self.assertEqual(sum(a != b for a, b in zip(moved, result)), 1)
+        self.assertEqual(result, sorted(result))
+
+    def test_assign_keys_rebalances_dense(self):
+        result, rebalanced = ordering.assign_keys([1, None, 2, 3])
+        self.assertTrue(rebalanced)
+        self.assertEqual(result, ordering.spaced(4))
+
+        result, rebalanced = ordering.assign_keys([1, 2, 3, None])
+        self.assertFalse(rebalanced)
+        self.assertEqual(result, [1, 2, 3, 3 + ordering.GAP])
+
+    def test_move_touches_one_row(self):
+        version = self.task.questions_version
+        new = [self.questions[5]] + self.questions[:5]
+
+        # savepoint, select_for_update, bitta qator UPDATE, versiya, release
+        with self.assertNumQueries(5):
+            result = ordering.reorder_questions(self.task, self._ids(new))
+        self.assertEqual(result, {'moved': 1, 'rebalanced': False})
+        self.assertEqual(self._saved(), [q.pk for q in new])
+
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.questions_version, version + 1)
+        self.assertEqual([q.pk for q in self.task.get_questions()], [q.pk for q in new])
+
+    def test_repeated_moves_rebalance(self):
+        first, second = self.questions[0], self.questions[1]
+        rebalanced = False
+        for _ in range(12):
+            rest = [q for q in self.questions if q.pk not in (first.pk, second.pk)]
+            # Ikkalasini ketma-ket boshiga — oraliq har safar ikki baravar qisqaradi
+            result = ordering.reorder_questions(self.task, self._ids([second, first] + rest))
+            rebalanced = rebalanced or result['rebalanced']
+            first, second = second, first
+        self.assertTrue(rebalanced)
+        self.assertEqual(self._saved()[:2], [first.pk, second.pk])
+
+    def test_rejects_incomplete_list(self):
+        with self.assertRaises(ValueError):
+            ordering.reorder_questions(self.task, self._ids(self.questions[:-1]))
+
+    def test_endpoint(self):
+        self.client.force_login(self.dataset.admin)
+        url = reverse('tasks:question_reorder', args=[self.task.pk])
+        new = list(reversed(self.questions))
+
+        response = self.client.post(url, {'order': self._ids(new)}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._saved(), [q.pk for q in new])
+
+        response = self.client.post(url, {'order': 'x'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, {'order': self._ids(new[1:])}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_next_question_and_export_follow_order(self):
+        new = [self.questions[3]] + self.questions[:3] + self.questions[4:]
+        ordering.reorder_questions(self.task, self._ids(new))
+        self.task.refresh_from_db()
+
+        assignment = self.task.assignments.first()
+        assignment.answers.all().delete()
+        self.assertEqual(assignment.get_next_question().pk, new[0].pk)
+
+        self.client.force_login(self.dataset.admin)
+        response = self.client.get(reverse('tasks:task_export', args=[self.task.pk]))
+        ws = openpyxl.load_workbook(BytesIO(response.content)).active
+        headers = [cell.value for cell in ws[1]][4:4 + len(new)]
+        self.assertEqual(headers, [q.text for q in new])
+
+
+class TransitionTests(TestCase):
+    STATUSES = [
+        TaskAssignment.Status.PENDING,
+        TaskAssignment.Status.PENDING,
+        TaskAssignment.Status.SEEN,
+        TaskAssignment.Status.SEEN,
+        TaskAssignment.Status.IN_PROGRESS,
+        TaskAssignment.Status.IN_PROGRESS,
+        TaskAssignment.Status.OVERDUE,
+        TaskAssignment.Status.COMPLETED,
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(tasks=1, questions=2, completion=0)
+        cls.task = cls.dataset.task
+        cls.assignments = list(TaskAssignment.objects.filter(task=cls.task).order_by('pk'))
+        for n, (assignment, status) in enumerate(zip(cls.assignments, cls.STATUSES)):
+            # Juft o'rindagilar barcha savollarga javob bergan (completed uchun shart)
+            full = n % 2 == 0 or status == TaskAssignment.Status.COMPLETED
+            answered = cls.task.questions_count if full else 1
+            TaskAssignment.objects.filter(pk=assignment.pk).update(status=status, answers_count=answered)
+            assignment.status, assignment.answers_count = status, answered
+        cls.task.update_stats()
+
+    def _allowed(self, assignment, to_status):
+        from_statuses, _ = TRANSITIONS[to_status]
+        if to_status == TaskAssignment.Status.COMPLETED:
+            answered = assignment.answers_count >= self.task.questions_count
+            return assignment.status in from_statuses and answered
+        return assignment.status in from_statuses
+
+    def _stats(self):
+        return Task.objects.filter(pk=self.task.pk).values_list(
+            'stats_total_assigned', 'stats_total_seen', 'stats_total_started',
+            'stats_total_completed', 'stats_completion_rate'
+        ).get()
+
+    def _recounted(self):
+        Task.objects.get(pk=self.task.pk).update_stats()
+        return self._stats()
+
+    def test_deltas_match_recount(self):
+        ids = [a.pk for a in self.assignments]
+        for to_status, (from_statuses, stamp_field) in TRANSITIONS.items():
+            with self.subTest(to_status=to_status), transaction.atomic():
+                updated = transition_assignments(ids, to_status)
+
+                expected = {a.pk for a in self.assignments if self._allowed(a, to_status)}
+                self.assertTrue(expected)
+                self.assertEqual(set(updated), expected)
+                self.assertEqual(self._stats(), self._recounted())
+
+                changed = TaskAssignment.objects.filter(pk__in=updated)
+                self.assertFalse(changed.exclude(status=to_status).exists())
+                self.assertFalse(changed.filter(**{f'{stamp_field}__isnull': True}).exists())
+                transaction.set_rollback(True)
+
+    def test_illegal_transitions_skipped(self):
+        done = [a.pk for a in self.assignments if a.status == TaskAssignment.Status.COMPLETED]
+        overdue = [a.pk for a in self.assignments if a.status == TaskAssignment.Status.OVERDUE]
+        before = self._stats()
+
+        self.assertEqual(transition_assignments(done, TaskAssignment.Status.SEEN), [])
+        self.assertEqual(transition_assignments(done + overdue, TaskAssignment.Status.IN_PROGRESS), [])
+        self.assertEqual(
+            TaskAssignment.objects.get(pk=done[0]).status, TaskAssignment.Status.COMPLETED
+        )
+        self.assertEqual(self._stats(), before)
+
+        with self.assertRaises(ValueError):
+            transition_assignments(done, TaskAssignment.Status.PENDING)
+
+    def test_repeated_call_is_idempotent(self):
+        ids = [a.pk for a in self.assignments]
+        first = transition_assignments(ids, TaskAssignment.Status.COMPLETED)
+        self.assertEqual(
+            set(first), {a.pk for a in self.assignments if self._allowed(a, TaskAssignment.Status.COMPLETED)}
+        )
+        after_first = self._stats()
+
+        self.assertEqual(transition_assignments(ids, TaskAssignment.Status.COMPLETED), [])
+        self.assertEqual(self._stats(), after_first)
+        self.assertEqual(after_first, self._recounted())
+        self.assertEqual(after_first[3], len(first) + 1)
+
+    def test_completed_requires_all_answers(self):
+        unanswered = [a for a in self.assignments if a.answers_count < self.task.questions_count]
+        self.assertTrue(unanswered)
+        ids = [a.pk for a in unanswered]
+
+        self.assertEqual(transition_assignments(ids, TaskAssignment.Status.COMPLETED), [])
+        self.assertFalse(
+            TaskAssignment.objects.filter(pk__in=ids, status=TaskAssignment.Status.COMPLETED).exists()
+        )
+
+    def test_scoped_to_leader(self):
+        pending = [a for a in self.assignments if a.status == TaskAssignment.Status.PENDING]
+        ids = [a.pk for a in pending]
+
+        updated = transition_assignments(ids, TaskAssignment.Status.SEEN, leader=pending[0].leader)
+        self.assertEqual(updated, [pending[0].pk])
+        self.assertEqual(
+            TaskAssignment.objects.get(pk=pending[1].pk).status, TaskAssignment.Status.PENDING
+        )
+
+
+class SyncAnswersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = dataset.build(tasks=1, questions=6, completion=0)
+
+    def setUp(self):
+        self.assignment = TaskAssignment.objects.select_related('leader').filter(
+            task=self.dataset.task, answers_count=0
+        ).first()
+        self.questions = {
+            q.question_type: q for q in Question.objects.filter(task=self.dataset.task)
+        }
+
+    def item(self, key, q_type, value, ts='2026-01-01T10:00:00Z'):
+        return {'key': key, 'assignment': str(self.assignment.pk),
+                'question': str(self.questions[q_type].pk), 'value': value, 'client_ts': ts}
+
+    def sync(self, *items):
+        result = sync_answers(self.assignment.leader, list(items))
+        return {r['key']: r['result'] for r in result['results']}, result
+
+    def answer(self, q_type):
+        return Answer.objects.get(assignment=self.assignment, question=self.questions[q_type])
+
+    def test_retry_is_duplicate(self):
+        items = [self.item('a', Question.Type.TEXT, "salom"), self.item('b', Question.Type.NUMBER, "5")]
+        self.assertEqual(self.sync(*items)[0], {'a': 'applied', 'b': 'applied'})
+
+        Answer.objects.filter(pk=self.answer(Question.Type.TEXT).pk).update(value_text="o'zgargan")
+        self.assertEqual(self.sync(*items)[0], {'a': 'duplicate', 'b': 'duplicate'})
+        self.assertEqual(self.answer(Question.Type.TEXT).value_text, "o'zgargan")
+        self.assertEqual(self.assignment.sync_keys.count(), 2)
+
+    def test_duplicate_key_in_batch(self):
+        statuses, result = self.sync(
+            self.item('a', Question.Type.TEXT, "birinchi"),
+            self.item('a', Question.Type.TEXT, "ikkinchi", ts='2026-01-01T11:00:00Z'),
+        )
+        self.assertEqual([r['result'] for r in result['results']], ['duplicate', 'applied'])
+        self.assertEqual(self.answer(Question.Type.TEXT).value_text, "birinchi")
+
+    def test_last_writer_wins(self):
+        statuses, _ = self.sync(
+            self.item('new', Question.Type.TEXT, "yangi", ts='2026-01-01T12:00:00Z'),
+            self.item('old', Question.Type.TEXT, "eski", ts='2026-01-01T09:00:00Z'),
+        )
+        self.assertEqual(statuses, {'new': 'applied', 'old': 'stale'})
+        self.assertEqual(self.answer(Question.Type.TEXT).value_text, "yangi")
+
+        # Keyinroq kelgan, lekin eskiroq yozuv serverdagi qiymatni qaytaradi
+        statuses, result = self.sync(
+            self.item('late', Question.Type.TEXT, "kechikkan", ts='2026-01-01T11:00:00Z')
+        )
+        self.assertEqual(statuses, {'late': 'stale'})
+        self.assertEqual(result['server'][0]['value'], "yangi")
+
+        statuses, _ = self.sync(
+            self.item('newest', Question.Type.TEXT, "eng yangi", ts='2026-01-01T13:00:00Z')
+        )
+        self.assertEqual(statuses, {'newest': 'applied'})
+        self.assertEqual(self.answer(Question.Type.TEXT).value_text, "eng yangi")
+
+    def test_stale_item_keeps_newer_online_answer(self):
+        # Bot/forma orqali yozilgan javobda mijoz vaqti yo'q — server vaqti bilan solishtiriladi
+        question = self.questions[Question.Type.TEXT]
+        Answer.objects.create(assignment=self.assignment, question=question, value_text="onlayn")
+
+        statuses, result = self.sync(self.item('old', Question.Type.TEXT, "offline"))
+        self.assertEqual(statuses, {'old': 'stale'})
+        self.assertEqual(result['server'][0]['value'], "onlayn")
+        self.assertEqual(self.answer(Question.Type.TEXT).value_text, "onlayn")
+
+        later = (timezone.now() + timedelta(minutes=1)).isoformat()
+        statuses, _ = self.sync(self.item('new', Question.Type.TEXT, "offline", ts=later))
+        self.assertEqual(statuses, {'new': 'applied'})
+
+    def test_online_write_after_sync_wins_over_older_item(self):
+        self.sync(self.item('a', Question.Type.TEXT, "offline", ts='2026-01-01T09:00:00Z'))
+        answer = self.answer(Question.Type.TEXT)
+        answer.value_text = "onlayn"
+        answer.save()
+        self.assertIsNone(answer.client_updated_at)
+
+        statuses, _ = self.sync(self.item('b', Question.Type.TEXT, "offline 2", ts='2026-01-01T10:00:00Z'))
+        self.assertEqual(statuses, {'b': 'stale'})
+        self.assertEqual(self.answer(Question.Type.TEXT).value_text, "onlayn")
+
+    def test_prune_sync_keys(self):
+        self.sync(self.item('a', Question.Type.TEXT, "salom"), self.item('b', Question.Type.NUMBER, "5"))
+        old = self.assignment.sync_keys.order_by('pk').first()
+        AnswerSyncKey.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=31))
+
+        call_command('prune_sync_keys', '--days', '30', stdout=StringIO())
+        self.assertEqual(self.assignment.sync_keys.count(), 1)
+        self.assertFalse(AnswerSyncKey.objects.filter(pk=old.pk).exists())
+
+    def test_invalid_values_rejected_individually(self):
+        statuses, result = self.sync(
+            self.item('nan', Question.Type.NUMBER, "abc"),
+            self.item('big', Question.Type.NUMBER, "1e20", ts='2026-01-01T10:01:00Z'),
+            self.item('date', Question.Type.DATE, "2026-02-30"),
+            self.item('ok', Question.Type.TEXT, "salom"),
+        )
+        self.assertEqual(statuses, {'nan': 'rejected', 'big': 'rejected', 'date': 'rejected', 'ok': 'applied'})
+        self.assertTrue(all(r['error'] for r in result['results'] if r['result'] == 'rejected'))
+        self.assertFalse(
+            Answer.objects.filter(assignment=self.assignment, question=self.questions[Question.Type.NUMBER]).exists()
+        )
+
+        # Rad etilgan kalit egallanmaydi — tuzatilgan qiymat bilan qayta yuborish mumkin
+        statuses, _ = self.sync(
+            self.item('nan', Question.Type.NUMBER, "12.5"),
+            self.item('date', Question.Type.DATE, "2026-02-28"),
+        )
+        self.assertEqual(statuses, {'nan': 'applied', 'date': 'applied'})
+        self.assertEqual(float(self.answer(Question.Type.NUMBER).value_number), 12.5)
+        self.assertEqual(str(self.answer(Question.Type.DATE).value_date), '2026-02-28')
+
+        self.assignment.refresh_from_db()
+        self.assertEqual(self.assignment.answers_count, 3)
+
+    def test_other_leaders_assignment_rejected(self):
+        other = TaskAssignment.objects.exclude(leader=self.assignment.leader).first()
+        item = dict(self.item('x', Question.Type.TEXT, "salom"), assignment=str(other.pk))
+        self.assertEqual(self.sync(item)[0], {'x': 'rejected'})
+        self.assertFalse(AnswerSyncKey.objects.exists())
+
+    def test_concurrent_insert_reported_stale(self):
+        question = self.questions[Question.Type.TEXT]
+        set_value = Answer.set_value
+
+        def racing(answer, value):
+            # Boshqa yozuvchi (bot) shu juftlikni sinxronlash o'qigandan keyin yaratadi
+            if answer._state.adding:
+                Answer.objects.bulk_create([
+                    Answer(assignment=self.assignment, question=question, value_text="bot")
+                ])
+            set_value(answer, value)
+
+        with mock.patch.object(Answer, 'set_value', racing):
+            statuses, result = self.sync(self.item('a', Question.Type.TEXT, "sync"))
 
-# Create your tests here.
+        self.assertEqual(statuses, {'a': 'stale'})
+        self.assertEqual(result['server'][0]['value'], "bot")
+        self.assertEqual(self.answer(Question.Type.TEXT).value_text, "bot")
@@ -10,6 +10,7 @@ urlpatterns = [
     path('<uuid:pk>/edit/', views.task_edit, name='task_edit'),
     path('<uuid:pk>/delete/', views.task_delete, name='task_delete'),
     path('<uuid:pk>/publish/', views.task_publish, name='task_publish'),
+    path('<uuid:pk>/questions/reorder/', views.question_reorder, name='question_reorder'),
     path('<uuid:pk>/results/', views.task_results, name='task_results'),
     path('<uuid:pk>/export/', views.task_export, name='task_export'),
 ]
\ No newline at end of file
@@ -1,24 +1,29 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Q, Count
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_POST
 from django.utils import timezone
+import json
 import openpyxl
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 
-from .models import Task, Question, TaskAssignment, Answer
+from .models import Task, Question, TaskAssignment, Answer, Segment
+from accounts import geography
 from accounts.models import Region, District, Mahalla
+from config.pagination import EstimatedCountPaginator
+from config.replicas import use_replica
+from .search import search_tasks
+from .ordering import reorder_questions
+from .services import save_question_set
 
 
 @login_required
 def task_list(request):
     """Vazifalar ro'yxati"""
 
-    tasks = Task.objects.select_related(
-        'created_by', 'target_region', 'target_district'
-    ).order_by('-created_at')
+    tasks = Task.objects.select_related('created_by').order_by('-created_at')
 
     # Filterlar
     status = request.GET.get('status')
@@ -33,13 +38,12 @@ def task_list(request):
     if task_type:
         tasks = tasks.filter(task_type=task_type)
     if search:
-        tasks = tasks.filter(
-            Q(title__icontains=search) |
-            Q(description__icontains=search)
-        )
+        tasks = search_tasks(tasks, search)
+        if 'search_rank' in tasks.query.annotations:
+            tasks = tasks.order_by('-search_rank', '-created_at')
 
     # Pagination
-    paginator = Paginator(tasks, 15)
+    paginator = EstimatedCountPaginator(tasks, 15)
     page = request.GET.get('page')
     tasks = paginator.get_page(page)
 
@@ -59,6 +63,44 @@ def task_list(request):
     return render(request, 'tasks/task_list.html', context)
 
 
+def _posted_questions(request):
+    """Formadagi savollar: [{'id', 'text', 'question_type'}, ...], bo'shlari tashlanadi"""
+    texts = request.POST.getlist('question_text[]')
+    types = request.POST.getlist('question_type[]')
+    ids = request.POST.getlist('question_id[]')
+    ids += [''] * (len(texts) - len(ids))
+
+    return [
+        {'id': q_id, 'text': text.strip(), 'question_type': q_type}
+        for q_id, text, q_type in zip(ids, texts, types)
+        if text.strip()
+    ]
+
+
+# Formadan tahrirlanadigan nishon maydonlari; mahalla darajasi — admin panelda
+FORM_TARGET_FIELDS = ('target_regions', 'target_districts', 'target_segments', 'exclude_districts')
+
+BREAKDOWN_MODELS = {'region': Region, 'district': District, 'mahalla': Mahalla}
+
+
+def _save_targeting(task, request):
+    for field in FORM_TARGET_FIELDS:
+        getattr(task, field).set([pk for pk in request.POST.getlist(field) if pk])
+
+
+def _targeting_context(targeting):
+    """Forma uchun hududlar (daraxt keshidan), segmentlar va tanlangan nishonlar"""
+    tree = geography.get_tree()
+    return {
+        'regions': tree.regions,
+        'district_groups': [
+            (region, tree.children('districts', region.pk)) for region in tree.regions
+        ],
+        'segments': Segment.objects.filter(is_active=True).only('name', 'members_count'),
+        'selected': {field: set(targeting.ids(field)) for field in FORM_TARGET_FIELDS},
+    }
+
+
 @login_required
 def task_create(request):
     """Yangi vazifa yaratish"""
@@ -76,28 +118,10 @@ def task_create(request):
             )
 
             # Manzil targeting
-            region_id = request.POST.get('target_region')
-            district_id = request.POST.get('target_district')
-
-            if region_id:
-                task.target_region_id = region_id
-            if district_id:
-                task.target_district_id = district_id
-
-            task.save()
+            _save_targeting(task, request)
 
             # Savollarni qo'shish
-            questions = request.POST.getlist('question_text[]')
-            question_types = request.POST.getlist('question_type[]')
-
-            for i, (text, q_type) in enumerate(zip(questions, question_types), 1):
-                if text.strip():
-                    Question.objects.create(
-                        task=task,
-                        order=i,
-                        text=text.strip(),
-                        question_type=q_type,
-                    )
+            save_question_set(task, _posted_questions(request))
 
             messages.success(request, f"Vazifa '{task.title}' yaratildi!")
             return redirect('tasks:task_detail', pk=task.pk)
@@ -105,10 +129,8 @@ def task_create(request):
         except Exception as e:
             messages.error(request, f"Xatolik: {str(e)}")
 
-    regions = Region.objects.filter(is_active=True)
-
     context = {
-        'regions': regions,
+        **_targeting_context(Task().get_targeting()),
         'type_choices': Task.Type.choices,
         'priority_choices': Task.Priority.choices,
         'question_type_choices': Question.Type.choices,
@@ -121,30 +143,36 @@ def task_create(request):
 def task_detail(request, pk):
     """Vazifa tafsilotlari"""
 
-    task = get_object_or_404(Task, pk=pk)
+    task = get_object_or_404(
+        Task.objects.select_related('created_by'),
+        pk=pk
+    )
 
     # Savollar
-    questions = task.questions.order_by('order')
+    questions = task.get_questions()
 
     # Tayinlashlar
-    assignments = task.assignments.select_related('leader').order_by('-sent_at')
-
-    # Statistika
-    stats = {
-        'total': assignments.count(),
-        'pending': assignments.filter(status=TaskAssignment.Status.PENDING).count(),
-        'seen': assignments.filter(status=TaskAssignment.Status.SEEN).count(),
-        'in_progress': assignments.filter(status=TaskAssignment.Status.IN_PROGRESS).count(),
-        'completed': assignments.filter(status=TaskAssignment.Status.COMPLETED).count(),
-    }
+    assignments = task.assignments.with_progress().select_related(
+        'leader__mahalla__district'
+    ).order_by('-sent_at')
+
+    # Statistika — bitta aggregate so'rov
+    stats = task.assignments.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status=TaskAssignment.Status.PENDING)),
+        seen=Count('id', filter=Q(status=TaskAssignment.Status.SEEN)),
+        in_progress=Count('id', filter=Q(status=TaskAssignment.Status.IN_PROGRESS)),
+        completed=Count('id', filter=Q(status=TaskAssignment.Status.COMPLETED)),
+    )
 
     # Pagination for assignments
-    paginator = Paginator(assignments, 20)
+    paginator = EstimatedCountPaginator(assignments, 20)
     page = request.GET.get('page')
     assignments = paginator.get_page(page)
 
     context = {
         'task': task,
+        'targeting': task.get_targeting(),
         'questions': questions,
         'assignments': assignments,
         'stats': stats,
@@ -171,40 +199,23 @@ def task_edit(request, pk):
         task.priority = request.POST.get('priority')
         task.deadline = request.POST.get('deadline')
 
-        # Manzil
-        region_id = request.POST.get('target_region')
-        district_id = request.POST.get('target_district')
-
-        task.target_region_id = region_id if region_id else None
-        task.target_district_id = district_id if district_id else None
-
         task.save()
 
-        # Savollarni yangilash — avval eskisini o'chirish
-        task.questions.all().delete()
-
-        questions = request.POST.getlist('question_text[]')
-        question_types = request.POST.getlist('question_type[]')
+        # Manzil
+        _save_targeting(task, request)
 
-        for i, (text, q_type) in enumerate(zip(questions, question_types), 1):
-            if text.strip():
-                Question.objects.create(
-                    task=task,
-                    order=i,
-                    text=text.strip(),
-                    question_type=q_type,
-                )
+        # Savollarni yangilash — faqat farqi yoziladi
+        save_question_set(task, _posted_questions(request))
 
         messages.success(request, "Vazifa yangilandi!")
         return redirect('tasks:task_detail', pk=pk)
 
-    regions = Region.objects.filter(is_active=True)
-    questions = task.questions.order_by('order')
+    questions = task.get_questions()
 
     context = {
+        **_targeting_context(task.get_targeting()),
         'task': task,
         'questions': questions,
-        'regions': regions,
         'type_choices': Task.Type.choices,
         'priority_choices': Task.Priority.choices,
         'question_type_choices': Question.Type.choices,
@@ -242,7 +253,8 @@ def task_publish(request, pk):
         messages.warning(request, "Bu vazifa allaqachon e'lon qilingan!")
         return redirect('tasks:task_detail', pk=pk)
 
-    if task.questions.count() == 0:
+    questions_count = task.questions_count
+    if questions_count == 0:
         messages.error(request, "Vazifada kamida 1 ta savol bo'lishi kerak!")
         return redirect('tasks:task_detail', pk=pk)
 
@@ -254,30 +266,60 @@ def task_publish(request, pk):
 
         return redirect('tasks:task_detail', pk=pk)
 
-    # E'lon qilishdan oldin ma'lumot ko'rsatish
-    target_leaders = task.get_target_leaders()
+    # E'lon qilishdan oldin ma'lumot ko'rsatish — hajm bitta aggregate so'rovda
+    targeting = task.get_targeting()
+    size = task.audience_size(targeting)
+    target_leaders = task.get_target_leaders(targeting)
 
     context = {
         'task': task,
-        'target_leaders_count': target_leaders.count(),
-        'target_leaders': target_leaders[:20],  # Birinchi 20 tasi
+        'targeting': targeting,
+        'questions_count': questions_count,
+        'audience': size,
+        'target_leaders_count': size.total,
+        'target_leaders': target_leaders.select_related('mahalla__district')[:20],  # Birinchi 20 tasi
     }
 
     return render(request, 'tasks/task_publish.html', context)
 
 
 @login_required
+@require_POST
+def question_reorder(request, pk):
+    """
+    Savollar tartibini o'zgartirish (drag-and-drop).
+    Body: {"order": [question_id, ...]} — vazifaning barcha savollari.
+    """
+
+    task = get_object_or_404(Task, pk=pk)
+
+    try:
+        ids = json.loads(request.body)['order']
+        if not isinstance(ids, list):
+            raise TypeError
+        result = reorder_questions(task, ids)
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'detail': "Noto'g'ri savollar ro'yxati"}, status=400)
+
+    return JsonResponse(result)
+
+
+@login_required
+@use_replica
 def task_results(request, pk):
     """Vazifa natijalari"""
 
     task = get_object_or_404(Task, pk=pk)
 
-    # Barcha javoblar
+    # Barcha javoblar — savollar keshdan
     assignments = task.assignments.filter(
         status=TaskAssignment.Status.COMPLETED
-    ).select_related('leader').prefetch_related('answers__question')
+    ).select_related(
+        'leader__mahalla', 'leader__district__region'
+    ).prefetch_related('answers')
 
-    questions = task.questions.order_by('order')
+    questions = task.get_questions()
+    questions_by_id = {q.pk: q for q in questions}
 
     # Jadval uchun ma'lumot
     results = []
@@ -289,20 +331,36 @@ def task_results(request, pk):
         }
 
         for answer in assignment.answers.all():
+            answer.question = questions_by_id[answer.question_id]
             row['answers'][answer.question.order] = answer.display_value
 
         results.append(row)
 
+    # Hudud kesimida: nishon darajasida yoki yagona hududdan bir daraja pastga
+    level = task.get_targeting().breakdown_level()
+    model = BREAKDOWN_MODELS[level]
+
+    breakdown = list(task.assignments.breakdown(level))
+    names = model.objects.only('name').in_bulk(
+        [row[f'{level}_id'] for row in breakdown if row[f'{level}_id']]
+    )
+    for row in breakdown:
+        row['area'] = names.get(row[f'{level}_id'])
+        row['percent'] = int(row['completed'] / row['total'] * 100) if row['total'] else 0
+
     context = {
         'task': task,
         'questions': questions,
         'results': results,
+        'breakdown': breakdown,
+        'breakdown_label': model._meta.verbose_name,
     }
 
     return render(request, 'tasks/task_results.html', context)
 
 
 @login_required
+@use_replica
 def task_export(request, pk):
     """Natijalarni Excel ga export qilish"""
 
@@ -326,7 +384,8 @@ def task_export(request, pk):
     )
 
     # Sarlavha
-    questions = task.questions.order_by('order')
+    questions = task.get_questions()
+    questions_by_id = {q.pk: q for q in questions}
 
     headers = ['№', 'Yetakchi', 'Mahalla', 'Telefon']
     headers += [q.text for q in questions]
@@ -342,7 +401,7 @@ def task_export(request, pk):
     # Ma'lumotlar
     assignments = task.assignments.filter(
         status=TaskAssignment.Status.COMPLETED
-    ).select_related('leader', 'leader__mahalla').prefetch_related('answers__question')
+    ).select_related('leader__mahalla__district').prefetch_related('answers')
 
     for row_num, assignment in enumerate(assignments, 2):
         # Asosiy ma'lumotlar
@@ -352,7 +411,10 @@ def task_export(request, pk):
         ws.cell(row=row_num, column=4, value=assignment.leader.phone or '-').border = thin_border
 
         # Javoblar
-        answers_dict = {a.question.order: a.display_value for a in assignment.answers.all()}
+        answers_dict = {}
+        for answer in assignment.answers.all():
+            answer.question = questions_by_id[answer.question_id]
+            answers_dict[answer.question.order] = answer.display_value
 
         for i, question in enumerate(questions):
             col = 5 + i